@@ -1,13 +1,14 @@
+import functools
 import os
 import time
+import uuid
+from contextlib import nullcontext
 from datetime import UTC, datetime
 from importlib.metadata import PackageNotFoundError, version
 from types import SimpleNamespace
 
-import requests
 import streamlit as st
 from dotenv import load_dotenv
-from streamlit_drawable_canvas import st_canvas
 
 from services import (
     add_shadow,
@@ -18,13 +19,22 @@ from services import (
     lifestyle_shot_by_image,
     lifestyle_shot_by_text,
 )
+from services.asset_cache import get_asset_cache
+from services.errors import BriaAPIError, NetworkError, RateLimited, Rejected422, ServerError
+from services.hub import get_hub, set_current_user
+from services.image_prep import get_prep_reports, prep_summary
+from services.metrics import get_metrics
+from services.thumbnails import get_thumbnails
+from services.tracing import current_context, span
 from ui import (
     render_erase_tab,
     render_fill_tab,
     render_generate_tab,
     render_lifestyle_tab,
 )
-from utils import extract_result_urls
+from utils import ImageHandle, extract_result_urls
+from workflows.history import call_params, get_history_store
+from workflows.jobs import DONE, FAILED, POLLING, get_job_queue
 
 # Configure Streamlit page
 st.set_page_config(
@@ -46,6 +56,14 @@ SOURCE_TO_FEATURE = {
     "Add Shadow": "shadow",
 }
 
+# While jobs run, the script reruns itself at this interval to pick up progress.
+JOB_REFRESH_SECONDS = 1.0
+JOB_PANEL_LIMIT = 5
+HISTORY_PAGE_SIZE = 10
+
+# Decoded uploads kept per session (see get_image_handle).
+IMAGE_HANDLE_LIMIT = 4
+
 RECOMMENDED_VERSIONS = {
     "streamlit": "1.32.0",
     "streamlit-drawable-canvas": "0.9.3",
@@ -60,10 +78,13 @@ def initialize_session_state():
         st.session_state.generated_images = []
     if "current_image" not in st.session_state:
         st.session_state.current_image = None
-    if "pending_urls" not in st.session_state:
-        st.session_state.pending_urls = []
-    if "pending_source" not in st.session_state:
-        st.session_state.pending_source = None
+    restore = "session_id" not in st.session_state
+    if restore:
+        # The id lives in the URL so a browser refresh reattaches to the same history.
+        st.session_state.session_id = st.query_params.get("session") or uuid.uuid4().hex
+        st.query_params["session"] = st.session_state.session_id
+    if "active_jobs" not in st.session_state:
+        st.session_state.active_jobs = []
     if "edited_image" not in st.session_state:
         st.session_state.edited_image = None
     if "result_source" not in st.session_state:
@@ -97,6 +118,35 @@ def initialize_session_state():
         st.session_state.last_action_ts = {}
     if "debug_mode" not in st.session_state:
         st.session_state.debug_mode = False
+    if "image_handles" not in st.session_state:
+        st.session_state.image_handles = {}
+    if "result_job_id" not in st.session_state:
+        st.session_state.result_job_id = None
+    if "history_cursors" not in st.session_state:
+        st.session_state.history_cursors = [None]
+    if "result_trace" not in st.session_state:
+        st.session_state.result_trace = None
+
+    if restore:
+        restore_session()
+
+
+def restore_session():
+    """Reload the latest result and still-running jobs of a session after a refresh."""
+    session_id = st.session_state.session_id
+    latest = get_history_store().latest(session_id, state=DONE)
+    if latest and latest.urls:
+        show_result(latest.id, latest.urls, latest.source)
+    st.session_state.active_jobs = [job.id for job in get_job_queue().jobs_for(session_id, limit=50) if job.active]
+
+
+def show_result(job_id, urls, source):
+    """Make a job's results the current image and gallery."""
+    st.session_state.edited_image = urls[0]
+    st.session_state.generated_images = list(urls)
+    st.session_state.result_source = source
+    st.session_state.result_job_id = job_id
+    sync_active_image_state()
 
 
 def debug_log(event, **fields):
@@ -136,7 +186,9 @@ def get_installed_version(pkg):
         return None
 
 
+@functools.lru_cache(maxsize=None)
 def check_runtime_versions():
+    """Version notices, read from package metadata once per process (not on every rerun)."""
     mismatches = []
     for pkg, expected in RECOMMENDED_VERSIONS.items():
         installed = get_installed_version(pkg)
@@ -144,16 +196,39 @@ def check_runtime_versions():
             mismatches.append(f"{pkg} is not installed")
         elif installed != expected:
             mismatches.append(f"{pkg}={installed} (recommended {expected})")
-    return mismatches
+    return tuple(mismatches)
 
 
 def api_error(exc: Exception, operation: str = "Request"):
     """Render consistent API error messaging across tabs."""
     msg = str(exc)
     set_generation_status("Failed", f"{operation} failed")
-    debug_log("api_error", operation=operation, message=msg)
+    debug_log(
+        "api_error",
+        operation=operation,
+        message=msg,
+        error_type=type(exc).__name__,
+        status_code=getattr(exc, "status_code", None),
+        attempts=getattr(exc, "attempts", None),
+        latency=getattr(exc, "latency", None),
+    )
     st.error(f"{operation} failed: {msg}")
 
+    if isinstance(exc, BriaAPIError):
+        retried = f" (after {exc.attempts} attempts)" if exc.attempts > 1 else ""
+        if isinstance(exc, Rejected422):
+            st.warning(
+                "The API rejected the request (422). Try a simpler/safer prompt, "
+                "a smaller mask, or different generation settings."
+            )
+        elif isinstance(exc, RateLimited):
+            st.warning(f"Rate limit hit (429){retried}. Wait a moment and retry.")
+        elif isinstance(exc, ServerError):
+            st.warning(f"Image service is temporarily unavailable{retried}. Retry in a few seconds.")
+        elif isinstance(exc, NetworkError):
+            st.warning(f"Network timeout/connection issue{retried}. Please retry.")
+        return
+
     if "status=422" in msg or " 422" in msg:
         st.warning(
             "The API rejected the request (422). Try a simpler/safer prompt, "
@@ -167,6 +242,22 @@ def api_error(exc: Exception, operation: str = "Request"):
         st.warning("Network timeout/connection issue. Please retry.")
 
 
+def get_image_handle(uploaded_file):
+    """Return the session's ImageHandle for an upload, decoding each file once."""
+    if uploaded_file is None:
+        return None
+    handles = st.session_state.image_handles
+    key = getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+    handle = handles.get(key)
+    if handle is None:
+        handle = ImageHandle.from_upload(uploaded_file)
+        handles[key] = handle
+        # Keep only the most recent uploads; each tab holds at most one or two.
+        while len(handles) > IMAGE_HANDLE_LIMIT:
+            handles.pop(next(iter(handles)))
+    return handle
+
+
 def sync_active_image_state():
     """Keep unified active image + per-feature image state in sync."""
     image_url = st.session_state.get("edited_image")
@@ -184,61 +275,138 @@ def sync_active_image_state():
 
 
 def download_image(url):
-    """Download image from URL and return as bytes."""
+    """Return image bytes for a URL, served from the local asset cache when possible."""
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return response.content
+        return get_asset_cache().fetch(url, timeout=30)
     except Exception as e:
         api_error(e, "Download image")
         return None
 
 
-def check_generated_images():
-    """Check if pending images are ready and update the display."""
-    if st.session_state.pending_urls:
-        ready_images = []
-        still_pending = []
-
-        for url in st.session_state.pending_urls:
-            try:
-                response = requests.head(url, timeout=10)
-                if response.status_code == 200:
-                    ready_images.append(url)
-                else:
-                    still_pending.append(url)
-            except Exception:
-                still_pending.append(url)
-
-        st.session_state.pending_urls = still_pending
-
-        if ready_images:
-            st.session_state.edited_image = ready_images[0]
-            st.session_state.result_source = st.session_state.get("pending_source")
-            if len(ready_images) > 1:
-                st.session_state.generated_images = ready_images
-            debug_log("pending_images_ready", count=len(ready_images), source=st.session_state.result_source)
-            sync_active_image_state()
-            return True
-
-    return False
-
-
-def auto_check_images(status_container):
-    """Automatically check for image completion a few times."""
-    max_attempts = 3
-    attempt = 0
-    while attempt < max_attempts and st.session_state.pending_urls:
-        time.sleep(2)
-        if check_generated_images():
-            status_container.success("✨ Image ready!")
-            return True
-        attempt += 1
-    return False
+def render_download_button(label, file_name, key, mime="image/png"):
+    """Render a download button for the current result, fetching its bytes only on demand."""
+    url = st.session_state.get("edited_image")
+    if not url:
+        return
+    if not get_asset_cache().contains(url):
+        if not st.button("Prepare download", key=f"{key}_prepare"):
+            return
+        debug_log("asset_cache_fetch", key=key)
+    image_data = download_image(url)
+    if image_data:
+        st.download_button(label, image_data, file_name, mime, key=key)
+
+
+def submit_job(label, source, fn, limit=None, poll=False, extract=extract_result_urls):
+    """
+    Run a service call in the background and return its job id.
+
+    fn runs on a worker thread, so it must not read st.session_state; bind
+    its arguments with functools.partial. With poll=True the returned URLs
+    are polled until downloadable (for non-sync API calls). extract turns
+    the response into result URLs. Results are applied by collect_jobs on a
+    later rerun.
+    """
+    # The job, and the first gallery render of its results, join this trace.
+    with span("ui.action", action=label, source=source):
+        job_id = get_job_queue().submit(
+            fn,
+            label=label,
+            source=source,
+            owner=st.session_state.session_id,
+            limit=limit,
+            poll=poll,
+            extract=extract,
+            meta={"params": call_params(fn), "trace": current_context()},
+        )
+    st.session_state.active_jobs.append(job_id)
+    debug_log("job_submitted", job_id=job_id, label=label)
+    return job_id
+
+
+def collect_jobs():
+    """Apply finished jobs of this session to the shared image state."""
+    queue = get_job_queue()
+    still_active = []
+    for job_id in st.session_state.active_jobs:
+        job = queue.get(job_id)
+        if job is None:
+            continue
+        if job.active:
+            still_active.append(job_id)
+            continue
+        if job.state == DONE:
+            debug_log("image_generated", tab=job.source, count=len(job.urls), elapsed=round(job.elapsed, 1))
+            if job.failed_urls:
+                debug_log("pending_images_failed", count=len(job.failed_urls), source=job.source)
+            show_result(job.id, job.urls, job.source)
+            st.session_state.result_trace = job.meta.get("trace")
+        elif job.state == FAILED:
+            api_error(job.exception or RuntimeError(job.error), job.label)
+    st.session_state.active_jobs = still_active
+
+
+def current_generation_status():
+    """Sidebar status: the running jobs of this session, else the last recorded event."""
+    queue = get_job_queue()
+    running = [job for job in map(queue.get, st.session_state.active_jobs) if job and job.active]
+    if running:
+        job = running[-1]
+        message = f"{job.label}: {job.progress or job.state}"
+        if len(running) > 1:
+            message += f" (+{len(running) - 1} more)"
+        return {"state": "Generating", "message": message, "updated_at": None}
+    return st.session_state.generation_status
+
+
+def render_job_panel():
+    """List this session's recent jobs with state, progress and elapsed time."""
+    jobs = get_job_queue().jobs_for(st.session_state.session_id, limit=JOB_PANEL_LIMIT)
+    if not jobs:
+        return
+    st.markdown("**Jobs**")
+    icons = {DONE: "✅", FAILED: "❌", POLLING: "⏳"}
+    for job in jobs:
+        detail = job.progress or job.error or ""
+        st.caption(
+            f"{icons.get(job.state, '🔄')} {job.label} — {job.state}"
+            f"{f' · {detail}' if detail else ''} · {job.elapsed:.0f}s"
+        )
+
+
+def render_history_panel():
+    """Paginated history of this session's generations, newest first."""
+    cursors = st.session_state.history_cursors
+    page = get_history_store().page(
+        session_id=st.session_state.session_id,
+        limit=HISTORY_PAGE_SIZE,
+        before=cursors[-1],
+    )
+    if not page.entries and len(cursors) == 1:
+        return
+    with st.expander("History"):
+        for entry in page.entries:
+            when = datetime.fromtimestamp(entry.created_at, UTC).strftime("%Y-%m-%d %H:%M")
+            sku = f" · SKU {entry.sku}" if entry.sku else ""
+            st.caption(f"{when} · {entry.label} — {entry.state}{sku}")
+            if entry.state == DONE and entry.urls:
+                if st.button(f"Open ({len(entry.urls)})", key=f"history_open_{entry.id}"):
+                    show_result(entry.id, entry.urls, entry.source)
+                    st.rerun()
+        newer, older = st.columns(2)
+        if len(cursors) > 1 and newer.button("Newer", key="history_newer"):
+            cursors.pop()
+            st.rerun()
+        if page.next_cursor and older.button("Older", key="history_older"):
+            cursors.append(page.next_cursor)
+            st.rerun()
 
 
 def safe_st_canvas(**kwargs):
     """Create drawable canvas with compatibility handling for Streamlit versions."""
+    # The component (and NumPy with it) loads the first time a canvas is shown.
+    from streamlit_drawable_canvas import st_canvas
+
     try:
         return st_canvas(**kwargs)
     except AttributeError as e:
@@ -259,7 +427,20 @@ def render_generated_gallery(section_key):
 
     st.markdown("### Generated Variations")
     captions = [f"Variation {i + 1}" for i in range(len(urls))]
-    st.image(urls, caption=captions, use_column_width=True)
+    # Display-width proxies, downloaded and encoded once; the full-size originals
+    # stay in the asset cache for the primary image and downloads.
+    # Only the first render after a job finishes belongs to its trace.
+    trace, st.session_state.result_trace = st.session_state.result_trace, None
+    with span("ui.gallery", parent=trace, images=len(urls)) if trace else nullcontext():
+        thumbs = get_thumbnails(urls)
+    fallbacks = sum(thumb is None for thumb in thumbs)
+    if fallbacks:
+        debug_log("gallery_thumbnail_fallback", count=fallbacks)
+    st.image(
+        [thumb if thumb is not None else url for thumb, url in zip(thumbs, urls)],
+        caption=captions,
+        use_column_width=True,
+    )
 
     selected_index = st.selectbox(
         "Choose primary image",
@@ -274,9 +455,69 @@ def render_generated_gallery(section_key):
         st.rerun()
 
 
+def render_upload_prep_stats():
+    """Show byte savings from upload preprocessing (debug mode only)."""
+    summary = prep_summary()
+    if not summary["requests"]:
+        return
+    st.caption(
+        f"Upload prep: {summary['saved_bytes'] / 1e6:.2f} MB saved across {summary['requests']} upload(s)"
+    )
+    last = get_prep_reports()[-1]
+    st.code(str({
+        "endpoint": last.endpoint,
+        "action": last.action,
+        "original_bytes": last.original_bytes,
+        "sent_bytes": last.sent_bytes,
+        "original_size": last.original_size,
+        "sent_size": last.sent_size,
+    }))
+
+
+def render_asset_cache_stats():
+    """Show result image cache effectiveness (debug mode only)."""
+    stats = get_asset_cache().stats()
+    if not stats["hits"] + stats["misses"]:
+        return
+    st.caption(
+        f"Image cache: {stats['hits']} hit(s), {stats['misses']} miss(es), {stats['evictions']} evicted, "
+        f"{stats['bytes'] / 1e6:.1f} of {stats['max_bytes'] / 1e6:.0f} MB used"
+    )
+
+
+def render_usage_stats():
+    """Show this session's API usage and what it saved by sharing results (debug mode only)."""
+    usage = get_hub().usage(st.session_state.session_id)
+    if not any(usage.values()):
+        return
+    st.caption(
+        f"API usage: {usage['requests']} call(s), {usage['errors']} failed, "
+        f"{usage['cache_hits'] + usage['shared']} answered from shared results"
+    )
+
+
+def render_endpoint_metrics():
+    """Per-endpoint latency percentiles and metric exports (debug mode only)."""
+    metrics = get_metrics()
+    series = metrics.snapshot()["histograms"]["adforge_api_duration_seconds"]
+    if not series:
+        return
+    st.markdown("**Endpoint latency**")
+    for entry in sorted(series, key=lambda e: e["p95"] or 0, reverse=True):
+        labels = entry["labels"]
+        st.caption(
+            f"{labels['endpoint']} ({labels['outcome']}): n={entry['count']} "
+            f"p50={entry['p50']:.2f}s p95={entry['p95']:.2f}s"
+        )
+    st.download_button("Metrics (Prometheus)", metrics.prometheus_text(), "metrics.txt", "text/plain", key="metrics_prom")
+    st.download_button("Metrics (JSON)", metrics.to_json(), "metrics.json", "application/json", key="metrics_json")
+
+
 def main():
     st.title("AdForge Studio")
     initialize_session_state()
+    # The script thread serves one session; inline API calls are accounted to it.
+    set_current_user(st.session_state.session_id)
 
     with st.sidebar:
         st.header("Settings")
@@ -296,11 +537,20 @@ def main():
             help="Shows structured event logs in sidebar.",
         )
 
-        status = st.session_state.generation_status
+        if st.session_state.debug_mode:
+            render_upload_prep_stats()
+            render_usage_stats()
+            render_asset_cache_stats()
+            render_endpoint_metrics()
+
+        collect_jobs()
+        status = current_generation_status()
         st.markdown("**Generation Status**")
         st.info(f"{status['state']}: {status['message']}")
         if status.get("updated_at"):
             st.caption(f"Updated: {status['updated_at']}")
+        render_job_panel()
+        render_history_panel()
 
         mismatches = check_runtime_versions()
         if mismatches:
@@ -315,15 +565,16 @@ def main():
 
     common_deps = {
         "download_image": download_image,
+        "render_download_button": render_download_button,
         "extract_result_urls": extract_result_urls,
-        "check_generated_images": check_generated_images,
-        "auto_check_images": auto_check_images,
+        "submit_job": submit_job,
         "safe_st_canvas": safe_st_canvas,
         "render_generated_gallery": render_generated_gallery,
         "api_error": api_error,
         "debug_log": debug_log,
         "set_generation_status": set_generation_status,
         "can_submit_action": can_submit_action,
+        "get_image_handle": get_image_handle,
     }
 
     render_generate_tab(
@@ -366,6 +617,11 @@ def main():
     )
     sync_active_image_state()
 
+    if st.session_state.active_jobs:
+        # Widgets are already on screen; wait briefly, then rerun to show progress.
+        time.sleep(JOB_REFRESH_SECONDS)
+        st.rerun()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,62 @@
+"""
+Compare one-connection-per-call requests against the shared pooled client.
+
+Run:
+    python -m benchmarks.bench_connection_reuse
+"""
+import argparse
+import time
+
+import requests
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_client import close_http_client
+from services.http_utils import post_json
+from services.rate_limit import set_rate_limiting
+
+
+def _run(label, server, calls, call):
+    server.reset_stats()
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    elapsed = time.perf_counter() - start
+    stats = server.stats
+    print(
+        f"{label:<18} calls={calls:<5} connections={stats['connections']:<5} "
+        f"total={elapsed * 1000:8.1f} ms  per_call={elapsed / calls * 1000:6.2f} ms"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    # Measure the transport only; the client-side rate limiter would pace the calls.
+    set_rate_limiting(False)
+    payload = {"prompt": "benchmark"}
+    headers = {"Content-Type": "application/json"}
+
+    with FakeBriaServer() as server:
+        url = f"{server.base_url}/v1/product/packshot"
+
+        _run(
+            "requests.post",
+            server,
+            args.calls,
+            lambda: requests.post(url, headers=headers, json=payload, timeout=10).json(),
+        )
+        close_http_client()
+        _run(
+            "pooled post_json",
+            server,
+            args.calls,
+            lambda: post_json(url, headers, payload, "Benchmark", timeout=10),
+        )
+        close_http_client()
+
+
+if __name__ == "__main__":
+    main()
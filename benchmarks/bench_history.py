@@ -0,0 +1,97 @@
+"""
+Time history page loads on a large SQLite history table.
+
+Fills a temporary database with --rows jobs spread over many sessions, SKUs
+and tabs, then times the first and a deep page for each filter, comparing
+keyset pagination with OFFSET paging over the same query.
+
+Run:
+    python -m benchmarks.bench_history --rows 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from workflows.history import HistoryStore, _row_to_entry
+from workflows.jobs import DONE, Job
+
+SOURCES = ["Generate Image", "Lifestyle Shot", "Generative Fill", "Erase Elements", "Create Packshot", "Add Shadow"]
+PAGE_SIZE = 20
+
+
+def fill(store, rows, sessions):
+    rng = random.Random(0)
+    conn = store._conn()
+    with conn:
+        for i in range(rows):
+            job = Job(
+                id=f"{i:08d}",
+                label="Job",
+                source=rng.choice(SOURCES),
+                owner=f"session{rng.randrange(sessions)}",
+                state=DONE,
+                urls=[f"https://example.com/{i}.png"],
+                meta={"params": {"sku": f"SKU-{rng.randrange(rows // 10 or 1)}", "num_results": 1}},
+                created_at=1_700_000_000 + i,
+                started_at=1_700_000_000 + i,
+                finished_at=1_700_000_003 + i,
+            )
+            store.save(job)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def offset_page(store, where, args, offset):
+    rows = store._conn().execute(
+        f"SELECT * FROM jobs {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+        (*args, PAGE_SIZE, offset),
+    ).fetchall()
+    return [_row_to_entry(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--depth", type=int, default=1000, help="page number for the deep-page timing")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+        start = time.perf_counter()
+        fill(store, args.rows, args.sessions)
+        print(f"inserted {args.rows} rows in {time.perf_counter() - start:.1f} s")
+
+        filters = {
+            "all": {},
+            "session": {"session_id": "session0"},
+            "source": {"source": SOURCES[0]},
+        }
+        for name, kwargs in filters.items():
+            first = best_of(lambda: store.page(limit=PAGE_SIZE, **kwargs), args.repeat)
+            cursor = None
+            for _ in range(args.depth):
+                cursor = store.page(limit=PAGE_SIZE, before=cursor, **kwargs).next_cursor
+            deep = best_of(lambda: store.page(limit=PAGE_SIZE, before=cursor, **kwargs), args.repeat)
+            where = " AND ".join(f"{column} = ?" for column in kwargs)
+            where = f"WHERE {where}" if where else ""
+            offset = best_of(lambda: offset_page(store, where, list(kwargs.values()), args.depth * PAGE_SIZE), args.repeat)
+            print(
+                f"{name:8s} first page={first * 1000:6.2f} ms  "
+                f"page {args.depth}: keyset={deep * 1000:6.2f} ms  offset={offset * 1000:6.2f} ms"
+            )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Time and peak memory of parsing API response bodies: json.loads, JSONStreamParser and ResponseParser.
+
+Two body shapes are measured at several sizes: structured JSON (many small
+result objects, like ordinary responses) and an echo (a result URL next to a
+large base64 image). json.loads wins on structured bodies by about 20x;
+streaming wins on echoes, whose image it never keeps. ResponseParser switches
+at STREAM_PARSE_MIN_BYTES, so it should track the faster column in each row.
+
+Run:
+    python -m benchmarks.bench_json_parse --repeat 3
+"""
+import argparse
+import base64
+import json
+import os
+import time
+import tracemalloc
+
+from services.http_utils import RESPONSE_CHUNK_SIZE
+from services.json_stream import STREAM_PARSE_MIN_BYTES, ResponseParser, load_json
+
+STRUCTURED_SIZES = (2_000, 100_000, 1_000_000)
+ECHO_SIZES = (100_000, 1_000_000, 5_000_000, 20_000_000)
+
+
+def structured_body(size):
+    item = {"urls": [f"https://cdn.example.com/r/{i}.png" for i in range(4)], "seed": 1234, "session_id": "s" * 16}
+    count = max(1, size // len(json.dumps(item)))
+    return json.dumps({"result": [item] * count}).encode("utf-8")
+
+
+def echo_body(size):
+    image = base64.b64encode(os.urandom(size * 3 // 4)).decode("ascii")
+    return json.dumps({"result_url": "https://cdn.example.com/r/0.png", "input": {"image_file": image}}).encode("utf-8")
+
+
+def chunked(raw):
+    return [raw[i:i + RESPONSE_CHUNK_SIZE] for i in range(0, len(raw), RESPONSE_CHUNK_SIZE)]
+
+
+def loads(chunks):
+    # What response.json() does: buffer the whole body, then parse it.
+    return json.loads(b"".join(chunks))
+
+
+def response_parser(chunks):
+    parser = ResponseParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
+
+
+def measure(fn, chunks, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(chunks)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(chunks)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"ResponseParser streams bodies over {STREAM_PARSE_MIN_BYTES / 1e6:.1f} MB")
+    print(f"{'body':<11}{'size':>9}  {'json.loads':>20}  {'JSONStreamParser':>20}  {'ResponseParser':>20}")
+    bodies = [("structured", structured_body, size) for size in STRUCTURED_SIZES]
+    bodies += [("echo", echo_body, size) for size in ECHO_SIZES]
+    for label, build, size in bodies:
+        raw = build(size)
+        chunks = chunked(raw)
+        cells = []
+        for fn in (loads, load_json, response_parser):
+            seconds, peak = measure(fn, chunks, args.repeat)
+            cells.append(f"{seconds * 1e3:8.2f} ms {peak / 1e6:6.1f} MB")
+        print(f"{label:<11}{len(raw) / 1e6:7.2f}MB  " + "  ".join(f"{cell:>20}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Time canvas -> binary mask PNG for 800 px canvases upscaled to 4K and 8K originals.
+
+Compares the previous pipeline (RGBA -> L, bicubic resize at full resolution,
+threshold, 8-bit PNG) with prepare_binary_mask_bytes (threshold at canvas
+resolution, nearest-neighbour upscale, 1-bit PNG), cold and cached, and with
+the canvas-resolution preview redrawn on every threshold slider change.
+
+Run:
+    python -m benchmarks.bench_mask_pipeline --repeat 3
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from utils.mask_utils import clear_mask_cache, mask_preview, prepare_binary_mask_bytes
+
+TARGETS = {"4K": (3840, 2160), "8K": (7680, 4320)}
+CANVAS_WIDTH = 800
+
+
+def legacy_mask(image_data, target_size, threshold=25, invert=False):
+    mask_img = Image.fromarray(image_data.astype("uint8"), mode="RGBA").convert("L")
+    mask_img = mask_img.resize(target_size)
+    arr = np.array(mask_img, dtype=np.uint8)
+    binary = (arr > int(threshold)).astype(np.uint8) * 255
+    if invert:
+        binary = 255 - binary
+    out_img = Image.fromarray(binary, mode="L")
+    out = io.BytesIO()
+    out_img.save(out, format="PNG")
+    return out.getvalue(), out_img
+
+
+def canvas_for(target_size):
+    """A transparent canvas with a few thick white strokes, like a drawn mask."""
+    width, height = target_size
+    size = (CANVAS_WIDTH, round(CANVAS_WIDTH * height / width))
+    img = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for i in range(6):
+        y = size[1] * (i + 1) // 7
+        draw.line([(40, y), (size[0] - 40, y + 30)], fill=(255, 255, 255, 255), width=35)
+    return np.array(img)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, target in TARGETS.items():
+        canvas = canvas_for(target)
+        legacy_time, (legacy_png, _) = best_of(lambda: legacy_mask(canvas, target), args.repeat)
+
+        def cold():
+            clear_mask_cache()
+            return prepare_binary_mask_bytes(canvas, target)
+
+        cold_time, (png, _) = best_of(cold, args.repeat)
+        cached_time, _ = best_of(lambda: prepare_binary_mask_bytes(canvas, target), args.repeat)
+
+        def preview():
+            clear_mask_cache()
+            return mask_preview(canvas, threshold=30)
+
+        preview_time, _ = best_of(preview, args.repeat)
+        print(
+            f"{label} {target[0]}x{target[1]} from {canvas.shape[1]}x{canvas.shape[0]}: "
+            f"legacy={legacy_time * 1000:7.1f} ms ({len(legacy_png) / 1024:6.1f} KiB)  "
+            f"numpy={cold_time * 1000:6.1f} ms ({len(png) / 1024:5.1f} KiB)  "
+            f"cached={cached_time * 1000:5.2f} ms  speedup={legacy_time / cold_time:4.1f}x  "
+            f"preview={preview_time * 1000:5.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measure peak memory spent building an upload body for a large image.
+
+Compares the previous path (base64 bytes -> str -> JSON str -> encoded body)
+with StreamingJSONBody, which encodes the image chunk by chunk while the body
+is read. The image itself is allocated before tracing starts, so the numbers
+are the overhead on top of holding one copy of the image.
+
+Run:
+    python -m benchmarks.bench_upload_memory --mb 20
+"""
+import argparse
+import base64
+import json
+import os
+import tracemalloc
+
+from services.request_body import Base64Source, StreamingJSONBody
+
+READ_BLOCK = 16 * 1024  # urllib3 reads request bodies in 16 KiB blocks
+
+
+def _payload(image):
+    return {"background_color": "#FFFFFF", "force_rmbg": False, "content_moderation": False, "file": image}
+
+
+def build_in_memory(image_data):
+    payload = _payload(base64.b64encode(image_data).decode("utf-8"))
+    return len(json.dumps(payload, allow_nan=False).encode("utf-8"))
+
+
+def build_streaming(image_data):
+    body = StreamingJSONBody(_payload(Base64Source(image_data)))
+    sent = 0
+    while True:
+        block = body.read(READ_BLOCK)
+        if not block:
+            return sent
+        sent += len(block)
+
+
+def measure(fn, image_data):
+    tracemalloc.start()
+    try:
+        sent = fn(image_data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return sent, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=float, default=20.0, help="Image size in MiB")
+    args = parser.parse_args()
+
+    image_data = os.urandom(int(args.mb * 1024 * 1024))
+    image_mib = len(image_data) / 2 ** 20
+    print(f"image size: {image_mib:.1f} MiB")
+    for label, fn in (("in-memory json", build_in_memory), ("streaming body", build_streaming)):
+        sent, peak = measure(fn, image_data)
+        print(
+            f"{label:<16} body={sent / 2 ** 20:7.1f} MiB  peak_extra={peak / 2 ** 20:7.2f} MiB "
+            f"({peak / len(image_data):.2f}x image)"
+        )
+
+
+if __name__ == "__main__":
+    main()
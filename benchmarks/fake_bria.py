@@ -0,0 +1,280 @@
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.adapters import HTTPAdapter
+
+BRIA_API_BASE = "https://engine.prod.bria-api.com"
+
+
+def sample_image(width=2048, height=2048, fmt="PNG", seed=0):
+    """
+    A decodable image of roughly incompressible noise, for large-response benchmarks.
+
+    A 2048x2048 RGB PNG is about 12 MB.
+    """
+    import numpy as np
+    from PIL import Image
+
+    pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(out, format=fmt)
+    return out.getvalue()
+
+
+def _result_body(endpoint, urls, payload):
+    """Response shaped like the real endpoint (see utils.result_utils and ui.lifestyle_tab)."""
+    if "lifestyle_shot_by_" in endpoint:
+        return {"result": [[url, 1000 + i, f"session-{i}"] for i, url in enumerate(urls)]}
+    if "text-to-image" in endpoint:
+        return {"result": [{"urls": [url], "seed": 1000 + i} for i, url in enumerate(urls)]}
+    if endpoint.endswith("gen_fill"):
+        return {"urls": urls}
+    if endpoint.endswith("prompt_enhancer"):
+        return {"prompt variations": f"{payload.get('prompt', '')}, studio lighting, high detail"}
+    return {"result_url": urls[0]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # One handler instance is created per TCP connection.
+        with self.server.stats_lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count_request(self):
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            if self.command in ("GET", "HEAD"):
+                self.server.stats[self.command] += 1
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_POST(self):
+        self._count_request()
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        try:
+            payload = json.loads(raw or b"null")
+        except ValueError:
+            payload = None
+        if self.server.keep_payloads:
+            self.server.last_payload = payload
+        with self.server.stats_lock:
+            self.server.idempotency_keys.append(self.headers.get("Idempotency-Key"))
+        parts = self.path.strip("/").split("/")
+        status = None
+        # /status/<code>/...: answer with <code> and a short Retry-After.
+        if len(parts) >= 3 and parts[0] == "status":
+            status = int(parts[1])
+        # /flaky/<n>/<code>/...: answer the first <n> calls with <code>, then succeed.
+        elif len(parts) >= 4 and parts[0] == "flaky":
+            with self.server.stats_lock:
+                seen = self.server.post_counts[self.path] = self.server.post_counts.get(self.path, 0) + 1
+            if seen <= int(parts[1]):
+                status = int(parts[2])
+        fake = self.server.fake
+        delay = fake.latency_for(self.path)
+        if delay > 0:
+            time.sleep(delay)
+        if status is None:
+            status = fake.injected_status()
+        if status is not None:
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Type", "application/json")
+            body = json.dumps({"message": f"injected status {status}"}).encode("utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        payload = payload if isinstance(payload, dict) else {}
+        host, port = self.server.server_address[:2]
+        count = max(1, int(payload.get("num_results") or 1))
+        # Non-sync generations return URLs that only turn 200 after async_delay.
+        prefix = f"async/{fake.async_delay}" if payload.get("sync") is False and fake.async_delay else "results"
+        request_id = next(fake.request_ids)
+        urls = [
+            f"http://{host}:{port}/{prefix}/{self.path.strip('/')}/{request_id}-{i}.png"
+            for i in range(count)
+        ]
+        body = json.dumps(_result_body(self.path.rstrip("/"), urls, payload))
+        self._send(200, body.encode("utf-8"))
+
+    def do_GET(self):
+        self._count_request()
+        parts = self.path.strip("/").split("/")
+        # /async/<seconds>/<name>: 404 until <seconds> after the first request.
+        if len(parts) >= 3 and parts[0] == "async":
+            with self.server.stats_lock:
+                first_seen = self.server.first_seen.setdefault(self.path, time.monotonic())
+            if time.monotonic() - first_seen < float(parts[1]):
+                self._send(404)
+                return
+        # /status/<code>/<name>: always answer with <code>.
+        elif len(parts) >= 3 and parts[0] == "status":
+            self._send(int(parts[1]))
+            return
+        self._send(200, self.server.image_bytes, content_type="image/png")
+
+    def do_HEAD(self):
+        self.do_GET()
+
+
+class _RedirectAdapter(HTTPAdapter):
+    def __init__(self, base_url):
+        super().__init__(pool_maxsize=32, max_retries=0)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + request.url[len(BRIA_API_BASE):]
+        return super().send(request, **kwargs)
+
+
+class FakeBriaServer:
+    """
+    Local stand-in for the Bria API used by benchmarks and tests.
+
+    POSTs answer with the response shape of the endpoint in the path and
+    num_results URLs. Optional behaviour:
+        latency: seconds added to every POST (plus up to jitter seconds),
+            or per endpoint via endpoint_latency {path suffix: seconds}
+        error_rate_429 / error_rate_5xx: probability that a POST is answered
+            with 429 / 503 (Retry-After: 0)
+        async_delay: result URLs of sync=False calls 404 for this long
+        image_bytes: body served for result URLs (see sample_image)
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        image_bytes=b"\x89PNG\r\n\x1a\n" + b"\0" * 1024,
+        keep_payloads=False,
+        latency=0.0,
+        jitter=0.0,
+        endpoint_latency=None,
+        error_rate_429=0.0,
+        error_rate_5xx=0.0,
+        async_delay=0.0,
+        seed=0,
+    ):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self.httpd.stats = {"connections": 0, "requests": 0, "GET": 0, "HEAD": 0}
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.image_bytes = image_bytes
+        self.httpd.first_seen = {}
+        self.httpd.keep_payloads = keep_payloads
+        self.httpd.last_payload = None
+        self.httpd.idempotency_keys = []
+        self.httpd.post_counts = {}
+        self.latency = latency
+        self.jitter = jitter
+        self.endpoint_latency = dict(endpoint_latency or {})
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.async_delay = async_delay
+        self.request_ids = itertools.count(1)
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._thread = None
+
+    def latency_for(self, path):
+        delay = self.latency
+        for suffix, seconds in self.endpoint_latency.items():
+            if path.rstrip("/").endswith(suffix):
+                delay = seconds
+        if self.jitter:
+            with self._random_lock:
+                delay += self._random.uniform(0, self.jitter)
+        return delay
+
+    def injected_status(self):
+        if not (self.error_rate_429 or self.error_rate_5xx):
+            return None
+        with self._random_lock:
+            roll = self._random.random()
+        if roll < self.error_rate_429:
+            return 429
+        if roll < self.error_rate_429 + self.error_rate_5xx:
+            return 503
+        return None
+
+    @contextmanager
+    def route_api(self):
+        """
+        Send the service wrappers' calls to engine.prod.bria-api.com to this server
+        instead, through the shared session used by post_json and downloads.
+        """
+        from services.http_client import close_http_client, get_session
+
+        session = get_session()
+        previous = session.adapters.get(BRIA_API_BASE + "/")
+        session.mount(BRIA_API_BASE + "/", _RedirectAdapter(self.base_url))
+        try:
+            yield self
+        finally:
+            if previous is not None:
+                # Nested use: hand the calls back to the outer server.
+                session.mount(BRIA_API_BASE + "/", previous)
+            else:
+                # The next call builds a fresh session with the normal adapters.
+                close_http_client()
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def last_payload(self):
+        return self.httpd.last_payload
+
+    @property
+    def idempotency_keys(self):
+        """Idempotency-Key header of every POST received, in order."""
+        with self.httpd.stats_lock:
+            return list(self.httpd.idempotency_keys)
+
+    @property
+    def stats(self):
+        with self.httpd.stats_lock:
+            return dict(self.httpd.stats)
+
+    def reset_stats(self):
+        with self.httpd.stats_lock:
+            self.httpd.stats.update(connections=0, requests=0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
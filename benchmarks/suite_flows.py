@@ -0,0 +1,209 @@
+"""
+End-to-end throughput and latency of each tab flow against the local fake Bria server.
+
+Every flow runs the same steps as its tab: the service call, result URL
+extraction, polling for async results, and downloading the images into an
+asset cache. The fake server adds API-like latency, serves large result
+images and, in the fault scenarios, answers some calls with 429 or 503.
+
+Run (results are saved as JSON under .benchmarks/):
+    python -m pytest benchmarks
+Compare against the previous run and fail on a regression:
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+"""
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.fake_bria import FakeBriaServer, sample_image
+from services import (
+    add_shadow,
+    create_packshot,
+    erase_foreground,
+    generate_hd_image,
+    generative_fill,
+    lifestyle_shot_by_image,
+    lifestyle_shot_by_text,
+)
+from services.asset_cache import AssetCache
+from services.polling import READY, poll_urls
+from services.rate_limit import set_rate_limiting
+from utils.result_utils import extract_result_urls
+from workflows.generate_ad_set import generate_ad_set
+from workflows.jobs import DONE, JobQueue, JobStore
+
+API_KEY = "benchmark-key"
+API_LATENCY = 0.05
+ASYNC_DELAY = 0.25
+ROUNDS = 5
+# Large enough that downloads are not free: a 1024x1024 noise PNG is about 3 MB.
+RESULT_SIZE = (1024, 1024)
+LIFESTYLE_URLS = partial(extract_result_urls, endpoint="lifestyle_shot_by_text")
+
+
+@pytest.fixture(scope="module")
+def server():
+    set_rate_limiting(False)
+    fake = FakeBriaServer(
+        image_bytes=sample_image(*RESULT_SIZE),
+        latency=API_LATENCY,
+        async_delay=ASYNC_DELAY,
+    )
+    with fake, fake.route_api():
+        yield fake
+    set_rate_limiting(True)
+
+
+@pytest.fixture(scope="module")
+def product():
+    return sample_image(512, 512, seed=1)
+
+
+@pytest.fixture(scope="module")
+def mask():
+    out = io.BytesIO()
+    Image.new("L", (512, 512), 255).save(out, format="PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AssetCache(root=str(tmp_path / "assets"))
+
+
+def _deliver(cache, result, extract=extract_result_urls, poll=False):
+    """Polling (for async calls) and downloads, as the tab and job queue do them."""
+    urls = extract(result)
+    assert urls, f"no result URL in {result!r}"
+    if poll:
+        # Polling prefetches ready results into the cache, as the job queue does.
+        urls = [r.url for r in poll_urls(urls, deadline=10, cache=cache) if r.state == READY]
+    return [cache.lookup(url) or cache.download(url) for url in urls]
+
+
+def _run(benchmark, flow, images):
+    benchmark.pedantic(flow, rounds=ROUNDS, iterations=1, warmup_rounds=1)
+    benchmark.extra_info["images_per_call"] = images
+    benchmark.extra_info["images_per_second"] = images / benchmark.stats.stats.mean
+
+
+def test_generate_tab(benchmark, server, cache):
+    flow = lambda: _deliver(cache, generate_hd_image(prompt="a red sneaker", api_key=API_KEY, num_results=1, sync=True))
+    _run(benchmark, flow, 1)
+
+
+def test_packshot_tab(benchmark, server, cache, product):
+    flow = lambda: _deliver(cache, create_packshot(api_key=API_KEY, image_data=product))
+    _run(benchmark, flow, 1)
+
+
+def test_shadow_tab(benchmark, server, cache, product):
+    flow = lambda: _deliver(cache, add_shadow(api_key=API_KEY, image_data=product, shadow_type="natural"))
+    _run(benchmark, flow, 1)
+
+
+def test_lifestyle_text_tab(benchmark, server, cache, product):
+    flow = lambda: _deliver(
+        cache,
+        lifestyle_shot_by_text(api_key=API_KEY, image_data=product, scene_description="on a beach", num_results=4),
+        extract=LIFESTYLE_URLS,
+        poll=True,
+    )
+    _run(benchmark, flow, 4)
+
+
+def test_lifestyle_image_tab(benchmark, server, cache, product):
+    flow = lambda: _deliver(
+        cache,
+        lifestyle_shot_by_image(api_key=API_KEY, image_data=product, reference_image=product, num_results=4),
+        extract=LIFESTYLE_URLS,
+        poll=True,
+    )
+    _run(benchmark, flow, 4)
+
+
+def test_fill_tab(benchmark, server, cache, product, mask):
+    flow = lambda: _deliver(
+        cache,
+        generative_fill(api_key=API_KEY, image_data=product, mask_data=mask, prompt="a vase", num_results=4),
+        poll=True,
+    )
+    _run(benchmark, flow, 4)
+
+
+def test_erase_tab(benchmark, server, cache, product):
+    flow = lambda: _deliver(cache, erase_foreground(api_key=API_KEY, image_data=product))
+    _run(benchmark, flow, 1)
+
+
+@pytest.mark.parametrize("mode", ["parallel", "sequential"])
+def test_generate_ad_set(benchmark, server, product, mode):
+    config = {
+        "create_packshot": True,
+        "add_shadow": True,
+        "lifestyle_shot": True,
+        "scene_description": "on a marble table",
+        "num_results": 1,
+        "execution_mode": mode,
+    }
+
+    def flow():
+        result = generate_ad_set(API_KEY, image=product, config=config)
+        assert not result["errors"], result["errors"]
+
+    _run(benchmark, flow, 3)
+
+
+def test_generate_ad_set_with_faults(benchmark, product):
+    """A fifth of the calls are throttled or fail, and are retried by post_json."""
+    set_rate_limiting(False)
+    fake = FakeBriaServer(latency=API_LATENCY, error_rate_429=0.1, error_rate_5xx=0.1, seed=7)
+    config = {"create_packshot": True, "add_shadow": True, "lifestyle_shot": True, "scene_description": "studio"}
+
+    def flow():
+        result = generate_ad_set(API_KEY, image=product, config=config)
+        assert not result["errors"], result["errors"]
+
+    with fake, fake.route_api():
+        _run(benchmark, flow, 3)
+    benchmark.extra_info["api_requests"] = fake.stats["requests"]
+    set_rate_limiting(True)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_job_queue_throughput(benchmark, server, product, workers):
+    """Concurrent lifestyle jobs, as when several sessions submit at once."""
+    jobs = 8
+    call = partial(lifestyle_shot_by_text, api_key=API_KEY, image_data=product, scene_description="garden", num_results=2)
+
+    def flow():
+        queue = JobQueue(JobStore(), max_workers=workers, poll_deadline=10)
+        try:
+            ids = [
+                queue.submit(call, "Lifestyle", "lifestyle", "bench", poll=True, extract=LIFESTYLE_URLS)
+                for _ in range(jobs)
+            ]
+        finally:
+            queue.shutdown(wait=True)
+        assert all(queue.get(job_id).state == DONE for job_id in ids), [queue.get(j).error for j in ids]
+
+    _run(benchmark, flow, jobs * 2)
+
+
+def test_result_downloads(benchmark, server, cache):
+    """Parallel downloads of freshly generated (uncached) result images."""
+    base = server.base_url
+
+    def flow():
+        stamp = time.monotonic_ns()
+        urls = [f"{base}/results/download/{stamp}-{i}.png" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(cache.download, urls))
+
+    _run(benchmark, flow, 8)
@@ -0,0 +1,62 @@
+"""
+Cold-start cost of the app: `import app` in a fresh interpreter, profiled with -X importtime.
+
+Each round starts a new Python process, so nothing is shared with earlier
+rounds (or with this process). The run fails when the import takes longer
+than IMPORT_BUDGET or when a module that should load lazily is imported at
+startup; the slowest imports are saved in the benchmark JSON.
+
+Run:
+    python -m pytest benchmarks -k startup
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUNDS = 5
+# Seconds for `import app`, Streamlit itself (about a quarter second) included.
+IMPORT_BUDGET = 1.0
+# Loaded on first use only: NumPy/Pillow with the first image, the canvas
+# component with the first fill/erase canvas, httpx with the async services.
+LAZY_MODULES = ("numpy", "PIL.Image", "streamlit_drawable_canvas", "httpx")
+TOP_IMPORTS = 10
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _profile_import():
+    """[(module, self seconds, cumulative seconds, depth)] for `import app`, and the lazy modules it loaded."""
+    check = f"import sys, app; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            own, total, indent, name = match.groups()
+            rows.append((name, int(own) / 1e6, int(total) / 1e6, len(indent) // 2))
+    loaded = [m for m in proc.stdout.strip().split(",") if m]
+    return rows, loaded
+
+
+def test_import_app(benchmark):
+    profiles = []
+    benchmark.pedantic(lambda: profiles.append(_profile_import()), rounds=ROUNDS, iterations=1)
+    rows, loaded = profiles[-1]
+    seconds = min(next(total for name, _, total, _ in rows if name == "app") for rows, _ in profiles)
+    top = sorted((row for row in rows if row[3] <= 1), key=lambda row: row[2], reverse=True)
+    benchmark.extra_info["import_app_seconds"] = seconds
+    benchmark.extra_info["top_imports"] = {name: round(total, 4) for name, _, total, _ in top[:TOP_IMPORTS]}
+    assert not loaded, f"imported at startup: {loaded}"
+    assert seconds <= IMPORT_BUDGET, f"import app took {seconds:.2f}s (budget {IMPORT_BUDGET}s)"
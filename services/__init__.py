@@ -1,10 +1,16 @@
-from .lifestyle_shot import lifestyle_shot_by_text, lifestyle_shot_by_image
-from .shadow import add_shadow
-from .packshot import create_packshot
-from .prompt_enhancement import enhance_prompt
-from .generative_fill import generative_fill
-from .hd_image_generation import generate_hd_image
-from .erase_foreground import erase_foreground
+from .lifestyle_shot import (
+    lifestyle_shot_by_text,
+    lifestyle_shot_by_image,
+    alifestyle_shot_by_text,
+    alifestyle_shot_by_image,
+)
+from .shadow import add_shadow, aadd_shadow
+from .packshot import create_packshot, acreate_packshot
+from .prompt_enhancement import enhance_prompt, aenhance_prompt
+from .generative_fill import generative_fill, agenerative_fill
+from .hd_image_generation import generate_hd_image, agenerate_hd_image
+from .erase_foreground import erase_foreground, aerase_foreground
+from .errors import BriaAPIError, RateLimited, ServerError, Rejected422, NetworkError, NetworkTimeout
 
 __all__ = [
     'lifestyle_shot_by_text',
@@ -14,5 +20,19 @@ __all__ = [
     'enhance_prompt',
     'generative_fill',
     'generate_hd_image',
-    'erase_foreground'
+    'erase_foreground',
+    'alifestyle_shot_by_text',
+    'alifestyle_shot_by_image',
+    'aadd_shadow',
+    'acreate_packshot',
+    'aenhance_prompt',
+    'agenerative_fill',
+    'agenerate_hd_image',
+    'aerase_foreground',
+    'BriaAPIError',
+    'RateLimited',
+    'ServerError',
+    'Rejected422',
+    'NetworkError',
+    'NetworkTimeout'
 ] 
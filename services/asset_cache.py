@@ -0,0 +1,288 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+from .http_client import build_timeout, get_session
+from .metrics import record_cache_eviction, record_cache_lookup, record_download
+from .tracing import span
+
+DEFAULT_CACHE_DIR = os.getenv("ADFORGE_ASSET_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "adforge_assets")
+DEFAULT_MAX_BYTES = int(os.getenv("ADFORGE_ASSET_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """
+    Content-addressed on-disk cache for downloaded result images.
+
+    Objects are stored once per sha256 content digest under ``objects/`` and
+    URLs map to digests through small index files under ``urls/``. Writes go
+    to a temporary file and are published with ``os.replace`` so readers never
+    see partial files. The total size of stored objects is capped and the
+    least recently used objects are evicted first.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._objects_dir = os.path.join(self.root, "objects")
+        self._urls_dir = os.path.join(self.root, "urls")
+        os.makedirs(self._objects_dir, exist_ok=True)
+        os.makedirs(self._urls_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        found = []
+        for name in os.listdir(self._objects_dir):
+            path = os.path.join(self._objects_dir, name)
+            if name.startswith(".tmp"):
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                continue
+            with contextlib.suppress(OSError):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name, stat.st_size))
+        for _, digest, size in sorted(found):
+            self._entries[digest] = size
+            self._total_bytes += size
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects_dir, digest)
+
+    def _url_path(self, url):
+        return os.path.join(self._urls_dir, _url_key(url))
+
+    def _digest_for(self, url):
+        try:
+            with open(self._url_path(url), "r", encoding="ascii") as f:
+                digest = f.read().strip()
+        except OSError:
+            return None
+        return digest if digest in self._entries else None
+
+    def _write_atomic(self, directory, final_path, data):
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def _touch(self, digest):
+        self._entries.move_to_end(digest)
+        with contextlib.suppress(OSError):
+            os.utime(self._object_path(digest))
+
+    def _publish(self, url, digest, size, tmp_path):
+        with self._lock:
+            if digest in self._entries:
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, self._object_path(digest))
+                self._entries[digest] = size
+                self._total_bytes += size
+            self._touch(digest)
+            self._write_atomic(self._urls_dir, self._url_path(url), digest.encode("ascii"))
+            self._evict(keep=digest)
+        return digest
+
+    def _evict(self, keep=None):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            digest, size = next(iter(self._entries.items()))
+            if digest == keep:
+                self._entries.move_to_end(digest)
+                digest, size = next(iter(self._entries.items()))
+            del self._entries[digest]
+            self._total_bytes -= size
+            self.evictions += 1
+            record_cache_eviction()
+            with contextlib.suppress(OSError):
+                os.remove(self._object_path(digest))
+
+    def contains(self, url: str) -> bool:
+        """Return True if the URL is cached, without touching counters or LRU order."""
+        with self._lock:
+            return self._digest_for(url) is not None
+
+    def path_for(self, url: str) -> Optional[str]:
+        """Local path of a cached URL, without touching counters or LRU order (for bookkeeping)."""
+        with self._lock:
+            digest = self._digest_for(url)
+            return None if digest is None else self._object_path(digest)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Return the local path for a cached URL, counting a hit or a miss."""
+        with self._lock:
+            digest = self._digest_for(url)
+            if digest is None:
+                self.misses += 1
+                record_cache_lookup(hit=False)
+                return None
+            self.hits += 1
+            record_cache_lookup(hit=True)
+            self._touch(digest)
+            return self._object_path(digest)
+
+    def _open(self, url):
+        """Open the cached file for a URL, or None on a miss."""
+        path = self.lookup(url)
+        if path is None:
+            return None
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            # Evicted by another thread between lookup and open: count it as a miss.
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+            record_cache_lookup(hit=False)
+            return None
+
+    def put(self, url: str, data: bytes) -> str:
+        """Store bytes for a URL and return their content digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=self._objects_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            return self._publish(url, digest, len(data), tmp_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def _save(self, url, response, start, download_span):
+        """Stream a successful response straight to disk, hashing as it goes; return the digest."""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=self._objects_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+        record_download(url, time.monotonic() - start, size)
+        download_span.set(bytes=size)
+        return self._publish(url, hasher.hexdigest(), size, tmp_path)
+
+    def download(self, url: str, timeout: float = 30) -> str:
+        """Stream a URL straight to disk and return its local path."""
+        with span("download") as download_span:
+            start = time.monotonic()
+            response = get_session().get(url, timeout=build_timeout(timeout), stream=True)
+            try:
+                response.raise_for_status()
+                digest = self._save(url, response, start, download_span)
+            finally:
+                response.close()
+        return self._object_path(digest)
+
+    def prefetch(self, url: str, timeout: float = 30) -> int:
+        """
+        Try to download a result that may not exist yet and return the status code.
+
+        An async result URL answers 404 until it is ready; any status but 200
+        leaves the cache untouched so the caller can retry later. A URL that
+        is already cached answers 200 without a request.
+        """
+        if self.contains(url):
+            return 200
+        with span("download", prefetch=True) as download_span:
+            start = time.monotonic()
+            response = get_session().get(url, timeout=build_timeout(timeout), stream=True)
+            try:
+                download_span.set(status=response.status_code)
+                if response.status_code != 200:
+                    # Read the short error body so the connection goes back to the pool.
+                    response.content
+                    return response.status_code
+                self._save(url, response, start, download_span)
+            finally:
+                response.close()
+        return 200
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _map(f):
+        # An open file stays readable even if the object is evicted meanwhile.
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    @contextlib.contextmanager
+    def open_view(self, url: str) -> Iterator[Optional[memoryview]]:
+        """Yield a read-only memoryview over the cached file (mmap-backed), or None."""
+        f = self._open(url)
+        if f is None:
+            yield None
+            return
+        with self._map(f) as view:
+            yield view
+
+    def read(self, url: str) -> Optional[bytes]:
+        """Return cached bytes for a URL, or None on a miss."""
+        with self.open_view(url) as view:
+            return None if view is None else bytes(view)
+
+    def fetch(self, url: str, timeout: float = 30) -> bytes:
+        """Return bytes for a URL, downloading and caching them on a miss."""
+        f = self._open(url) or open(self.download(url, timeout=timeout), "rb")
+        with self._map(f) as view:
+            return bytes(view)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache: Optional[AssetCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_asset_cache() -> AssetCache:
+    """Return the process-wide asset cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AssetCache()
+    return _cache
@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import threading
+import time
+import uuid
+import weakref
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Optional
+
+from .errors import BriaAPIError, NetworkError, NetworkTimeout
+from .http_client import build_timeout
+from .http_utils import (
+    DEFAULT_RETRY_POLICY,
+    RESPONSE_CHUNK_SIZE,
+    record_response,
+    response_error,
+    retry_or_raise,
+)
+from .hub import get_hub
+from .json_stream import ResponseParser
+from .metrics import record_attempt, record_call
+from .rate_limit import endpoint_name, get_limiter, rate_limiting_enabled
+from .request_body import StreamingJSONBody, has_streamed_fields
+from .tracing import span
+from .result_cache import make_cache_key
+
+if TYPE_CHECKING:
+    import httpx
+
+# One event loop multiplexes many generations, so allow far more sockets than
+# the thread-bound sync pool.
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 32
+
+_lock = threading.Lock()
+# httpx clients are bound to the loop they were first used on.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_config = {
+    "max_connections": DEFAULT_MAX_CONNECTIONS,
+    "max_keepalive": DEFAULT_MAX_KEEPALIVE,
+}
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Return the shared AsyncClient for the running event loop, creating it on first use."""
+    # httpx is imported on first async use; the Streamlit app never needs it.
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            client = _clients[loop] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=_config["max_connections"],
+                    max_keepalive_connections=_config["max_keepalive"],
+                ),
+            )
+    return client
+
+
+def configure_async_client(max_connections: Optional[int] = None, max_keepalive: Optional[int] = None) -> None:
+    """Update pool limits; clients created after this call pick them up."""
+    with _lock:
+        if max_connections is not None:
+            _config["max_connections"] = max_connections
+        if max_keepalive is not None:
+            _config["max_keepalive"] = max_keepalive
+
+
+async def close_async_client() -> None:
+    """Close the running loop's client. A new one is created on next use."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def _timeout(read_timeout):
+    import httpx
+
+    connect, read = build_timeout(read_timeout)
+    return httpx.Timeout(read, connect=connect)
+
+
+async def _stream(body):
+    for chunk in body:
+        yield chunk
+
+
+def _network_error(exc, operation_name, latency, attempts, idempotent):
+    import httpx
+
+    message = f"{operation_name} failed: network error ({str(exc) or type(exc).__name__})"
+    kwargs = dict(operation=operation_name, latency=latency, attempts=attempts)
+    if isinstance(exc, (httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return NetworkTimeout(message, retryable=True, **kwargs)
+    if isinstance(exc, httpx.TimeoutException):
+        return NetworkTimeout(message, retryable=idempotent, **kwargs)
+    if isinstance(exc, httpx.TransportError):
+        return NetworkError(message, **kwargs)
+    return BriaAPIError(message, **kwargs)
+
+
+async def apost_json(url, headers, payload, operation_name, timeout=60, cacheable=False, retry=None):
+    """
+    Async counterpart of post_json, sent through the shared AsyncClient.
+
+    Caching, single-flight, retries, typed errors and rate limiting behave as
+    in post_json; waits use asyncio.sleep so the event loop keeps serving other
+    calls.
+    """
+    cache_key = make_cache_key(url, payload) if cacheable else None
+    with span("api.call", operation=operation_name, endpoint=endpoint_name(url)):
+        return await get_hub().acall(
+            cache_key,
+            lambda: _asend(url, headers, payload, operation_name, timeout, cacheable, retry or DEFAULT_RETRY_POLICY),
+        )
+
+
+async def _asend(url, headers, payload, operation_name, timeout, cacheable, policy):
+    import httpx
+
+    headers = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    limiter = get_limiter(headers.get("api_token"), url) if rate_limiting_enabled() else None
+    streamed = has_streamed_fields(payload)
+    client = get_async_client()
+    start = time.monotonic()
+    attempt = 0
+
+    while True:
+        attempt += 1
+        if streamed:
+            body = StreamingJSONBody(payload)
+            request_headers = {**headers, "Content-Length": str(len(body))}
+            content = {"content": _stream(body)}
+        else:
+            request_headers = headers
+            content = {"json": payload}
+        try:
+            with span("api.attempt", attempt=attempt) as attempt_span:
+                async with limiter.aslot() if limiter else nullcontext():
+                    request = client.build_request("POST", url, headers=request_headers, timeout=_timeout(timeout), **content)
+                    sent = time.monotonic()
+                    # Streamed so the headers can be timed before the body is read.
+                    response = await client.send(request, stream=True)
+                    ttfb = time.monotonic() - sent
+                    invalid = None
+                    try:
+                        if response.is_success:
+                            # json.loads for ordinary bodies; large ones (echoed base64 images) are parsed as they download.
+                            parser = ResponseParser()
+                            try:
+                                async for chunk in response.aiter_bytes(RESPONSE_CHUNK_SIZE):
+                                    parser.feed(chunk)
+                                result = parser.close()
+                            except ValueError as e:
+                                invalid = e
+                            response_bytes = parser.bytes_read
+                        else:
+                            response_bytes = len(await response.aread())
+                    finally:
+                        await response.aclose()
+                attempt_span.set(status=response.status_code)
+            record_response(
+                url,
+                response,
+                limiter,
+                ttfb=ttfb,
+                upload_bytes=len(body) if streamed else len(request.content),
+                response_bytes=response_bytes,
+            )
+            error = response_error(response, response.is_success, invalid, operation_name, start, attempt)
+            if error is None:
+                break
+        except httpx.HTTPError as e:
+            record_attempt(url, "network")
+            error = _network_error(e, operation_name, time.monotonic() - start, attempt, idempotent=cacheable)
+            error.__cause__ = e
+
+        await asyncio.sleep(retry_or_raise(url, error, attempt, policy, limiter, start))
+
+    record_call(url, time.monotonic() - start, attempt, "ok")
+    return result
+
+
+def async_call(build, name):
+    """Make the async wrapper for a request builder (see blocking_call)."""
+    @functools.wraps(build)
+    async def call(*args, **kwargs):
+        # Image prep (decode, resize, re-encode, digest) is CPU-bound; keep it off the event loop.
+        with span("api.prepare", operation=name):
+            request = await asyncio.to_thread(build, *args, **kwargs)
+        return await apost_json(**request)
+
+    call.__name__ = call.__qualname__ = name
+    return call
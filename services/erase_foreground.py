@@ -1,8 +1,11 @@
 from typing import Dict, Any, Optional
-import base64
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
+from .image_prep import prepare_image
+from .request_body import as_base64_source
 
-def erase_foreground(
+# Builds the post_json arguments shared by erase_foreground and aerase_foreground
+def _erase_foreground_request(
     api_key: str,
     image_data: bytes = None,
     image_url: str = None,
@@ -34,11 +37,11 @@ def erase_foreground(
     if image_url:
         data['image_url'] = image_url
     elif image_data:
-        data['file'] = base64.b64encode(image_data).decode('utf-8')
+        data['file'] = as_base64_source(prepare_image(image_data, "erase_foreground").data)
     else:
         raise ValueError("Either image_data or image_url must be provided")
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
@@ -46,5 +49,8 @@ def erase_foreground(
         timeout=60
     )
 
+erase_foreground = blocking_call(_erase_foreground_request, "erase_foreground")
+aerase_foreground = async_call(_erase_foreground_request, "aerase_foreground")
+
 # Export the function
-__all__ = ['erase_foreground'] 
+__all__ = ['erase_foreground', 'aerase_foreground'] 
@@ -0,0 +1,78 @@
+from typing import Any, Optional
+
+
+class BriaAPIError(Exception):
+    """
+    Base class for failed Bria API calls.
+
+    Attributes:
+        operation: Human-readable operation name, e.g. "Packshot creation"
+        status_code: HTTP status, or None when no response was received
+        latency: Seconds spent on the call, including retries
+        attempts: Number of attempts made
+        details: Error message extracted from the response body, if any
+    """
+    retryable = False
+
+    def __init__(
+        self,
+        message: str,
+        operation: Optional[str] = None,
+        status_code: Optional[int] = None,
+        latency: Optional[float] = None,
+        attempts: int = 1,
+        details: Any = None,
+    ):
+        super().__init__(message)
+        self.operation = operation
+        self.status_code = status_code
+        self.latency = latency
+        self.attempts = attempts
+        self.details = details
+
+
+class RateLimited(BriaAPIError):
+    """429: quota exceeded. retry_after holds the server hint in seconds, if given."""
+    retryable = True
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class ServerError(BriaAPIError):
+    """5xx: the service failed or is temporarily unavailable."""
+    retryable = True
+
+
+class Rejected422(BriaAPIError):
+    """422: the request was understood but rejected (prompt, mask or settings)."""
+
+
+class NetworkError(BriaAPIError):
+    """No usable response: connection refused, reset, DNS failure."""
+    retryable = True
+
+
+class NetworkTimeout(NetworkError):
+    """
+    The call timed out.
+
+    Connect timeouts are always safe to retry. Read timeouts are only retried
+    for idempotent calls, because the request may already have been accepted.
+    """
+
+    def __init__(self, message: str, retryable: bool = True, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retryable = retryable
+
+
+def error_for_status(status_code: int):
+    """Return the exception class matching an HTTP error status."""
+    if status_code == 429:
+        return RateLimited
+    if status_code == 422:
+        return Rejected422
+    if status_code >= 500:
+        return ServerError
+    return BriaAPIError
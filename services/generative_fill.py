@@ -1,8 +1,11 @@
 from typing import Dict, Any, Optional
-import base64
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
+from .image_prep import prepare_image, resize_mask
+from .request_body import as_base64_source
 
-def generative_fill(
+# Builds the post_json arguments shared by generative_fill and agenerative_fill
+def _generative_fill_request(
     api_key: str,
     image_data: bytes,
     mask_data: bytes,
@@ -37,9 +40,14 @@ def generative_fill(
         'Content-Type': 'application/json'
     }
     
-    # Convert image and mask to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-    mask_base64 = base64.b64encode(mask_data).decode('utf-8')
+    # Downscale/strip metadata without rotating pixels, so the drawn mask still lines up
+    prepared = prepare_image(image_data, "gen_fill", apply_orientation=False)
+    if prepared.resized:
+        mask_data = resize_mask(mask_data, prepared.size)
+
+    # Wrap image and mask for chunked base64 encoding while the body streams
+    image_base64 = as_base64_source(prepared.data)
+    mask_base64 = as_base64_source(mask_data)
     
     # Prepare request data
     data = {
@@ -58,10 +66,14 @@ def generative_fill(
     if seed is not None:
         data['seed'] = seed
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
         operation_name="Generative fill",
         timeout=60
     )
+
+
+generative_fill = blocking_call(_generative_fill_request, "generative_fill")
+agenerative_fill = async_call(_generative_fill_request, "agenerative_fill")
@@ -1,7 +1,9 @@
 from typing import Dict, Any, Optional
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
 
-def generate_hd_image(
+# Builds the post_json arguments shared by generate_hd_image and agenerate_hd_image
+def _hd_image_request(
     prompt: str,
     api_key: str,
     model_version: str = "2.2",
@@ -76,10 +78,15 @@ def generate_hd_image(
         'Content-Type': 'application/json'
     }
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
         operation_name="HD image generation",
-        timeout=60
+        timeout=60,
+        cacheable=seed is not None
     )
+
+
+generate_hd_image = blocking_call(_hd_image_request, "generate_hd_image")
+agenerate_hd_image = async_call(_hd_image_request, "agenerate_hd_image")
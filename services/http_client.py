@@ -0,0 +1,119 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BRIA_API_HOST = "engine.prod.bria-api.com"
+
+# Connect timeout stays short so a dead host fails fast; the read timeout is
+# supplied per call because generation endpoints can take up to a minute.
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 60.0
+
+# Number of distinct hosts whose pools are kept, and connections kept per host.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Hosts that carry most of the traffic get a larger dedicated pool.
+DEFAULT_HOST_POOL_SIZES = {
+    BRIA_API_HOST: 32,
+}
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_config = {
+    "pool_connections": DEFAULT_POOL_CONNECTIONS,
+    "pool_maxsize": DEFAULT_POOL_MAXSIZE,
+    "pool_block": False,
+    "host_pool_sizes": dict(DEFAULT_HOST_POOL_SIZES),
+    "connect_timeout": DEFAULT_CONNECT_TIMEOUT,
+}
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+
+    default_adapter = HTTPAdapter(
+        pool_connections=_config["pool_connections"],
+        pool_maxsize=_config["pool_maxsize"],
+        pool_block=_config["pool_block"],
+        max_retries=0,
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    # Longer mount prefixes win, so these take precedence over the defaults.
+    for host, size in _config["host_pool_sizes"].items():
+        host_adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=size,
+            pool_block=_config["pool_block"],
+            max_retries=0,
+        )
+        session.mount(f"https://{host}/", host_adapter)
+        session.mount(f"http://{host}/", host_adapter)
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure_http_client(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+    host_pool_sizes: Optional[Dict[str, int]] = None,
+    connect_timeout: Optional[float] = None,
+) -> None:
+    """
+    Update pool sizing and timeouts for the shared client.
+
+    The current session is closed and rebuilt lazily on the next request.
+
+    Args:
+        pool_connections: Number of per-host pools kept by the default adapter
+        pool_maxsize: Connections kept alive per host by the default adapter
+        pool_block: Block instead of opening extra connections when a pool is full
+        host_pool_sizes: Mapping of host name to a dedicated pool size
+        connect_timeout: Connect timeout in seconds applied to every call
+    """
+    global _session
+    with _lock:
+        if pool_connections is not None:
+            _config["pool_connections"] = pool_connections
+        if pool_maxsize is not None:
+            _config["pool_maxsize"] = pool_maxsize
+        if pool_block is not None:
+            _config["pool_block"] = pool_block
+        if host_pool_sizes is not None:
+            _config["host_pool_sizes"] = dict(host_pool_sizes)
+        if connect_timeout is not None:
+            _config["connect_timeout"] = connect_timeout
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def close_http_client() -> None:
+    """Close all pooled connections. A new session is created on next use."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def build_timeout(read_timeout: Optional[float] = None) -> Tuple[float, float]:
+    """Return a (connect, read) timeout tuple for requests."""
+    if read_timeout is None:
+        read_timeout = DEFAULT_READ_TIMEOUT
+    return (min(_config["connect_timeout"], read_timeout), read_timeout)
@@ -1,23 +1,241 @@
+import functools
+import time
+import uuid
+from contextlib import nullcontext
+from dataclasses import dataclass
+
 import requests
 
+from .errors import BriaAPIError, NetworkError, NetworkTimeout, RateLimited, error_for_status
+from .http_client import build_timeout, get_session
+from .hub import get_hub
+from .json_stream import ResponseParser
+from .metrics import record_attempt, record_call
+from .polling import backoff_delay
+from .rate_limit import THROTTLE_STATUSES, endpoint_name, get_limiter, parse_retry_after, rate_limiting_enabled
+from .request_body import StreamingJSONBody, has_streamed_fields
+from .tracing import span
+from .result_cache import make_cache_key
+
+
+@dataclass
+class RetryPolicy:
+    """How transient failures (429, 5xx, network) are retried."""
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    # Upper bound on total time spent on one call, including waits between attempts.
+    budget_seconds: float = 30.0
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+# Response bodies are read and parsed in pieces of this size.
+RESPONSE_CHUNK_SIZE = 64 * 1024
+NO_RETRY = RetryPolicy(max_attempts=1)
 
-def post_json(url, headers, payload, operation_name, timeout=60):
-    """POST JSON and raise a consistent, user-readable exception on failure."""
+
+def _error_details(response):
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=timeout)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as e:
-        status_code = e.response.status_code if e.response is not None else "unknown"
-        details = ""
-        if e.response is not None:
+        body = response.json()
+        return body.get("message") or body.get("error") or str(body)
+    except Exception:
+        return response.text or ""
+
+
+def http_error(response, operation_name, latency, attempts):
+    """Typed error for a non-success response (requests or httpx)."""
+    status_code = response.status_code
+    details = _error_details(response)
+    message = f"{operation_name} failed (status={status_code})"
+    if details:
+        message += f": {details}"
+    kwargs = dict(
+        operation=operation_name,
+        status_code=status_code,
+        latency=latency,
+        attempts=attempts,
+        details=details,
+    )
+    error_cls = error_for_status(status_code)
+    if error_cls is RateLimited:
+        return RateLimited(message, retry_after=parse_retry_after(response.headers.get("Retry-After")), **kwargs)
+    return error_cls(message, **kwargs)
+
+
+def _network_error(exc, operation_name, latency, attempts, idempotent):
+    message = f"{operation_name} failed: network error ({str(exc)})"
+    kwargs = dict(operation=operation_name, latency=latency, attempts=attempts)
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return NetworkTimeout(message, retryable=True, **kwargs)
+    if isinstance(exc, requests.exceptions.Timeout):
+        return NetworkTimeout(message, retryable=idempotent, **kwargs)
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return NetworkError(message, **kwargs)
+    return BriaAPIError(message, **kwargs)
+
+
+def retry_delay(error, attempt, policy, limiter, start):
+    """Seconds to wait before the next attempt, or None when the error should be raised."""
+    if not error.retryable or attempt >= policy.max_attempts:
+        return None
+    if isinstance(error, RateLimited) and limiter:
+        # The limiter already holds callers back for Retry-After.
+        delay = 0.0
+    elif isinstance(error, RateLimited) and error.retry_after is not None:
+        delay = error.retry_after
+    else:
+        delay = backoff_delay(attempt, policy.base_delay, policy.max_delay)
+    if time.monotonic() - start + delay > policy.budget_seconds:
+        return None
+    return delay
+
+
+def _invalid_json_error(response, operation_name, latency, attempts):
+    return BriaAPIError(
+        f"{operation_name} failed: invalid JSON response",
+        operation=operation_name,
+        status_code=response.status_code,
+        latency=latency,
+        attempts=attempts,
+    )
+
+
+def record_response(url, response, limiter, ttfb, upload_bytes, response_bytes):
+    """Metrics and rate-limiter feedback for one attempt that got a response (requests or httpx)."""
+    record_attempt(url, response.status_code, ttfb=ttfb, upload_bytes=upload_bytes, response_bytes=response_bytes)
+    if limiter:
+        if response.status_code in THROTTLE_STATUSES:
+            limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code < 500:
+            limiter.on_success()
+
+
+def response_error(response, ok, invalid, operation_name, start, attempt):
+    """
+    None when the attempt succeeded, else the error for it.
+
+    ok: the response has a success status; invalid: the ValueError raised
+    while parsing its body, if any. A success with an invalid body fails
+    without retrying.
+    """
+    latency = time.monotonic() - start
+    if not ok:
+        return http_error(response, operation_name, latency, attempt)
+    if invalid is None:
+        return None
+    error = _invalid_json_error(response, operation_name, latency, attempt)
+    error.__cause__ = invalid
+    return error
+
+
+def retry_or_raise(url, error, attempt, policy, limiter, start):
+    """Seconds to wait before retrying error; records the failed call and raises it when out of retries."""
+    delay = retry_delay(error, attempt, policy, limiter, start)
+    if delay is None:
+        record_call(url, time.monotonic() - start, attempt, type(error).__name__)
+        raise error
+    return delay
+
+
+def post_json(url, headers, payload, operation_name, timeout=60, cacheable=False, retry=None):
+    """
+    POST JSON and raise a typed, user-readable BriaAPIError on failure.
+
+    Transient failures (RateLimited, ServerError, NetworkError and connect
+    timeouts) are retried with jittered exponential backoff within the retry
+    policy's attempt and time budget. Rejections such as 422 fail fast. Every
+    attempt carries the same Idempotency-Key header.
+
+    When cacheable is True, identical requests are answered from the result
+    cache when it is enabled, and concurrent identical requests share a single
+    API call. Cacheable calls are deterministic, so read timeouts are retried
+    for them. Every call is accounted to the current hub user.
+    Calls go through the shared per-key/per-endpoint rate limiter, which
+    adapts to 429/503 responses and Retry-After.
+    """
+    # Identical cacheable calls are shared between sessions (see services.hub).
+    cache_key = make_cache_key(url, payload) if cacheable else None
+    with span("api.call", operation=operation_name, endpoint=endpoint_name(url)):
+        return get_hub().call(
+            cache_key,
+            lambda: _send(url, headers, payload, operation_name, timeout, cacheable, retry or DEFAULT_RETRY_POLICY),
+        )
+
+
+def _send(url, headers, payload, operation_name, timeout, cacheable, policy):
+    """One logical call: attempts with backoff until success or a final error."""
+    headers = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    limiter = get_limiter(headers.get("api_token"), url) if rate_limiting_enabled() else None
+    streamed = has_streamed_fields(payload)
+    start = time.monotonic()
+    attempt = 0
+
+    while True:
+        attempt += 1
+        # Payloads carrying Base64Source images are streamed instead of built in memory.
+        # A streamed body can only be read once, so it is rebuilt for every attempt.
+        body = {"data": StreamingJSONBody(payload)} if streamed else {"json": payload}
+        error = None
+        try:
+            with span("api.attempt", attempt=attempt) as attempt_span:
+                with limiter.slot() if limiter else nullcontext():
+                    response = get_session().post(
+                        url, headers=headers, timeout=build_timeout(timeout), stream=True, **body
+                    )
+                attempt_span.set(status=response.status_code)
+            invalid = None
             try:
-                body = e.response.json()
-                details = body.get("message") or body.get("error") or str(body)
-            except Exception:
-                details = e.response.text or ""
-        if details:
-            raise Exception(f"{operation_name} failed (status={status_code}): {details}") from e
-        raise Exception(f"{operation_name} failed (status={status_code})") from e
-    except requests.exceptions.RequestException as e:
-        raise Exception(f"{operation_name} failed: network error ({str(e)})") from e
+                if response.ok:
+                    # json.loads for ordinary bodies; large ones (echoed base64 images) are parsed as they download.
+                    parser = ResponseParser()
+                    try:
+                        for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+                            parser.feed(chunk)
+                        result = parser.close()
+                    except ValueError as e:
+                        invalid = e
+                    response_bytes = parser.bytes_read
+                else:
+                    # Error bodies are small and kept for the error message.
+                    response_bytes = len(response.content)
+            finally:
+                response.close()
+            record_response(
+                url,
+                response,
+                limiter,
+                # requests measures up to the parsed response headers.
+                ttfb=response.elapsed.total_seconds(),
+                upload_bytes=len(body["data"]) if streamed else len(response.request.body or b""),
+                response_bytes=response_bytes,
+            )
+            error = response_error(response, response.ok, invalid, operation_name, start, attempt)
+            if error is None:
+                break
+        except requests.exceptions.RequestException as e:
+            record_attempt(url, "network")
+            error = _network_error(e, operation_name, time.monotonic() - start, attempt, idempotent=cacheable)
+            error.__cause__ = e
+
+        time.sleep(retry_or_raise(url, error, attempt, policy, limiter, start))
+
+    record_call(url, time.monotonic() - start, attempt, "ok")
+    return result
+
+
+def blocking_call(build, name):
+    """
+    Make the blocking wrapper for a request builder.
+
+    build(...) returns post_json keyword arguments; the wrapper keeps its
+    signature and docstring so both variants document the same arguments.
+    """
+    @functools.wraps(build)
+    def call(*args, **kwargs):
+        # Image prep and base64 setup happen in build.
+        with span("api.prepare", operation=name):
+            request = build(*args, **kwargs)
+        return post_json(**request)
+
+    call.__name__ = call.__qualname__ = name
+    return call
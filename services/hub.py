@@ -0,0 +1,372 @@
+import asyncio
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from .result_cache import DEFAULT_TTL_SECONDS, enable_result_cache, get_result_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: file locks degrade to in-process single-flight only
+    fcntl = None
+
+# How long a Redis lease is held at most; covers a call's timeout plus retries.
+DEFAULT_LOCK_TIMEOUT = 120.0
+ANONYMOUS = "anonymous"
+
+_current_user: ContextVar[Optional[str]] = ContextVar("adforge_user", default=None)
+
+
+@contextmanager
+def acting_as(user: Optional[str]):
+    """Attribute service calls made inside the block (on this thread or task) to user."""
+    token = _current_user.set(user)
+    try:
+        yield
+    finally:
+        _current_user.reset(token)
+
+
+def set_current_user(user: Optional[str]) -> None:
+    """Attribute calls on the current thread to user until changed (for threads owned by one user)."""
+    _current_user.set(user)
+
+
+def current_user() -> str:
+    return _current_user.get() or ANONYMOUS
+
+
+class UsageLedger:
+    """
+    Per-user counters, kept apart even when users share results.
+
+    requests: calls this user sent to the API; cache_hits: answered from a
+    shared cache; shared: joined another user's identical in-flight call;
+    errors: failed calls; api_seconds: time spent in calls this user sent.
+    """
+
+    FIELDS = ("requests", "cache_hits", "shared", "errors", "api_seconds")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def record(self, user: str, **increments) -> None:
+        with self._lock:
+            usage = self._usage[user]
+            for name, value in increments.items():
+                usage[name] += value
+
+    def usage(self, user: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._usage.get(user) or dict.fromkeys(self.FIELDS, 0))
+
+    def totals(self) -> Dict[str, float]:
+        with self._lock:
+            totals = dict.fromkeys(self.FIELDS, 0)
+            for usage in self._usage.values():
+                for name, value in usage.items():
+                    totals[name] += value
+            return totals
+
+
+class FileStore:
+    """
+    Response store shared by processes on one machine (e.g. several Streamlit
+    servers behind a proxy): one JSON file per key, written atomically, with
+    flock-based leases so only one process calls the API per key.
+    """
+
+    def __init__(self, root: str, ttl: float = DEFAULT_TTL_SECONDS):
+        self.root = root
+        self.ttl = ttl
+        os.makedirs(os.path.join(root, "locks"), exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires", 0) <= time.time():
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"expires": time.time() + self.ttl, "value": value}, f)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @contextmanager
+    def lock(self, key: str):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.root, "locks", f"{key}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RedisStore:
+    """Response store and leases in a Redis-compatible server (needs the redis package)."""
+
+    def __init__(self, url: str, ttl: float = DEFAULT_TTL_SECONDS, prefix: str = "adforge:",
+                 lock_timeout: float = DEFAULT_LOCK_TIMEOUT):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Redis shared store requires the redis package: pip install redis") from e
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def put(self, key: str, value: Any) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(self.ttl)))
+
+    def lock(self, key: str):
+        return self.client.lock(
+            f"{self.prefix}lock:{key}",
+            timeout=self.lock_timeout,
+            blocking_timeout=self.lock_timeout,
+        )
+
+
+def open_store(spec: str, ttl: float = DEFAULT_TTL_SECONDS):
+    """
+    Build a shared store from a spec: "memory" (None, in-process only),
+    "file:<directory>" or a redis:// / rediss:// URL.
+    """
+    if not spec or spec == "memory":
+        return None
+    if spec.startswith("file:"):
+        return FileStore(spec[len("file:"):] or os.path.join(tempfile.gettempdir(), "adforge_shared"), ttl=ttl)
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(spec, ttl=ttl)
+    raise ValueError(f"Unknown shared store: {spec!r}")
+
+
+class _Abandoned(Exception):
+    """The leader of a flight was cancelled; followers run the call themselves."""
+
+
+class ServiceHub:
+    """
+    Process-wide coordination of API calls across Streamlit sessions.
+
+    Identical deterministic calls (see post_json's cacheable) are answered
+    from the shared result cache, or joined while one of them is in flight
+    (single-flight) so the API is called once. With a shared store the cache
+    and the in-flight lease span processes. Every call is accounted to the
+    user set with acting_as().
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self.ledger = UsageLedger()
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+
+    def _lookup(self, key):
+        local = get_result_cache()
+        if local is not None:
+            value = local.get(key)
+            if value is not None:
+                return value
+        if self.store is not None:
+            value = self.store.get(key)
+            if value is not None:
+                if local is not None:
+                    local.put(key, value)
+                return value
+        return None
+
+    def _publish(self, key, value):
+        local = get_result_cache()
+        if local is not None:
+            local.put(key, value)
+        if self.store is not None:
+            self.store.put(key, value)
+
+    def _join(self, key):
+        """Return (future, leader): the flight for key, and whether this caller must run it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Future()
+            return flight, True
+
+    def _abandon(self, key, flight, error):
+        # Cancellation (or KeyboardInterrupt) of the leader must not strand the
+        # flight: followers would wait on it forever.
+        self._land(key, flight, error=_Abandoned(f"{type(error).__name__} in the leading call"))
+
+    def _land(self, key, flight, result=None, error=None):
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            flight.set_exception(error)
+        else:
+            flight.set_result(result)
+
+    def _account(self, user, start, error=None):
+        self.ledger.record(
+            user,
+            requests=1,
+            errors=1 if error is not None else 0,
+            api_seconds=time.monotonic() - start,
+        )
+
+    def _invoke(self, user, fn):
+        start = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self._account(user, start, e)
+            raise
+        self._account(user, start)
+        return result
+
+    def call(self, key: Optional[str], fn: Callable[[], Any]) -> Any:
+        """Run fn() for a call with cache key key (None: not shareable)."""
+        user = current_user()
+        if key is None:
+            return self._invoke(user, fn)
+        cached = self._lookup(key)
+        if cached is not None:
+            self.ledger.record(user, cache_hits=1)
+            return cached
+
+        flight, leader = self._join(key)
+        while not leader:
+            try:
+                result = flight.result()
+            except _Abandoned:
+                flight, leader = self._join(key)
+                continue
+            self.ledger.record(user, shared=1)
+            return copy.deepcopy(result)
+        try:
+            with self.store.lock(key) if self.store is not None else nullcontext():
+                # Another process may have finished the same call while we waited.
+                result = self.store.get(key) if self.store is not None else None
+                if result is not None:
+                    self.ledger.record(user, cache_hits=1)
+                    local = get_result_cache()
+                    if local is not None:
+                        local.put(key, result)
+                else:
+                    result = self._invoke(user, fn)
+                    self._publish(key, result)
+        except Exception as e:
+            self._land(key, flight, error=e)
+            raise
+        except BaseException as e:
+            self._abandon(key, flight, e)
+            raise
+        self._land(key, flight, result=copy.deepcopy(result))
+        return result
+
+    async def acall(self, key: Optional[str], afn: Callable[[], Any]) -> Any:
+        """
+        call() for coroutines. In-process single-flight works across threads and
+        event loops; the cross-process lease is skipped so the loop never blocks.
+        """
+        user = current_user()
+        start = time.monotonic()
+        if key is not None:
+            cached = self._lookup(key)
+            if cached is not None:
+                self.ledger.record(user, cache_hits=1)
+                return cached
+            flight, leader = self._join(key)
+            while not leader:
+                try:
+                    result = await asyncio.wrap_future(flight)
+                except _Abandoned:
+                    flight, leader = self._join(key)
+                    continue
+                self.ledger.record(user, shared=1)
+                return copy.deepcopy(result)
+        try:
+            result = await afn()
+        except Exception as e:
+            self._account(user, start, e)
+            if key is not None:
+                self._land(key, flight, error=e)
+            raise
+        except BaseException as e:
+            if key is not None:
+                self._abandon(key, flight, e)
+            raise
+        self._account(user, start)
+        if key is not None:
+            self._publish(key, result)
+            self._land(key, flight, result=copy.deepcopy(result))
+        return result
+
+    def usage(self, user: str) -> Dict[str, float]:
+        return self.ledger.usage(user)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {"in_flight": in_flight, **self.ledger.totals()}
+
+
+_hub: Optional[ServiceHub] = None
+_hub_lock = threading.Lock()
+
+
+def configure_hub(shared_store: Optional[str] = "memory", ttl: float = DEFAULT_TTL_SECONDS) -> ServiceHub:
+    """
+    Switch on multi-user mode: results are cached and shared between sessions
+    (and, with a "file:" or redis:// store, between processes).
+    """
+    global _hub
+    if get_result_cache() is None:
+        enable_result_cache(ttl=ttl)
+    with _hub_lock:
+        _hub = ServiceHub(store=open_store(shared_store, ttl=ttl))
+    return _hub
+
+
+def get_hub() -> ServiceHub:
+    """Return the process-wide hub, creating it (without a shared store) on first use."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = ServiceHub()
+    return _hub
+
+
+# Opt in from the environment, e.g. ADFORGE_SHARED_STORE=redis://localhost:6379/0
+if os.getenv("ADFORGE_SHARED_STORE"):
+    configure_hub(os.environ["ADFORGE_SHARED_STORE"], ttl=float(os.getenv("BRIA_RESULT_CACHE_TTL") or DEFAULT_TTL_SECONDS))
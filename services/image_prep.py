@@ -0,0 +1,206 @@
+import io
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Longest side sent to each endpoint. Larger uploads are rescaled by the API
+# anyway, so sending them only costs upload time.
+DEFAULT_MAX_SIDE = 4096
+DEFAULT_ENDPOINT_MAX_SIDE = {
+    "packshot": 4096,
+    "shadow": 4096,
+    "gen_fill": 4096,
+    "erase_foreground": 4096,
+    "lifestyle_shot_by_text": 4096,
+    "lifestyle_shot_by_image": 4096,
+    "lifestyle_reference": 1536,
+}
+DEFAULT_JPEG_QUALITY = 90
+MAX_REPORTS = 200
+
+_lock = threading.Lock()
+_config = {
+    "enabled": True,
+    "jpeg_quality": DEFAULT_JPEG_QUALITY,
+    "max_side": dict(DEFAULT_ENDPOINT_MAX_SIDE),
+}
+_reports = deque(maxlen=MAX_REPORTS)
+
+
+@dataclass
+class PrepReport:
+    endpoint: str
+    original_bytes: int
+    sent_bytes: int
+    original_size: Tuple[int, int]
+    sent_size: Tuple[int, int]
+    action: str
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.sent_bytes
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    size: Tuple[int, int]
+    report: PrepReport
+    image: Optional["Image.Image"] = None
+
+    @property
+    def resized(self) -> bool:
+        return self.report.sent_size != self.report.original_size
+
+
+def configure_image_prep(
+    enabled: Optional[bool] = None,
+    jpeg_quality: Optional[int] = None,
+    max_side: Optional[Dict[str, int]] = None,
+) -> None:
+    """
+    Configure the upload preprocessing stage.
+
+    Args:
+        enabled: Turn preprocessing on or off for all endpoints
+        jpeg_quality: Quality used when re-encoding JPEG uploads
+        max_side: Per-endpoint caps for the longest image side, merged into the defaults
+    """
+    with _lock:
+        if enabled is not None:
+            _config["enabled"] = enabled
+        if jpeg_quality is not None:
+            _config["jpeg_quality"] = jpeg_quality
+        if max_side is not None:
+            _config["max_side"].update(max_side)
+
+
+def get_prep_reports() -> List[PrepReport]:
+    """Return the most recent preprocessing reports, oldest first."""
+    with _lock:
+        return list(_reports)
+
+
+def prep_summary() -> Dict[str, int]:
+    reports = get_prep_reports()
+    return {
+        "requests": len(reports),
+        "original_bytes": sum(r.original_bytes for r in reports),
+        "sent_bytes": sum(r.sent_bytes for r in reports),
+        "saved_bytes": sum(r.saved_bytes for r in reports),
+    }
+
+
+def _record(report):
+    with _lock:
+        _reports.append(report)
+    return report
+
+
+def _has_metadata(img):
+    return bool(img.info.get("exif") or img.info.get("icc_profile") or img.getexif())
+
+
+def _encode(img, fmt, quality):
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(out, format="PNG", compress_level=6)
+    return out.getvalue()
+
+
+def prepare_image(
+    image_data: bytes,
+    endpoint: str,
+    max_side: Optional[int] = None,
+    image: Optional["Image.Image"] = None,
+    apply_orientation: bool = True,
+) -> PreparedImage:
+    """
+    Downscale, re-encode and strip metadata from an image before upload.
+
+    Images already within the endpoint's size cap and carrying no EXIF/ICC
+    data are passed through untouched without decoding pixels. Re-encoded
+    output is only used when it is smaller than the original or when the
+    image had to be resized.
+
+    Args:
+        image_data: Original encoded image bytes
+        endpoint: Endpoint key used to look up the size cap
+        max_side: Tighter cap for this call, e.g. the requested output shot size
+        image: Already decoded PIL image for image_data, reused instead of decoding again
+        apply_orientation: Bake the EXIF orientation into the pixels before stripping it.
+            Disable when a mask was drawn over the raw pixel layout.
+    """
+    with _lock:
+        enabled = _config["enabled"]
+        quality = _config["jpeg_quality"]
+        cap = _config["max_side"].get(endpoint, DEFAULT_MAX_SIDE)
+    if max_side:
+        cap = min(cap, max_side)
+    # Pillow (which pulls in NumPy) is imported on the first upload, not at startup.
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    if not isinstance(image_data, (bytes, bytearray, memoryview)):
+        # Already a streamed source (e.g. a file on disk); send it as is.
+        report = PrepReport(endpoint, 0, 0, (0, 0), (0, 0), "streamed")
+        return PreparedImage(image_data, (0, 0), report)
+
+    original_bytes = len(image_data)
+    try:
+        img = image if image is not None else Image.open(io.BytesIO(image_data))
+    except UnidentifiedImageError:
+        report = PrepReport(endpoint, original_bytes, original_bytes, (0, 0), (0, 0), "undecodable")
+        return PreparedImage(image_data, (0, 0), _record(report))
+    original_size = img.size
+
+    def passthrough(action):
+        report = PrepReport(endpoint, original_bytes, original_bytes, original_size, original_size, action)
+        return PreparedImage(image_data, original_size, _record(report), img)
+
+    if not enabled:
+        return passthrough("disabled")
+
+    fmt = "JPEG" if (img.format or "").upper() == "JPEG" else "PNG"
+    needs_resize = max(original_size) > cap
+    if not needs_resize and not _has_metadata(img):
+        return passthrough("unchanged")
+
+    if needs_resize and fmt == "JPEG" and image is None:
+        # Let libjpeg decode at a reduced scale before the final resample.
+        img.draft("RGB", (cap, cap))
+    work = ImageOps.exif_transpose(img) if apply_orientation else img
+    if needs_resize:
+        scale = cap / max(work.size)
+        target = (max(1, round(work.width * scale)), max(1, round(work.height * scale)))
+        work = work.resize(target, Image.LANCZOS)
+    elif work is img:
+        work = img.copy()
+    work.info.pop("exif", None)
+    work.info.pop("icc_profile", None)
+
+    data = _encode(work, fmt, quality)
+    if not needs_resize and len(data) >= original_bytes:
+        return passthrough("kept_original")
+
+    report = PrepReport(endpoint, original_bytes, len(data), original_size, work.size, "reencoded")
+    return PreparedImage(data, work.size, _record(report), work)
+
+
+def resize_mask(mask_data: bytes, size: Tuple[int, int]) -> bytes:
+    """Resize a binary mask PNG to match a prepared image, keeping hard edges."""
+    from PIL import Image
+
+    mask = Image.open(io.BytesIO(mask_data))
+    if mask.size == tuple(size):
+        return mask_data
+    out = io.BytesIO()
+    mask.resize(size, Image.NEAREST).save(out, format="PNG")
+    return out.getvalue()
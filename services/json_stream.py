@@ -0,0 +1,287 @@
+"""
+Incremental JSON parsing for large API responses.
+
+JSONStreamParser is fed the response body chunk by chunk as it downloads.
+Strings longer than max_string (such as base64 images some endpoints echo
+back) are skipped while scanning and never decoded or kept. It scans in pure
+Python, so ResponseParser only switches to it for bodies too large to buffer
+cheaply; ordinary responses are parsed with json.loads.
+"""
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Iterable, Optional
+
+# Longest string kept when parsing API responses; URLs and prompts are far shorter.
+DEFAULT_MAX_STRING = 64 * 1024
+# Bodies up to this size are buffered and parsed with json.loads, which is about
+# 20x faster than JSONStreamParser on structured JSON. Larger ones are streamed:
+# in practice they carry an echoed base64 image, which streaming never keeps
+# (see benchmarks/bench_json_parse.py).
+STREAM_PARSE_MIN_BYTES = 1024 * 1024
+
+_WHITESPACE = b" \t\r\n"
+_LITERAL = re.compile(rb"[^ \t\r\n,\]}]*")
+_CONSTANTS = {b"true": True, b"false": False, b"null": None}
+
+# What the parser expects next.
+_VALUE = 0
+_VALUE_OR_END = 1  # right after "["
+_KEY = 2
+_KEY_OR_END = 3  # right after "{"
+_COLON = 4
+_COMMA_OR_END = 5
+_DONE = 6
+
+
+def _escaped(buf, start, end, carried):
+    """Whether buf[end] is escaped: an odd run of backslashes before it (carried: odd run before start)."""
+    run = 0
+    i = end - 1
+    while i >= start and buf[i] == 0x5C:
+        run += 1
+        i -= 1
+    if i < start:
+        run += carried
+    return run % 2 == 1
+
+
+def _decode_string(raw):
+    text = raw.decode("utf-8")
+    if "\\" not in text:
+        return text
+    return scanstring(text + '"', 0)[0]
+
+
+class JSONStreamParser:
+    """
+    Push parser: feed() bytes as they arrive, then close() for the value.
+
+    Args:
+        max_string: Strings longer than this many bytes become None
+    """
+
+    def __init__(self, max_string: Optional[int] = DEFAULT_MAX_STRING):
+        self.max_string = max_string
+        self.bytes_read = 0
+        self.skipped_strings = 0
+        self._buf = b""
+        self._pos = 0
+        # Open containers as [container, current key or index, is_map].
+        self._stack = []
+        self._expect = _VALUE
+        self._value = None
+        # The string being read: bytes so far (None once it is too long to keep).
+        self._in_string = False
+        self._string = None
+        self._string_len = 0
+        self._string_is_key = False
+        self._carried_backslash = 0
+        self._literal = None
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.bytes_read += len(chunk)
+        # Every chunk is consumed completely; strings and literals keep their own state.
+        self._buf = bytes(chunk)
+        self._pos = 0
+        self._parse()
+
+    def close(self) -> Any:
+        """Finish parsing and return the value; raises ValueError on incomplete or invalid JSON."""
+        if self._literal is not None:
+            self._end_literal()
+        if self._expect != _DONE or self._in_string:
+            raise ValueError("Incomplete JSON document")
+        return self._value
+
+    def _begin_value(self):
+        if self._stack and not self._stack[-1][2]:
+            self._stack[-1][1] += 1
+
+    def _add(self, value):
+        if not self._stack:
+            self._value = value
+            self._expect = _DONE
+            return
+        container, key, _ = self._stack[-1]
+        if isinstance(container, dict):
+            container[key] = value
+        else:
+            container.append(value)
+        self._expect = _COMMA_OR_END
+
+    def _open(self, is_map):
+        self._begin_value()
+        container = {} if is_map else []
+        self._add(container)
+        self._stack.append([container, None if is_map else -1, is_map])
+        self._expect = _KEY_OR_END if is_map else _VALUE_OR_END
+
+    def _close_container(self, char):
+        is_map = self._stack[-1][2]
+        if is_map != (char == 0x7D):
+            raise ValueError(f"Unexpected {chr(char)!r} in JSON")
+        self._stack.pop()
+        self._expect = _COMMA_OR_END if self._stack else _DONE
+
+    def _end_string(self, raw):
+        if self._string_is_key:
+            self._stack[-1][1] = _decode_string(raw)
+            self._expect = _COLON
+            return
+        if raw is None:
+            self.skipped_strings += 1
+            value = None
+        else:
+            value = _decode_string(raw)
+        self._add(value)
+
+    def _read_string(self):
+        """Consume string content; True once the closing quote was reached."""
+        buf, start = self._buf, self._pos
+        search, carried = start, self._carried_backslash
+        while True:
+            quote = buf.find(b'"', search)
+            end = len(buf) if quote == -1 else quote
+            escaped = _escaped(buf, search, end, carried)
+            if quote == -1 or not escaped:
+                break
+            # An escaped quote; backslashes before it cannot reach past it.
+            search, carried = quote + 1, 0
+        if quote == -1:
+            # Carry the parity of trailing backslashes to the next chunk.
+            self._carried_backslash = 1 if escaped else 0
+        self._string_len += end - start
+        if self._string is not None:
+            if self.max_string is not None and self._string_len > self.max_string and not self._string_is_key:
+                self._string = None
+            else:
+                self._string += buf[start:end]
+        if quote == -1:
+            self._pos = end
+            return False
+        self._pos = quote + 1
+        self._in_string = False
+        raw = bytes(self._string) if self._string is not None else None
+        self._string = None
+        self._end_string(raw)
+        return True
+
+    def _start_string(self, is_key):
+        if not is_key:
+            self._begin_value()
+        self._in_string = True
+        self._string = bytearray()
+        self._string_len = 0
+        self._string_is_key = is_key
+        self._carried_backslash = 0
+
+    def _end_literal(self):
+        literal, self._literal = bytes(self._literal), None
+        try:
+            value = _CONSTANTS[literal] if literal in _CONSTANTS else json.loads(literal)
+        except ValueError:
+            raise ValueError(f"Invalid JSON literal {literal[:20]!r}") from None
+        self._add(value)
+
+    def _parse(self):
+        buf = self._buf
+        size = len(buf)
+        while self._pos < size:
+            if self._in_string:
+                if not self._read_string():
+                    return
+                continue
+            if self._literal is not None:
+                start = self._pos
+                self._pos = _LITERAL.match(buf, start).end()
+                self._literal += buf[start:self._pos]
+                if self._pos == size:
+                    return
+                self._end_literal()
+                continue
+            char = buf[self._pos]
+            self._pos += 1
+            if char in _WHITESPACE:
+                continue
+            expect = self._expect
+            if expect in (_VALUE, _VALUE_OR_END):
+                if char == 0x5D and expect == _VALUE_OR_END:
+                    self._close_container(char)
+                elif char == 0x7B:
+                    self._open(True)
+                elif char == 0x5B:
+                    self._open(False)
+                elif char == 0x22:
+                    self._start_string(False)
+                else:
+                    self._begin_value()
+                    self._literal = bytearray([char])
+            elif expect in (_KEY, _KEY_OR_END):
+                if char == 0x22:
+                    self._start_string(True)
+                elif char == 0x7D and expect == _KEY_OR_END:
+                    self._close_container(char)
+                else:
+                    raise ValueError(f"Expected an object key, got {chr(char)!r}")
+            elif expect == _COLON:
+                if char != 0x3A:
+                    raise ValueError(f"Expected ':', got {chr(char)!r}")
+                self._expect = _VALUE
+            elif expect == _COMMA_OR_END:
+                if char == 0x2C:
+                    self._expect = _KEY if self._stack[-1][2] else _VALUE
+                elif char in (0x5D, 0x7D):
+                    self._close_container(char)
+                else:
+                    raise ValueError(f"Expected ',' or end of container, got {chr(char)!r}")
+            else:
+                raise ValueError("Extra data after JSON document")
+
+
+class ResponseParser:
+    """
+    feed()/close() over a response body: json.loads for bodies up to
+    stream_above bytes, JSONStreamParser (dropping long strings) beyond that.
+    """
+
+    def __init__(self, stream_above: int = STREAM_PARSE_MIN_BYTES, max_string: Optional[int] = DEFAULT_MAX_STRING):
+        self.stream_above = stream_above
+        self.max_string = max_string
+        self.bytes_read = 0
+        self._chunks = []
+        self._stream = None
+
+    @property
+    def streaming(self) -> bool:
+        return self._stream is not None
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.bytes_read += len(chunk)
+        if self._stream is not None:
+            self._stream.feed(chunk)
+            return
+        self._chunks.append(chunk)
+        if self.bytes_read > self.stream_above:
+            self._stream = JSONStreamParser(max_string=self.max_string)
+            for buffered in self._chunks:
+                self._stream.feed(buffered)
+            self._chunks = []
+
+    def close(self) -> Any:
+        """The parsed body; raises ValueError on invalid JSON."""
+        if self._stream is not None:
+            return self._stream.close()
+        return json.loads(b"".join(self._chunks))
+
+
+def load_json(chunks: Iterable[bytes], max_string: Optional[int] = DEFAULT_MAX_STRING) -> Any:
+    """Parse a JSON document from byte chunks, dropping strings longer than max_string."""
+    parser = JSONStreamParser(max_string=max_string)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
@@ -1,8 +1,11 @@
 from typing import Dict, Any, Optional, List
-import base64
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
+from .image_prep import prepare_image
+from .request_body import as_base64_source
 
-def lifestyle_shot_by_text(
+# Builds the post_json arguments shared by lifestyle_shot_by_text and alifestyle_shot_by_text
+def _lifestyle_by_text_request(
     api_key: str,
     image_data: bytes,
     scene_description: str,
@@ -53,8 +56,15 @@ def lifestyle_shot_by_text(
         'Content-Type': 'application/json'
     }
     
-    # Convert image to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
+    # Output never exceeds shot_size for these placements, so cap the upload to it
+    max_side = None
+    if placement_type in ['automatic', 'manual_placement', 'custom_coordinates'] and not original_quality:
+        max_side = max(shot_size)
+
+    # Wrap image for chunked base64 encoding while the body streams
+    image_base64 = as_base64_source(
+        prepare_image(image_data, "lifestyle_shot_by_text", max_side=max_side).data
+    )
     
     # Prepare request data
     data = {
@@ -92,7 +102,7 @@ def lifestyle_shot_by_text(
     if sku:
         data['sku'] = sku
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
@@ -100,7 +110,8 @@ def lifestyle_shot_by_text(
         timeout=60
     )
 
-def lifestyle_shot_by_image(
+# Builds the post_json arguments shared by lifestyle_shot_by_image and alifestyle_shot_by_image
+def _lifestyle_by_image_request(
     api_key: str,
     image_data: bytes,
     reference_image: bytes,
@@ -130,9 +141,16 @@ def lifestyle_shot_by_image(
         'Content-Type': 'application/json'
     }
     
-    # Convert images to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-    reference_base64 = base64.b64encode(reference_image).decode('utf-8')
+    # Output never exceeds shot_size for these placements, so cap the upload to it
+    max_side = None
+    if placement_type in ['automatic', 'manual_placement', 'custom_coordinates'] and not original_quality:
+        max_side = max(shot_size)
+
+    # Wrap images for chunked base64 encoding while the body streams
+    image_base64 = as_base64_source(
+        prepare_image(image_data, "lifestyle_shot_by_image", max_side=max_side).data
+    )
+    reference_base64 = as_base64_source(prepare_image(reference_image, "lifestyle_reference").data)
     
     # Prepare request data
     data = {
@@ -167,10 +185,16 @@ def lifestyle_shot_by_image(
     if sku:
         data['sku'] = sku
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
         operation_name="Lifestyle shot generation",
         timeout=60
     )
+
+
+lifestyle_shot_by_text = blocking_call(_lifestyle_by_text_request, "lifestyle_shot_by_text")
+alifestyle_shot_by_text = async_call(_lifestyle_by_text_request, "alifestyle_shot_by_text")
+lifestyle_shot_by_image = blocking_call(_lifestyle_by_image_request, "lifestyle_shot_by_image")
+alifestyle_shot_by_image = async_call(_lifestyle_by_image_request, "alifestyle_shot_by_image")
@@ -0,0 +1,252 @@
+import bisect
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .rate_limit import endpoint_name
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(10))  # 1 KiB .. 256 MiB
+RETRY_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+# Histogram name -> (bucket bounds, help text)
+HISTOGRAMS = {
+    "adforge_api_ttfb_seconds": (LATENCY_BUCKETS, "Time from sending an API request to its response headers, per attempt"),
+    "adforge_api_duration_seconds": (LATENCY_BUCKETS, "Total time of an API call including retries and backoff"),
+    "adforge_api_upload_bytes": (BYTES_BUCKETS, "Request body size per attempt"),
+    "adforge_api_response_bytes": (BYTES_BUCKETS, "Response body size per attempt"),
+    "adforge_api_retries": (RETRY_BUCKETS, "Retries per API call"),
+    "adforge_download_seconds": (LATENCY_BUCKETS, "Result download time"),
+    "adforge_download_bytes": (BYTES_BUCKETS, "Result download size"),
+    "adforge_poll_ready_seconds": (LATENCY_BUCKETS, "Time until an async result URL became available"),
+}
+COUNTERS = {
+    "adforge_api_responses_total": "API attempts by endpoint and status code (\"network\" when no response arrived)",
+    "adforge_poll_checks_total": "Readiness checks of async result URLs by status code",
+    "adforge_asset_cache_lookups_total": "Asset cache lookups by result (hit or miss)",
+    "adforge_asset_cache_evictions_total": "Objects evicted from the asset cache to stay under its size cap",
+}
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are interpolated within buckets, as Prometheus does."""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    return lower  # above the last bound: the best we can say
+                return lower + (self.bounds[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            yield bound, total
+        yield float("inf"), self.count
+
+
+def _labels(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Metrics:
+    """Thread-safe registry of the histograms and counters above, keyed by label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {name: {} for name in HISTOGRAMS}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {name: {} for name in COUNTERS}
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(HISTOGRAMS[name][0])
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            for series in self._histograms.values():
+                series.clear()
+            for series in self._counters.values():
+                series.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, list]]:
+        """JSON-serializable view with count, sum and p50/p95/p99 per series."""
+        with self._lock:
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": h.count,
+                        "sum": h.sum,
+                        **{f"p{int(q * 100)}": h.quantile(q) for q in QUANTILES},
+                        "buckets": {_format_bound(bound): total for bound, total in h.cumulative()},
+                    }
+                    for key, h in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+        return {"histograms": histograms, "counters": counters}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {HISTOGRAMS[name][1]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(series.items()):
+                    for bound, total in h.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', _format_bound(bound)),))} {total}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+            for name, series in self._counters.items():
+                lines.append(f"# HELP {name} {COUNTERS[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def record_attempt(url, status, ttfb=None, upload_bytes=None, response_bytes=None) -> None:
+    """One HTTP attempt against an API endpoint; status is the code or "network"."""
+    endpoint = endpoint_name(url)
+    _metrics.inc("adforge_api_responses_total", endpoint=endpoint, status=status)
+    if ttfb is not None:
+        _metrics.observe("adforge_api_ttfb_seconds", ttfb, endpoint=endpoint)
+    if upload_bytes is not None:
+        _metrics.observe("adforge_api_upload_bytes", upload_bytes, endpoint=endpoint)
+    if response_bytes is not None:
+        _metrics.observe("adforge_api_response_bytes", response_bytes, endpoint=endpoint)
+
+
+def record_call(url, seconds, attempts, outcome) -> None:
+    """One logical API call; outcome is "ok" or the error class name."""
+    endpoint = endpoint_name(url)
+    _metrics.observe("adforge_api_duration_seconds", seconds, endpoint=endpoint, outcome=outcome)
+    _metrics.observe("adforge_api_retries", attempts - 1, endpoint=endpoint)
+
+
+def record_download(url, seconds, size) -> None:
+    # Result URLs are unique, so downloads are labelled by host only.
+    host = urlsplit(url).hostname or ""
+    _metrics.observe("adforge_download_seconds", seconds, host=host)
+    _metrics.observe("adforge_download_bytes", size, host=host)
+
+
+def record_poll_check(status_code) -> None:
+    _metrics.inc("adforge_poll_checks_total", status=status_code if status_code is not None else "network")
+
+
+def record_poll_ready(seconds) -> None:
+    _metrics.observe("adforge_poll_ready_seconds", seconds)
+
+
+def record_cache_lookup(hit: bool) -> None:
+    _metrics.inc("adforge_asset_cache_lookups_total", result="hit" if hit else "miss")
+
+
+def record_cache_eviction() -> None:
+    _metrics.inc("adforge_asset_cache_evictions_total")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = _metrics.to_json().encode("utf-8"), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = _metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus) and /metrics.json from a daemon thread, once per process."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="adforge-metrics", daemon=True).start()
+    return _server
+
+
+# Opt in from the environment, e.g. ADFORGE_METRICS_PORT=9108 for a Prometheus scrape target.
+if os.getenv("ADFORGE_METRICS_PORT"):
+    start_metrics_server(int(os.environ["ADFORGE_METRICS_PORT"]))
@@ -1,8 +1,11 @@
 from typing import Dict, Any
-import base64
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
+from .image_prep import prepare_image
+from .request_body import as_base64_source
 
-def create_packshot(
+# Builds the post_json arguments shared by create_packshot and acreate_packshot
+def _packshot_request(
     api_key: str,
     image_data: bytes,
     background_color: str = "#FFFFFF",
@@ -22,7 +25,8 @@ def create_packshot(
         content_moderation: Whether to enable content moderation
     
     Returns:
-        Dict containing the API response
+        post_json keyword arguments; create_packshot/acreate_packshot send them and
+        return the API response dict
     """
     url = "https://engine.prod.bria-api.com/v1/product/packshot"
     
@@ -32,8 +36,8 @@ def create_packshot(
         'Content-Type': 'application/json'
     }
     
-    # Convert image data to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
+    # Downscale/strip metadata, then wrap for chunked base64 encoding while the body streams
+    image_base64 = as_base64_source(prepare_image(image_data, "packshot").data)
     
     # Prepare request data
     data = {
@@ -47,10 +51,15 @@ def create_packshot(
     if sku:
         data['sku'] = sku
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
         operation_name="Packshot creation",
-        timeout=60
+        timeout=60,
+        cacheable=True
     )
+
+
+create_packshot = blocking_call(_packshot_request, "create_packshot")
+acreate_packshot = async_call(_packshot_request, "acreate_packshot")
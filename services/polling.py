@@ -0,0 +1,147 @@
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+import requests
+
+from .asset_cache import AssetCache
+from .http_client import build_timeout, get_session
+from .metrics import record_poll_check, record_poll_ready
+from .tracing import in_context, span
+
+READY = "ready"
+FAILED = "failed"
+
+# Status codes that will never turn into 200, so polling stops immediately.
+FAILED_STATUS_CODES = {400, 401, 405, 410}
+
+DEFAULT_DEADLINE = 30.0
+DEFAULT_INITIAL_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_MAX_ATTEMPTS = 40
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_HEAD_TIMEOUT = 10.0
+
+
+class PollResult(NamedTuple):
+    url: str
+    state: str
+    status_code: Optional[int]
+    attempts: int
+
+
+def backoff_delay(attempt, initial_delay=DEFAULT_INITIAL_DELAY, max_delay=DEFAULT_MAX_DELAY, jitter=0.5):
+    """Exponential backoff for the given 1-based attempt, with proportional jitter."""
+    delay = min(max_delay, initial_delay * (2 ** max(0, attempt - 1)))
+    return random.uniform(delay * (1 - jitter), delay)
+
+
+def _check(url, timeout):
+    with span("poll.check") as check_span:
+        try:
+            response = get_session().head(url, timeout=build_timeout(timeout), allow_redirects=True)
+        except requests.exceptions.RequestException:
+            return None
+        check_span.set(status=response.status_code)
+        return response.status_code
+
+
+def _fetch(cache, url, timeout):
+    """HEAD until the URL is ready, then a single GET into the cache."""
+    if cache.contains(url):
+        return 200
+    status_code = _check(url, timeout)
+    if status_code != 200:
+        return status_code
+    with span("poll.check", prefetch=True) as check_span:
+        try:
+            status_code = cache.prefetch(url, timeout=timeout)
+        except (requests.exceptions.RequestException, OSError):
+            return None
+        check_span.set(status=status_code)
+        return status_code
+
+
+def poll_urls(
+    urls: Iterable[str],
+    deadline: float = DEFAULT_DEADLINE,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    head_timeout: float = DEFAULT_HEAD_TIMEOUT,
+    attempts: Optional[Dict[str, int]] = None,
+    cache: Optional[AssetCache] = None,
+) -> Iterator[PollResult]:
+    """
+    Poll async result URLs in parallel and yield each one as soon as it resolves.
+
+    Every URL is checked immediately, then re-checked with exponential backoff
+    and jitter until it answers 200 (READY), answers a status in
+    FAILED_STATUS_CODES, or reaches max_attempts (FAILED). URLs still pending
+    when the deadline expires are simply not yielded.
+
+    Args:
+        urls: Result URLs to poll
+        deadline: Total wall-clock budget in seconds for this call
+        initial_delay: Delay before the second check of a URL
+        max_delay: Upper bound for the backoff delay
+        max_attempts: Checks after which a non-200 URL is marked FAILED
+        max_workers: Maximum number of concurrent HEAD requests
+        head_timeout: Read timeout for a single check
+        attempts: Optional per-URL attempt counters, updated in place so callers
+            can carry them across calls (e.g. Streamlit reruns)
+        cache: Download each URL into this asset cache once its HEAD answers
+            200, so READY also means the bytes are local
+    """
+    pending = list(dict.fromkeys(u for u in urls if u))
+    if not pending:
+        return
+    if attempts is None:
+        attempts = {}
+
+    check = partial(_fetch, cache) if cache is not None else _check
+    start = time.monotonic()
+    end = start + deadline
+    next_due = {url: start for url in pending}
+    in_flight = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending))))
+    try:
+        while next_due or in_flight:
+            now = time.monotonic()
+            remaining = end - now
+            if remaining <= 0:
+                break
+
+            for url, due in list(next_due.items()):
+                if due <= now:
+                    del next_due[url]
+                    future = pool.submit(in_context(check), url, min(head_timeout, remaining))
+                    in_flight[future] = url
+
+            wait_for = remaining
+            if next_due:
+                wait_for = min(wait_for, max(0.0, min(next_due.values()) - now))
+            if not in_flight:
+                time.sleep(wait_for)
+                continue
+
+            done, _ = wait(in_flight, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                status_code = future.result()
+                record_poll_check(status_code)
+                attempts[url] = attempts.get(url, 0) + 1
+                if status_code == 200:
+                    record_poll_ready(time.monotonic() - start)
+                    yield PollResult(url, READY, status_code, attempts[url])
+                elif status_code in FAILED_STATUS_CODES or attempts[url] >= max_attempts:
+                    yield PollResult(url, FAILED, status_code, attempts[url])
+                else:
+                    delay = backoff_delay(attempts[url], initial_delay, max_delay)
+                    if time.monotonic() + delay < end:
+                        next_due[url] = time.monotonic() + delay
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
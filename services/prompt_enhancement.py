@@ -1,6 +1,29 @@
 from typing import Dict, Any, Optional
+from .async_http import apost_json
 from .http_utils import post_json
 
+def _enhance_prompt_request(api_key: str, prompt: str, **kwargs) -> Dict[str, Any]:
+    url = "https://engine.prod.bria-api.com/v1/prompt_enhancer"
+    
+    headers = {
+        'api_token': api_key,
+        'Accept': 'application/json',
+        'Content-Type': 'application/json'
+    }
+    
+    data = {
+        'prompt': prompt,
+        **kwargs
+    }
+    
+    return dict(
+        url=url,
+        headers=headers,
+        payload=data,
+        operation_name="Prompt enhancement",
+        timeout=30
+    )
+
 def enhance_prompt(
     api_key: str,
     prompt: str,
@@ -17,27 +40,20 @@ def enhance_prompt(
     Returns:
         Enhanced prompt string
     """
-    url = "https://engine.prod.bria-api.com/v1/prompt_enhancer"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
-    data = {
-        'prompt': prompt,
-        **kwargs
-    }
-    
     try:
-        result = post_json(
-            url=url,
-            headers=headers,
-            payload=data,
-            operation_name="Prompt enhancement",
-            timeout=30
-        )
+        result = post_json(**_enhance_prompt_request(api_key, prompt, **kwargs))
         return result.get("prompt variations", prompt)  # Return original prompt if enhancement fails
     except Exception as e:
         return prompt  # Return original prompt on error 
+
+async def aenhance_prompt(
+    api_key: str,
+    prompt: str,
+    **kwargs
+) -> str:
+    """Async variant of enhance_prompt."""
+    try:
+        result = await apost_json(**_enhance_prompt_request(api_key, prompt, **kwargs))
+        return result.get("prompt variations", prompt)
+    except Exception:
+        return prompt
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Starting point per (API key, endpoint). The limiter raises concurrency and
+# rate while calls succeed and cuts them when the API answers 429/503.
+DEFAULT_RATE = 10.0         # tokens (requests) per second
+DEFAULT_BURST = 10.0
+DEFAULT_CONCURRENCY = 4
+# Shared by all endpoints of one API key, since quotas are enforced per key.
+DEFAULT_KEY_RATE = 20.0
+DEFAULT_KEY_BURST = 20.0
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 32
+MIN_RATE = 0.2
+MAX_RATE = 50.0
+RATE_INCREASE = 0.25        # additive increase per success, in requests per second
+DECREASE_FACTOR = 0.5       # multiplicative decrease on throttling
+THROTTLE_STATUSES = {429, 503}
+ASYNC_SLOT_POLL = 0.01      # seconds between checks for a free slot in aslot()
+
+
+class TokenBucket:
+    """Classic token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float = DEFAULT_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate, self._blocked_until - now)
+            return wait
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def block_for(self, seconds: float) -> None:
+        """Hold back every caller for the given number of seconds (Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus an AIMD concurrency window for one key/endpoint pair.
+
+    Every success adds 1/window to the window (about +1 per round trip of
+    successes) and nudges the rate up; a 429/503 halves both and honours
+    Retry-After, so sustained traffic settles just under the quota.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        key_bucket: Optional[TokenBucket] = None,
+    ):
+        self.bucket = TokenBucket(rate=rate, burst=burst)
+        self.key_bucket = key_bucket
+        self.window = float(concurrency)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self.throttled = 0
+        self.succeeded = 0
+
+    @property
+    def limit(self) -> int:
+        return max(MIN_CONCURRENCY, int(self.window))
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            if self.key_bucket is not None:
+                self.key_bucket.acquire()
+            self.bucket.acquire()
+            yield self
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """slot() for coroutines: waits with asyncio.sleep instead of blocking the loop."""
+        while True:
+            with self._cond:
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    break
+            await asyncio.sleep(ASYNC_SLOT_POLL)
+        try:
+            if self.key_bucket is not None:
+                await asyncio.sleep(self.key_bucket.reserve())
+            await asyncio.sleep(self.bucket.reserve())
+            yield self
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self.succeeded += 1
+            self.window = min(MAX_CONCURRENCY, self.window + 1.0 / max(self.window, 1.0))
+            self.bucket.rate = min(MAX_RATE, self.bucket.rate + RATE_INCREASE)
+            self._cond.notify_all()
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._cond:
+            self.throttled += 1
+            self.window = max(MIN_CONCURRENCY, self.window * DECREASE_FACTOR)
+            self.bucket.rate = max(MIN_RATE, self.bucket.rate * DECREASE_FACTOR)
+        pause = retry_after if retry_after is not None else 1.0 / self.bucket.rate
+        self.bucket.block_for(pause)
+        if retry_after is not None and self.key_bucket is not None:
+            # Retry-After describes the whole key, not just this endpoint.
+            self.key_bucket.block_for(retry_after)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            return {
+                "concurrency": self.limit,
+                "in_flight": self._in_flight,
+                "rate": round(self.bucket.rate, 3),
+                "succeeded": self.succeeded,
+                "throttled": self.throttled,
+            }
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header given in seconds; HTTP dates are ignored."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def endpoint_name(url: str) -> str:
+    return urlsplit(url).path or "/"
+
+
+def _key_id(api_key: Optional[str]) -> str:
+    # Never keep raw keys around; a short digest is enough to tell them apart.
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+_limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+_key_buckets: Dict[str, TokenBucket] = {}
+_registry_lock = threading.Lock()
+_enabled = True
+
+
+def get_limiter(api_key: Optional[str], url: str) -> AdaptiveLimiter:
+    """Return the shared limiter for an API key and endpoint, creating it on first use."""
+    key = (_key_id(api_key), endpoint_name(url))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _registry_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                key_bucket = _key_buckets.get(key[0])
+                if key_bucket is None:
+                    key_bucket = _key_buckets[key[0]] = TokenBucket(DEFAULT_KEY_RATE, DEFAULT_KEY_BURST)
+                limiter = _limiters[key] = AdaptiveLimiter(key_bucket=key_bucket)
+    return limiter
+
+
+def set_rate_limiting(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def reset_rate_limiters() -> None:
+    """Forget all learned limits (e.g. after a quota upgrade)."""
+    with _registry_lock:
+        _limiters.clear()
+        _key_buckets.clear()
+
+
+def rate_limiting_enabled() -> bool:
+    return _enabled
+
+
+def limiter_snapshot() -> Dict[str, Dict[str, float]]:
+    """Current state of every limiter, keyed by '<key digest> <endpoint>'."""
+    with _registry_lock:
+        items = list(_limiters.items())
+    return {f"{key_id} {endpoint}": limiter.snapshot() for (key_id, endpoint), limiter in items}
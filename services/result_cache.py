@@ -0,0 +1,100 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .request_body import Base64Source
+
+# Payload fields carrying base64 image data; they are keyed by digest only.
+IMAGE_FIELDS = ("file", "mask_file", "ref_image_file")
+
+# Bria result URLs expire, so cached responses must not outlive them.
+DEFAULT_TTL_SECONDS = 3600.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def _digest(value):
+    if isinstance(value, Base64Source):
+        return value.digest()
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+def make_cache_key(url: str, payload: Dict[str, Any]) -> str:
+    """Hash the endpoint URL, the canonicalized payload and the image digests."""
+    canonical = {
+        key: ({"sha256": _digest(value)} if key in IMAGE_FIELDS and value else value)
+        for key, value in payload.items()
+    }
+    body = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return _digest(f"{url}\n{body}")
+
+
+class ResultCache:
+    """In-memory TTL + LRU cache of API responses keyed by make_cache_key."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_cache: Optional[ResultCache] = None
+
+
+def enable_result_cache(ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES) -> ResultCache:
+    """Turn on memoization of deterministic API calls for this process."""
+    global _cache
+    _cache = ResultCache(ttl=ttl, max_entries=max_entries)
+    return _cache
+
+
+def disable_result_cache() -> None:
+    global _cache
+    _cache = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the active result cache, or None when memoization is off."""
+    return _cache
+
+
+# Opt in from the environment, e.g. BRIA_RESULT_CACHE_TTL=1800 for catalog runs.
+if os.getenv("BRIA_RESULT_CACHE_TTL"):
+    enable_result_cache(ttl=float(os.environ["BRIA_RESULT_CACHE_TTL"]))
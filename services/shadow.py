@@ -1,8 +1,11 @@
 from typing import Dict, Any, List, Optional
-import base64
-from .http_utils import post_json
+from .async_http import async_call
+from .http_utils import blocking_call
+from .image_prep import prepare_image
+from .request_body import as_base64_source
 
-def add_shadow(
+# Builds the post_json arguments shared by add_shadow and aadd_shadow
+def _shadow_request(
     api_key: str,
     image_data: bytes = None,
     image_url: str = None,
@@ -38,7 +41,8 @@ def add_shadow(
         content_moderation: Whether to enable content moderation
     
     Returns:
-        Dict containing the API response
+        post_json keyword arguments; add_shadow/aadd_shadow send them and
+        return the API response dict
     """
     url = "https://engine.prod.bria-api.com/v1/product/shadow"
     
@@ -62,7 +66,7 @@ def add_shadow(
     if image_url:
         data['image_url'] = image_url
     elif image_data:
-        data['file'] = base64.b64encode(image_data).decode('utf-8')
+        data['file'] = as_base64_source(prepare_image(image_data, "shadow").data)
     else:
         raise ValueError("Either image_data or image_url must be provided")
     
@@ -78,10 +82,15 @@ def add_shadow(
     if sku:
         data['sku'] = sku
     
-    return post_json(
+    return dict(
         url=url,
         headers=headers,
         payload=data,
         operation_name="Shadow addition",
-        timeout=60
+        timeout=60,
+        cacheable=True
     )
+
+
+add_shadow = blocking_call(_shadow_request, "add_shadow")
+aadd_shadow = async_call(_shadow_request, "aadd_shadow")
@@ -0,0 +1,110 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+from .asset_cache import AssetCache, get_asset_cache
+from .tracing import in_context, span
+
+# Gallery columns are at most ~700 px wide; 2x covers high-DPI screens for
+# small variations without shipping multi-megapixel originals.
+DEFAULT_THUMB_WIDTH = 640
+DEFAULT_QUALITY = 80
+DEFAULT_MAX_WORKERS = 4
+
+_webp_lock = threading.Lock()
+_webp_supported = None
+
+
+def thumbnail_format() -> str:
+    """WEBP when Pillow was built with it, JPEG otherwise."""
+    global _webp_supported
+    if _webp_supported is None:
+        with _webp_lock:
+            from PIL import features
+
+            _webp_supported = bool(features.check("webp"))
+    return "WEBP" if _webp_supported else "JPEG"
+
+
+def thumbnail_key(url: str, width: int, fmt: str) -> str:
+    """Asset-cache key under which a proxy of url is stored."""
+    return f"{url}#thumb={width}.{fmt.lower()}"
+
+
+def make_thumbnail(source, width: int = DEFAULT_THUMB_WIDTH, fmt: Optional[str] = None, quality: int = DEFAULT_QUALITY) -> bytes:
+    """
+    Encode a display-width proxy of an image file path or file object.
+
+    Images narrower than width keep their size; they are still re-encoded,
+    which strips metadata and usually shrinks PNG results considerably.
+    """
+    from PIL import Image
+
+    fmt = fmt or thumbnail_format()
+    with Image.open(source) as img:
+        target = (width, max(1, round(img.height * width / img.width)))
+        img.draft("RGB", target)
+        img.thumbnail(target, Image.LANCZOS)
+        keep_alpha = fmt == "WEBP" and ("A" in img.getbands() or "transparency" in img.info)
+        mode = "RGBA" if keep_alpha else "RGB"
+        if img.mode != mode:
+            img = img.convert(mode)
+        if fmt == "WEBP":
+            options = {"quality": quality, "method": 4}
+        else:
+            options = {"quality": quality, "optimize": True}
+        out = io.BytesIO()
+        img.save(out, format=fmt, **options)
+    return out.getvalue()
+
+
+def get_thumbnail(
+    url: str,
+    width: int = DEFAULT_THUMB_WIDTH,
+    cache: Optional[AssetCache] = None,
+    timeout: float = 30,
+) -> bytes:
+    """
+    Return proxy bytes for a result URL.
+
+    The original is downloaded once into the asset cache (where downloads and
+    the primary image reuse it) and the proxy is cached next to it.
+    """
+    cache = cache or get_asset_cache()
+    fmt = thumbnail_format()
+    key = thumbnail_key(url, width, fmt)
+    with span("thumbnail", width=width) as thumb_span:
+        data = cache.read(key)
+        thumb_span.set(cached=data is not None)
+        if data is not None:
+            return data
+        path = cache.lookup(url) or cache.download(url, timeout=timeout)
+        data = make_thumbnail(path, width=width, fmt=fmt)
+        cache.put(key, data)
+        return data
+
+
+def get_thumbnails(
+    urls: Sequence[str],
+    width: int = DEFAULT_THUMB_WIDTH,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[AssetCache] = None,
+    timeout: float = 30,
+) -> List[Optional[bytes]]:
+    """
+    Build proxies for several URLs in parallel, preserving order.
+
+    Failed entries are None so callers can fall back to the original URL.
+    """
+    def one(url):
+        try:
+            return get_thumbnail(url, width=width, cache=cache, timeout=timeout)
+        except Exception:
+            return None
+
+    if len(urls) <= 1:
+        return [one(url) for url in urls]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        futures = [pool.submit(in_context(one), url) for url in urls]
+        return [future.result() for future in futures]
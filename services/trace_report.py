@@ -0,0 +1,103 @@
+"""
+Print the slowest traces of a JSONL trace file as span trees with timeline bars.
+
+Run:
+    python -m services.trace_report traces.jsonl --top 5
+"""
+import argparse
+import json
+import os
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+def load_traces(path: str) -> Dict[str, List[dict]]:
+    traces = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                traces[record["trace_id"]].append(record)
+    return traces
+
+
+def trace_bounds(spans: List[dict]) -> Tuple[float, float]:
+    """Wall-clock extent of a trace; children may outlive their parent (background jobs)."""
+    return min(s["start"] for s in spans), max(s["end"] for s in spans)
+
+
+def render_trace(spans: List[dict], width: int = 40) -> List[str]:
+    """Indented span tree with a timeline bar per span, offset by its start time."""
+    start, end = trace_bounds(spans)
+    total = max(end - start, 1e-9)
+    ids = {s["span_id"] for s in spans}
+    children = defaultdict(list)
+    for s in spans:
+        children[s["parent_id"] if s["parent_id"] in ids else None].append(s)
+    lines = []
+
+    def walk(parent_id, depth):
+        for s in sorted(children[parent_id], key=lambda s: s["start"]):
+            offset = int((s["start"] - start) / total * width)
+            length = max(1, round(s["duration"] / total * width))
+            bar = " " * offset + "█" * min(length, width - offset)
+            marker = " !" if s["status"] == "error" else ""
+            label = f"{'  ' * depth}{s['name']}{marker}"
+            lines.append(f"{label:<40} {s['duration'] * 1000:9.1f} ms |{bar:<{width}}|")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return lines
+
+
+def self_times(spans: List[dict]) -> Dict[str, float]:
+    """Seconds spent in each span name excluding its children, summed."""
+    child_time = defaultdict(float)
+    for s in spans:
+        if s["parent_id"]:
+            child_time[s["parent_id"]] += s["duration"]
+    totals = defaultdict(float)
+    for s in spans:
+        totals[s["name"]] += max(0.0, s["duration"] - child_time[s["span_id"]])
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the slowest traces from a JSONL trace file.")
+    parser.add_argument("path", nargs="?", default=os.getenv("ADFORGE_TRACE_FILE") or "traces.jsonl")
+    parser.add_argument("--top", type=int, default=5, help="number of traces to show")
+    parser.add_argument("--name", help="only traces whose root span has this name")
+    parser.add_argument("--width", type=int, default=40, help="timeline width in characters")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.path)
+    if args.name:
+        traces = {
+            trace_id: spans for trace_id, spans in traces.items()
+            if any(s["parent_id"] is None and s["name"] == args.name for s in spans)
+        }
+    ranked = sorted(traces.items(), key=lambda item: -(trace_bounds(item[1])[1] - trace_bounds(item[1])[0]))
+    slowest = ranked[:args.top]
+    for trace_id, spans in slowest:
+        start, end = trace_bounds(spans)
+        roots = [s for s in spans if s["parent_id"] is None]
+        title = ", ".join(f"{k}={v}" for k, v in (roots[0]["attributes"] if roots else {}).items())
+        print(f"trace {trace_id[:12]}  {end - start:.3f} s  {len(spans)} spans  {title}")
+        for line in render_trace(spans, width=args.width):
+            print("  " + line)
+        print()
+
+    totals = defaultdict(float)
+    for _, spans in slowest:
+        for name, seconds in self_times(spans).items():
+            totals[name] += seconds
+    if totals:
+        print("self time across these traces:")
+        for name, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+            print(f"  {name:<30} {seconds * 1000:10.1f} ms")
+    print(f"{len(traces)} trace(s) in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Lightweight trace spans (OpenTelemetry-style ids, no dependency) with a JSONL exporter.
+
+Tracing is off until configure_tracing() is called or ADFORGE_TRACE_FILE is
+set; until then span() is a no-op. services.trace_report prints the slowest
+traces of a file.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# (trace_id, span_id) of the innermost open span on this thread or task.
+SpanContext = Tuple[str, str]
+
+_current: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar("adforge_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    end: Optional[float] = None
+    duration: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    thread: str = ""
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def context(self) -> SpanContext:
+        return (self.trace_id, self.span_id)
+
+
+class _NoopSpan:
+    context = None
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class JsonlExporter:
+    """Append one JSON object per finished span to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(asdict(span), default=str)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_exporter: Optional[JsonlExporter] = None
+
+
+def configure_tracing(path: str) -> JsonlExporter:
+    """Start exporting spans to a JSONL file."""
+    global _exporter
+    disable_tracing()
+    _exporter = JsonlExporter(path)
+    return _exporter
+
+
+def disable_tracing() -> None:
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_context() -> Optional[SpanContext]:
+    """Context of the open span, to parent spans started later elsewhere (e.g. on a rerun)."""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, parent: Optional[SpanContext] = None, **attributes):
+    """
+    Time a block as a child of the open span (or of parent), starting a new
+    trace when there is neither. Exceptions mark the span as failed and are
+    re-raised.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield _NOOP
+        return
+    parent = parent or _current.get()
+    current = Span(
+        name=name,
+        trace_id=parent[0] if parent else uuid.uuid4().hex,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent[1] if parent else None,
+        start=time.time(),
+        thread=threading.current_thread().name,
+        attributes=attributes,
+    )
+    token = _current.set(current.context)
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.duration = time.perf_counter() - started
+        current.end = current.start + current.duration
+        exporter.export(current)
+
+
+def in_context(fn):
+    """
+    Bind fn to a copy of the caller's context (open span, acting user) so a
+    pool thread continues the caller's trace. Use one wrapper per submit.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+# Opt in from the environment, e.g. ADFORGE_TRACE_FILE=traces.jsonl streamlit run app.py
+if os.getenv("ADFORGE_TRACE_FILE"):
+    configure_tracing(os.environ["ADFORGE_TRACE_FILE"])
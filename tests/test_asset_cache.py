@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.asset_cache import AssetCache
+
+
+class TestAssetCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_put_and_read_counts_hits_and_misses(self):
+        cache = AssetCache(self.root, max_bytes=1024)
+        self.assertIsNone(cache.read("https://a.png"))
+        cache.put("https://a.png", b"abc")
+        self.assertEqual(cache.read("https://a.png"), b"abc")
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_identical_content_is_stored_once(self):
+        cache = AssetCache(self.root, max_bytes=1024)
+        cache.put("https://a.png", b"same")
+        cache.put("https://b.png", b"same")
+        self.assertEqual(cache.stats()["entries"], 1)
+        self.assertEqual(cache.read("https://b.png"), b"same")
+
+    def test_evicts_least_recently_used(self):
+        cache = AssetCache(self.root, max_bytes=10)
+        cache.put("https://a.png", b"aaaa")
+        cache.put("https://b.png", b"bbbb")
+        cache.read("https://a.png")
+        cache.put("https://c.png", b"cccc")
+        self.assertTrue(cache.contains("https://a.png"))
+        self.assertFalse(cache.contains("https://b.png"))
+        self.assertTrue(cache.contains("https://c.png"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_index_survives_restart(self):
+        AssetCache(self.root).put("https://a.png", b"abc")
+        self.assertEqual(AssetCache(self.root).read("https://a.png"), b"abc")
+        leftovers = [n for n in os.listdir(os.path.join(self.root, "objects")) if n.startswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_failed_put_leaves_no_temp_file(self):
+        cache = AssetCache(self.root)
+        with mock.patch.object(cache, "_publish", side_effect=OSError(28, "No space left on device")):
+            with self.assertRaises(OSError):
+                cache.put("https://a.png", b"abc")
+        self.assertEqual(os.listdir(os.path.join(self.root, "objects")), [])
+
+    def test_fetch_downloads_once(self):
+        with FakeBriaServer(image_bytes=b"x" * 5000) as server:
+            cache = AssetCache(self.root)
+            url = f"{server.base_url}/results/a.png"
+            self.assertEqual(cache.fetch(url), b"x" * 5000)
+            self.assertEqual(cache.fetch(url), b"x" * 5000)
+            self.assertEqual(server.stats["requests"], 1)
+            self.assertEqual(cache.stats()["misses"], 1)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_fetch_downloads_again_when_object_vanishes_after_lookup(self):
+        with FakeBriaServer(image_bytes=b"y" * 100) as server:
+            cache = AssetCache(self.root, max_bytes=150)
+            url = f"{server.base_url}/results/a.png"
+            cache.download(url)
+            lookup = cache.lookup
+
+            def evicted_after_lookup(url):
+                found = lookup(url)
+                cache.lookup = lookup
+                # Another thread stores a result, evicting this one before it is opened.
+                cache.put("https://other.png", b"z" * 100)
+                return found
+
+            cache.lookup = evicted_after_lookup
+            self.assertEqual(cache.fetch(url), b"y" * 100)
+            self.assertEqual(server.stats["requests"], 2)
+            self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_prefetch_waits_for_async_result(self):
+        with FakeBriaServer(image_bytes=b"y" * 3000) as server:
+            cache = AssetCache(self.root)
+            url = f"{server.base_url}/async/0.3/a.png"
+            self.assertEqual(cache.prefetch(url), 404)
+            self.assertFalse(cache.contains(url))
+            time.sleep(0.35)
+            self.assertEqual(cache.prefetch(url), 200)
+            self.assertEqual(cache.read(url), b"y" * 3000)
+            requests_made = server.stats["requests"]
+            self.assertEqual(cache.prefetch(url), 200)
+            self.assertEqual(server.stats["requests"], requests_made)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import asyncio
+import base64
+import inspect
+import threading
+import unittest
+from unittest import mock
+
+from benchmarks.fake_bria import FakeBriaServer
+from services import acreate_packshot, aenhance_prompt, agenerative_fill, create_packshot, generative_fill
+from services.async_http import apost_json, async_call, close_async_client, get_async_client
+from services.errors import Rejected422, ServerError
+from services.http_utils import RetryPolicy
+from services.rate_limit import reset_rate_limiters, set_rate_limiting
+from services.request_body import as_base64_source
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_async_client()
+
+    return asyncio.run(main())
+
+
+class TestApostJson(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer(keep_payloads=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        reset_rate_limiters()
+
+    def _post(self, path, payload=None, **kwargs):
+        kwargs.setdefault("retry", FAST_RETRY)
+        return apost_json(
+            f"{self.server.base_url}{path}",
+            {"api_token": "async-key"},
+            payload or {"prompt": "x"},
+            "Async call",
+            timeout=5,
+            **kwargs,
+        )
+
+    def test_streamed_body_matches_plain_json(self):
+        image = bytes(range(256)) * 40
+        result = run(self._post("/v1/product/packshot", {"file": as_base64_source(image), "sku": "a"}))
+        self.assertIn("result_url", result)
+        self.assertEqual(self.server.last_payload["sku"], "a")
+        self.assertEqual(base64.b64decode(self.server.last_payload["file"]), image)
+
+    def test_retries_and_typed_errors(self):
+        self.assertIn("result_url", run(self._post("/flaky/2/503/async-retry")))
+        with self.assertRaises(Rejected422) as ctx:
+            run(self._post("/status/422/async-rejected"))
+        self.assertEqual(ctx.exception.attempts, 1)
+        with self.assertRaises(ServerError) as ctx:
+            run(self._post("/status/500/async-down"))
+        self.assertEqual(ctx.exception.attempts, 3)
+
+    def test_many_calls_share_one_client(self):
+        set_rate_limiting(False)
+        self.addCleanup(set_rate_limiting, True)
+
+        async def main():
+            client = get_async_client()
+            results = await asyncio.gather(*(self._post(f"/v1/gen/{i}") for i in range(50)))
+            self.assertIs(get_async_client(), client)
+            await close_async_client()
+            return results
+
+        results = asyncio.run(main())
+        self.assertEqual(len({r["result_url"] for r in results}), 50)
+
+
+class TestAsyncWrappers(unittest.TestCase):
+    def test_same_payload_as_sync_wrapper(self):
+        image = b"not-an-image"
+        with mock.patch("services.http_utils.post_json", return_value={}) as sync_post:
+            create_packshot("key", image, background_color="#000000", sku="s1")
+        with mock.patch("services.async_http.apost_json", new=mock.AsyncMock(return_value={})) as async_post:
+            run(acreate_packshot("key", image, background_color="#000000", sku="s1"))
+        sync_kwargs, async_kwargs = sync_post.call_args.kwargs, async_post.call_args.kwargs
+        self.assertEqual(sync_kwargs["url"], async_kwargs["url"])
+        self.assertEqual(sync_kwargs["payload"].keys(), async_kwargs["payload"].keys())
+        self.assertEqual(async_kwargs["payload"]["sku"], "s1")
+        self.assertTrue(async_kwargs["cacheable"])
+
+    def test_wrappers_keep_signature(self):
+        for sync_fn, async_fn in ((create_packshot, acreate_packshot), (generative_fill, agenerative_fill)):
+            self.assertEqual(inspect.signature(sync_fn), inspect.signature(async_fn))
+            self.assertTrue(inspect.iscoroutinefunction(async_fn))
+        self.assertIn("background_color", inspect.signature(create_packshot).parameters)
+        self.assertEqual(create_packshot.__name__, "create_packshot")
+
+    def test_request_is_built_off_the_event_loop(self):
+        build_threads = []
+
+        def build(value):
+            build_threads.append(threading.get_ident())
+            return dict(url="https://x", headers={}, payload={"v": value}, operation_name="Test")
+
+        call = async_call(build, "acall_test")
+        with mock.patch("services.async_http.apost_json", new=mock.AsyncMock(return_value={"ok": 1})) as post:
+            self.assertEqual(run(call(3)), {"ok": 1})
+        self.assertEqual(post.call_args.kwargs["payload"], {"v": 3})
+        self.assertNotEqual(build_threads, [threading.get_ident()])
+
+    def test_enhance_prompt_falls_back_to_original(self):
+        with mock.patch("services.prompt_enhancement.apost_json", new=mock.AsyncMock(side_effect=ServerError("down"))):
+            self.assertEqual(run(aenhance_prompt("key", "a red shoe")), "a red shoe")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from workflows.batch_catalog import load_completed, read_manifest, run_catalog
+
+
+def _fake_ad_set(api_key, image=None, prompt=None, config=None):
+    if image == b"bad":
+        raise RuntimeError("upload failed")
+    return {
+        "packshot": {"result_url": f"https://cdn/{config['background_color']}.png"},
+        "timings": {"packshot": 0.01},
+        "errors": {},
+        "skipped": [],
+    }
+
+
+class TestBatchCatalog(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+        for name, data in (("a.png", b"a"), ("b.png", b"b"), ("c.png", b"bad")):
+            with open(os.path.join(self.dir, name), "wb") as f:
+                f.write(data)
+        self.manifest = os.path.join(self.dir, "manifest.csv")
+        with open(self.manifest, "w", encoding="utf-8") as f:
+            f.write("sku,image_path,background_color\n")
+            f.write("A,a.png,#000000\nB,b.png,\nC,c.png,\nA,a.png,\n")
+        self.output = os.path.join(self.dir, "out.jsonl")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _run(self):
+        with mock.patch("workflows.batch_catalog.generate_ad_set", side_effect=_fake_ad_set):
+            return run_catalog(self.manifest, self.output, "key", config={"background_color": "#FFFFFF"}, max_workers=2)
+
+    def test_manifest_rows_override_config(self):
+        rows = list(read_manifest(self.manifest))
+        self.assertEqual(rows[0], {"sku": "A", "image_path": "a.png", "background_color": "#000000"})
+        self.assertEqual(rows[1], {"sku": "B", "image_path": "b.png"})
+
+    def test_writes_records_and_resumes(self):
+        summary = self._run()
+        self.assertEqual((summary["processed"], summary["ok"], summary["failed"], summary["skipped"]), (3, 2, 1, 1))
+        with open(self.output, encoding="utf-8") as f:
+            records = {r["sku"]: r for r in map(json.loads, f)}
+        self.assertEqual(records["A"]["urls"], {"packshot": ["https://cdn/#000000.png"]})
+        self.assertEqual(records["B"]["urls"], {"packshot": ["https://cdn/#FFFFFF.png"]})
+        self.assertEqual(records["C"]["status"], "error")
+        self.assertEqual(load_completed(self.output), {"A", "B"})
+
+        summary = self._run()
+        self.assertEqual((summary["processed"], summary["skipped"]), (1, 3))
+
+    def test_truncated_checkpoint_line_is_ignored(self):
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"sku": "A", "status": "ok"}) + "\n{\"sku\": \"B\", \"sta")
+        self.assertEqual(load_completed(self.output), {"A"})
+
+    def test_resume_after_truncated_line_writes_readable_records(self):
+        with open(self.output, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"sku": "A", "status": "ok"}) + "\n{\"sku\": \"B\", \"sta")
+        summary = self._run()
+        self.assertEqual((summary["processed"], summary["skipped"]), (2, 2))
+        with open(self.output, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        # The partial line stays on its own; both new records are readable.
+        self.assertEqual(lines[1], '{"sku": "B", "sta')
+        self.assertEqual(sorted(json.loads(line)["sku"] for line in lines[2:]), ["B", "C"])
+        self.assertEqual(load_completed(self.output), {"A", "B"})
+        self.assertEqual(self._run()["processed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
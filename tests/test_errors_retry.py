@@ -0,0 +1,109 @@
+import time
+import unittest
+from unittest import mock
+
+import requests
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.errors import BriaAPIError, NetworkError, NetworkTimeout, RateLimited, Rejected422, ServerError
+from services.http_utils import NO_RETRY, RetryPolicy, post_json, response_error, retry_or_raise
+from services.rate_limit import reset_rate_limiters
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+class TestPostJsonRetry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        reset_rate_limiters()
+
+    def _post(self, path, **kwargs):
+        kwargs.setdefault("retry", FAST_RETRY)
+        return post_json(
+            f"{self.server.base_url}{path}",
+            {"api_token": "test-key"},
+            {"prompt": "x"},
+            "Test call",
+            timeout=5,
+            **kwargs,
+        )
+
+    def test_transient_errors_are_retried_with_one_idempotency_key(self):
+        keys_before = len(self.server.idempotency_keys)
+        result = self._post("/flaky/2/503/retry-ok")
+        self.assertIn("result_url", result)
+        keys = self.server.idempotency_keys[keys_before:]
+        self.assertEqual(len(keys), 3)
+        self.assertEqual(len(set(keys)), 1)
+        self.assertTrue(keys[0])
+
+    def test_server_error_after_budget_carries_metadata(self):
+        with self.assertRaises(ServerError) as ctx:
+            self._post("/status/502/always")
+        error = ctx.exception
+        self.assertEqual(error.status_code, 502)
+        self.assertEqual(error.attempts, 3)
+        self.assertIsNotNone(error.latency)
+        self.assertEqual(str(error), "Test call failed (status=502): injected status 502")
+
+    def test_422_fails_fast(self):
+        requests_before = self.server.stats["requests"]
+        with self.assertRaises(Rejected422) as ctx:
+            self._post("/status/422/rejected")
+        self.assertEqual(ctx.exception.attempts, 1)
+        self.assertEqual(self.server.stats["requests"] - requests_before, 1)
+
+    def test_rate_limited_exposes_retry_after(self):
+        with self.assertRaises(RateLimited) as ctx:
+            self._post("/status/429/quota", retry=NO_RETRY)
+        self.assertEqual(ctx.exception.retry_after, 0.0)
+        self.assertTrue(ctx.exception.retryable)
+
+    def test_network_errors(self):
+        with mock.patch("services.http_utils.get_session") as session:
+            session.return_value.post.side_effect = requests.exceptions.ConnectionError("refused")
+            with self.assertRaises(NetworkError) as ctx:
+                self._post("/ok")
+        self.assertEqual(ctx.exception.attempts, 3)
+        self.assertIn("network error", str(ctx.exception))
+
+    def test_read_timeout_only_retried_when_idempotent(self):
+        with mock.patch("services.http_utils.get_session") as session:
+            session.return_value.post.side_effect = requests.exceptions.ReadTimeout("slow")
+            with self.assertRaises(NetworkTimeout) as ctx:
+                self._post("/ok")
+            self.assertEqual(ctx.exception.attempts, 1)
+            with self.assertRaises(NetworkTimeout) as ctx:
+                self._post("/ok", cacheable=True)
+            self.assertEqual(ctx.exception.attempts, 3)
+
+    def test_time_budget_stops_retries(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=10.0, max_delay=10.0, budget_seconds=1.0)
+        with self.assertRaises(ServerError) as ctx:
+            self._post("/status/500/slow-backoff", retry=policy)
+        self.assertEqual(ctx.exception.attempts, 1)
+
+    def test_invalid_success_body_fails_without_retry(self):
+        response = mock.Mock(status_code=200)
+        start = time.monotonic()
+        self.assertIsNone(response_error(response, True, None, "Test call", start, 1))
+        error = response_error(response, True, ValueError("bad"), "Test call", start, 1)
+        self.assertEqual(type(error), BriaAPIError)
+        self.assertIsInstance(error.__cause__, ValueError)
+        with self.assertRaises(BriaAPIError):
+            retry_or_raise("https://x/v1/test", error, 1, FAST_RETRY, None, start)
+
+    def test_all_errors_share_base_class(self):
+        for cls in (RateLimited, ServerError, Rejected422, NetworkError, NetworkTimeout):
+            self.assertTrue(issubclass(cls, BriaAPIError))
+
+
+if __name__ == "__main__":
+    unittest.main()
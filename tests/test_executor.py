@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from services.hub import acting_as, current_user
+from services.tracing import configure_tracing, current_context, disable_tracing, span
+from workflows.executor import SEQUENTIAL, Step, run_steps
+from workflows.generate_ad_set import generate_ad_set
+
+
+def _sleeper(value, seconds=0.2):
+    def fn(deps):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+class TestRunSteps(unittest.TestCase):
+    def test_independent_steps_run_concurrently(self):
+        steps = [Step(name, _sleeper(name)) for name in ("a", "b", "c")]
+        run = run_steps(steps, max_concurrency=3)
+        self.assertEqual(run.results, {"a": "a", "b": "b", "c": "c"})
+        self.assertLess(run.wall_time, 0.5)
+        self.assertEqual(set(run.timings), {"a", "b", "c"})
+
+    def test_concurrency_limit_is_respected(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def fn(deps):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+
+        run_steps([Step(str(i), fn) for i in range(6)], max_concurrency=2)
+        self.assertLessEqual(max(peak), 2)
+
+    def test_dependencies_receive_results_and_failures_skip_dependents(self):
+        def boom(deps):
+            raise RuntimeError("boom")
+
+        steps = [
+            Step("source", lambda deps: 2),
+            Step("double", lambda deps: deps["source"] * 2, ("source",)),
+            Step("broken", boom, ("source",)),
+            Step("after_broken", lambda deps: 1, ("broken",)),
+        ]
+        run = run_steps(steps)
+        self.assertEqual(run.results, {"source": 2, "double": 4})
+        self.assertEqual(str(run.errors["broken"]), "boom")
+        self.assertEqual(run.skipped, ["after_broken"])
+
+    def test_sequential_mode_runs_in_dependency_order(self):
+        order = []
+        steps = [
+            Step("b", lambda deps: order.append("b"), ("a",)),
+            Step("a", lambda deps: order.append("a")),
+            Step("c", lambda deps: order.append("c")),
+        ]
+        run_steps(steps, mode=SEQUENTIAL)
+        self.assertEqual(order, ["a", "c", "b"])
+
+    def test_parallel_steps_keep_the_callers_user_and_trace(self):
+        seen = {}
+
+        def fn(name):
+            def step(deps):
+                time.sleep(0.05)
+                seen[name] = (current_user(), current_context())
+            return step
+
+        with tempfile.TemporaryDirectory() as tmp:
+            configure_tracing(os.path.join(tmp, "traces.jsonl"))
+            try:
+                with acting_as("alice"), span("workflow") as parent:
+                    run_steps([Step(name, fn(name)) for name in ("a", "b", "c")], max_concurrency=3)
+            finally:
+                disable_tracing()
+        self.assertEqual(seen, {name: ("alice", parent.context) for name in ("a", "b", "c")})
+
+    def test_cycles_are_rejected(self):
+        steps = [Step("a", lambda deps: 1, ("b",)), Step("b", lambda deps: 1, ("a",))]
+        with self.assertRaises(ValueError):
+            run_steps(steps)
+
+
+class TestGenerateAdSet(unittest.TestCase):
+    def test_fans_out_and_reports_partial_results(self):
+        config = {"create_packshot": True, "add_shadow": True, "lifestyle_shot": True}
+        with mock.patch("workflows.generate_ad_set.create_packshot", return_value={"result_url": "p"}), \
+                mock.patch("workflows.generate_ad_set.add_shadow", side_effect=RuntimeError("status=503")), \
+                mock.patch("workflows.generate_ad_set.lifestyle_shot_by_text", return_value={"result": []}):
+            result = generate_ad_set("key", image=b"img", config=config)
+        self.assertEqual(result["packshot"], {"result_url": "p"})
+        self.assertEqual(result["lifestyle"], {"result": []})
+        self.assertEqual(result["errors"], {"shadow": "status=503"})
+        self.assertEqual(set(result["timings"]), {"packshot", "shadow", "lifestyle"})
+
+
+if __name__ == "__main__":
+    unittest.main()
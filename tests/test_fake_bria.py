@@ -0,0 +1,41 @@
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services import create_packshot, generative_fill, lifestyle_shot_by_text
+from services.errors import RateLimited
+from services.http_utils import RetryPolicy, post_json
+from services.rate_limit import set_rate_limiting
+from utils.result_utils import extract_result_urls
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+
+
+class TestFakeBriaServer(unittest.TestCase):
+    def setUp(self):
+        set_rate_limiting(False)
+
+    def tearDown(self):
+        set_rate_limiting(True)
+
+    def test_routes_service_calls_with_endpoint_shaped_responses(self):
+        with FakeBriaServer(async_delay=0.5) as server, server.route_api():
+            packshot = create_packshot(api_key="k", image_data=IMAGE)
+            fill = generative_fill(api_key="k", image_data=IMAGE, mask_data=IMAGE, prompt="vase", num_results=3)
+            lifestyle = lifestyle_shot_by_text(api_key="k", image_data=IMAGE, scene_description="beach", num_results=2)
+        self.assertEqual(len(extract_result_urls(packshot)), 1)
+        self.assertIn("/results/", packshot["result_url"])
+        fill_urls = extract_result_urls(fill)
+        self.assertEqual(len(fill_urls), 3)
+        self.assertTrue(all("/async/0.5/" in url for url in fill_urls))
+        self.assertEqual(len(extract_result_urls(lifestyle, endpoint="lifestyle_shot_by_text")), 2)
+
+    def test_injected_errors_are_retried(self):
+        with FakeBriaServer(error_rate_429=1.0) as server:
+            url = f"{server.base_url}/v1/product/packshot"
+            with self.assertRaises(RateLimited):
+                post_json(url, {}, {"file": "x"}, "Packshot", retry=RetryPolicy(max_attempts=2, base_delay=0))
+            self.assertEqual(server.stats["requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
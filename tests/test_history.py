@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+
+from services import generative_fill
+from workflows.history import HistoryStore, call_params
+from workflows.jobs import DONE, FAILED, Job, JobStore
+
+
+def make_job(i, session="s1", source="Create Packshot", sku=None, state=DONE):
+    return Job(
+        id=f"job{i:06d}",
+        label="Create packshot",
+        source=source,
+        owner=session,
+        state=state,
+        urls=[f"https://example.com/{i}.png"],
+        meta={"params": {"sku": sku} if sku else {}},
+        created_at=1000.0 + i,
+    )
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(os.path.join(self.tmp.name, "history.sqlite3"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_uses_wal(self):
+        mode = self.store._conn().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_save_round_trips_and_updates(self):
+        job = make_job(1, sku="SKU-1", state="running")
+        self.store.save(job)
+        self.store.set_asset_paths(job.id, {job.urls[0]: "/cache/a"})
+        job.state, job.started_at, job.finished_at = DONE, 1001.0, 1003.5
+        self.store.save(job)
+        entry = self.store.get(job.id)
+        self.assertEqual(entry.state, DONE)
+        self.assertEqual(entry.sku, "SKU-1")
+        self.assertEqual(entry.urls, job.urls)
+        self.assertEqual(entry.asset_paths, {job.urls[0]: "/cache/a"})
+        self.assertAlmostEqual(entry.duration, 2.5)
+
+    def test_keyset_pages_cover_all_rows_once(self):
+        for i in range(25):
+            self.store.save(make_job(i, session="s1" if i % 2 else "s2"))
+        seen, cursor = [], None
+        while True:
+            page = self.store.page(session_id="s1", limit=4, before=cursor)
+            seen.extend(e.id for e in page.entries)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+        expected = [f"job{i:06d}" for i in reversed(range(25)) if i % 2]
+        self.assertEqual(seen, expected)
+
+    def test_filters_by_sku_and_source(self):
+        self.store.save(make_job(1, sku="A"))
+        self.store.save(make_job(2, sku="B", source="Add Shadow"))
+        self.assertEqual([e.id for e in self.store.page(sku="A").entries], ["job000001"])
+        self.assertEqual([e.id for e in self.store.page(source="Add Shadow").entries], ["job000002"])
+        self.assertEqual(self.store.latest("s1").id, "job000002")
+
+    def test_pages_are_served_from_indexes(self):
+        conn = self.store._conn()
+        for column in ("session_id", "sku", "source"):
+            plan = " ".join(
+                row[3] for row in conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM jobs WHERE {column} = ? "
+                    "AND (created_at, id) < (?, ?) "
+                    "ORDER BY created_at DESC, id DESC LIMIT 21",
+                    ("x", 1.0, "a"),
+                )
+            )
+            self.assertIn("(created_at,id)<(?,?)", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_concurrent_writers(self):
+        def write(offset):
+            for i in range(50):
+                self.store.save(make_job(offset + i))
+
+        threads = [threading.Thread(target=write, args=(n * 1000,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.store.count(), 200)
+
+    def test_job_store_writes_through_on_state_changes(self):
+        jobs = JobStore(history=self.store)
+        job = make_job(7, state="queued")
+        jobs.add(job)
+        jobs.update(job.id, progress="1/2 ready")
+        self.assertEqual(self.store.get(job.id).state, "queued")
+        jobs.update(job.id, state=FAILED, error="boom")
+        self.assertEqual(self.store.get(job.id).error, "boom")
+
+
+class TestCallParams(unittest.TestCase):
+    def test_drops_key_and_summarizes_bytes(self):
+        fn = partial(print, api_key="secret", image_data=b"1234", sku="X", num_results=2)
+        self.assertEqual(call_params(fn), {"image_data": {"bytes": 4}, "sku": "X", "num_results": 2})
+
+    def test_positional_arguments_are_named(self):
+        fn = partial(generative_fill, "secret", b"123", b"45", "a vase", num_results=2)
+        self.assertEqual(
+            call_params(fn),
+            {"image_data": {"bytes": 3}, "mask_data": {"bytes": 2}, "prompt": "a vase", "num_results": 2},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services import http_client
+from services.http_utils import post_json
+
+
+class TestHttpClient(unittest.TestCase):
+    def tearDown(self):
+        http_client.configure_http_client(
+            pool_maxsize=http_client.DEFAULT_POOL_MAXSIZE,
+            host_pool_sizes=http_client.DEFAULT_HOST_POOL_SIZES,
+            connect_timeout=http_client.DEFAULT_CONNECT_TIMEOUT,
+        )
+
+    def test_session_is_shared(self):
+        self.assertIs(http_client.get_session(), http_client.get_session())
+
+    def test_bria_host_gets_dedicated_pool(self):
+        session = http_client.get_session()
+        adapter = session.get_adapter("https://engine.prod.bria-api.com/v1/product/packshot")
+        self.assertEqual(adapter._pool_maxsize, http_client.DEFAULT_HOST_POOL_SIZES["engine.prod.bria-api.com"])
+        other = session.get_adapter("https://cdn.example.com/a.png")
+        self.assertEqual(other._pool_maxsize, http_client.DEFAULT_POOL_MAXSIZE)
+
+    def test_timeout_tuple(self):
+        http_client.configure_http_client(connect_timeout=3.0)
+        self.assertEqual(http_client.build_timeout(30), (3.0, 30))
+        self.assertEqual(http_client.build_timeout(1), (1, 1))
+
+    def test_post_json_reuses_connection(self):
+        with FakeBriaServer() as server:
+            url = f"{server.base_url}/v1/product/packshot"
+            for _ in range(5):
+                post_json(url, {}, {"x": 1}, "Test", timeout=5)
+            http_client.close_http_client()
+            self.assertEqual(server.stats["requests"], 5)
+            self.assertEqual(server.stats["connections"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_utils import post_json
+from services.hub import FileStore, ServiceHub, acting_as, get_hub, open_store
+from services.result_cache import disable_result_cache
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_calls_run_once(self):
+        hub = ServiceHub()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(5)
+            return {"result_url": "u"}
+
+        results = {}
+
+        def worker(user):
+            with acting_as(user):
+                results[user] = hub.call("key", fn)
+
+        threads = [threading.Thread(target=worker, args=(f"user{i}",)) for i in range(5)]
+        for t in threads:
+            t.start()
+        while not calls:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(list(results.values()), [{"result_url": "u"}] * 5)
+        usage = [hub.usage(f"user{i}") for i in range(5)]
+        self.assertEqual(sum(u["requests"] for u in usage), 1)
+        self.assertEqual(sum(u["shared"] for u in usage), 4)
+        self.assertEqual(hub.stats()["in_flight"], 0)
+
+    def test_failure_reaches_every_waiter(self):
+        hub = ServiceHub()
+        started = threading.Event()
+
+        def fn():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        errors = []
+
+        def worker():
+            try:
+                hub.call("key", fn)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=worker)
+        follower.start()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(hub.stats()["errors"], 1)
+
+    def test_unkeyed_calls_are_never_shared(self):
+        hub = ServiceHub()
+        hub.call(None, lambda: 1)
+        hub.call(None, lambda: 1)
+        self.assertEqual(hub.stats()["requests"], 2)
+
+    def test_async_calls_share_one_flight(self):
+        hub = ServiceHub()
+        calls = []
+
+        async def afn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"result_url": "u"}
+
+        async def run():
+            return await asyncio.gather(*(hub.acall("key", afn) for _ in range(4)))
+
+        self.assertEqual(asyncio.run(run()), [{"result_url": "u"}] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_cancelled_leader_does_not_strand_followers(self):
+        hub = ServiceHub()
+        calls = []
+
+        async def afn():
+            calls.append(1)
+            await asyncio.sleep(0.2 if len(calls) == 1 else 0)
+            return {"result_url": "u"}
+
+        async def run():
+            leader = asyncio.create_task(hub.acall("key", afn))
+            await asyncio.sleep(0.05)
+            follower = asyncio.create_task(hub.acall("key", afn))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            # The waiting follower takes over, and later calls are not stuck either.
+            self.assertEqual(await asyncio.wait_for(follower, 5), {"result_url": "u"})
+            self.assertEqual(await asyncio.wait_for(hub.acall("key", afn), 5), {"result_url": "u"})
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(hub.stats()["in_flight"], 0)
+
+    def test_interrupted_sync_leader_is_cleared(self):
+        hub = ServiceHub()
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            hub.call("key", interrupted)
+        self.assertEqual(hub.stats()["in_flight"], 0)
+        self.assertEqual(hub.call("key", lambda: {"result_url": "u"}), {"result_url": "u"})
+
+
+class TestFileStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_results_are_shared_between_hubs(self):
+        # Two hubs stand in for two server processes sharing one directory.
+        first = ServiceHub(store=FileStore(self.tmp.name))
+        second = ServiceHub(store=FileStore(self.tmp.name))
+        first.call("key", lambda: {"result_url": "u"})
+        self.assertEqual(second.call("key", lambda: self.fail("API called twice")), {"result_url": "u"})
+        self.assertEqual(second.stats()["cache_hits"], 1)
+
+    def test_entries_expire(self):
+        store = FileStore(self.tmp.name, ttl=0.05)
+        store.put("key", {"a": 1})
+        self.assertEqual(store.get("key"), {"a": 1})
+        time.sleep(0.06)
+        self.assertIsNone(store.get("key"))
+
+    def test_open_store_specs(self):
+        self.assertIsNone(open_store("memory"))
+        self.assertIsInstance(open_store(f"file:{os.path.join(self.tmp.name, 'shared')}"), FileStore)
+        with self.assertRaises(ValueError):
+            open_store("ftp://nowhere")
+
+
+class TestPostJsonAccounting(unittest.TestCase):
+    def tearDown(self):
+        disable_result_cache()
+
+    def test_calls_are_accounted_per_user(self):
+        with FakeBriaServer() as server:
+            url = f"{server.base_url}/v1/product/packshot"
+            with acting_as("alice"):
+                post_json(url, {}, {"file": "AAAA"}, "Packshot creation")
+            with acting_as("bob"):
+                post_json(url, {}, {"file": "AAAA"}, "Packshot creation")
+                post_json(url, {}, {"file": "AAAA"}, "Packshot creation")
+        self.assertEqual(get_hub().usage("alice")["requests"], 1)
+        self.assertEqual(get_hub().usage("bob")["requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from utils import ImageHandle
+from utils.mask_utils import clear_mask_cache
+
+
+def _encode(img, fmt):
+    out = io.BytesIO()
+    img.save(out, format=fmt)
+    return out.getvalue()
+
+
+class TestImageHandle(unittest.TestCase):
+    def setUp(self):
+        self.jpeg = _encode(Image.new("RGB", (2000, 1000), (200, 30, 30)), "JPEG")
+
+    def test_size_and_canvas_size(self):
+        handle = ImageHandle(self.jpeg)
+        self.assertEqual(handle.size, (2000, 1000))
+        self.assertEqual(handle.canvas_size(), (800, 400))
+        small = ImageHandle(_encode(Image.new("RGB", (300, 200)), "PNG"))
+        self.assertEqual(small.canvas_size(), (300, 200))
+
+    def test_preview_is_decoded_once(self):
+        handle = ImageHandle(self.jpeg)
+        handle.size  # header only
+        with mock.patch("PIL.Image.open", wraps=Image.open) as image_open:
+            preview = handle.canvas_preview()
+            self.assertIs(handle.canvas_preview(), preview)
+            handle.rgb_array()
+            handle.rgb_array()
+            self.assertEqual(image_open.call_count, 1)
+        self.assertEqual(preview.size, (800, 400))
+        self.assertEqual(preview.mode, "RGB")
+
+    def test_rgb_array_is_read_only_uint8(self):
+        rgba = _encode(Image.new("RGBA", (100, 50), (0, 255, 0, 128)), "PNG")
+        arr = ImageHandle(rgba).rgb_array()
+        self.assertEqual(arr.shape, (50, 100, 3))
+        self.assertEqual(arr.dtype, np.uint8)
+        self.assertFalse(arr.flags.writeable)
+
+    def test_digest_and_data(self):
+        handle = ImageHandle(bytearray(self.jpeg))
+        self.assertIsInstance(handle.data, bytes)
+        self.assertEqual(handle.digest, ImageHandle(self.jpeg).digest)
+
+    def test_mask_bytes_at_original_size(self):
+        clear_mask_cache()
+        handle = ImageHandle(self.jpeg)
+        canvas = np.zeros((400, 800, 4), dtype=np.uint8)
+        canvas[:200, :400] = 255
+        mask = Image.open(io.BytesIO(handle.mask_bytes(canvas)))
+        self.assertEqual(mask.size, (2000, 1000))
+        arr = np.array(mask.convert("L"))
+        self.assertEqual(arr[0, 0], 255)
+        self.assertEqual(arr[-1, -1], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import unittest
+
+from PIL import Image
+
+from services.image_prep import configure_image_prep, prepare_image, resize_mask
+
+
+def _encode(img, fmt, **kwargs):
+    out = io.BytesIO()
+    img.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+class TestPrepareImage(unittest.TestCase):
+    def tearDown(self):
+        configure_image_prep(enabled=True)
+
+    def test_small_clean_image_passes_through(self):
+        data = _encode(Image.new("RGB", (64, 48), "red"), "PNG")
+        prepared = prepare_image(data, "packshot")
+        self.assertIs(prepared.data, data)
+        self.assertEqual(prepared.report.action, "unchanged")
+
+    def test_large_image_is_downscaled_to_cap(self):
+        data = _encode(Image.new("RGB", (3000, 2000), "blue"), "JPEG", quality=98)
+        prepared = prepare_image(data, "packshot", max_side=1000)
+        self.assertEqual(prepared.size, (1000, 667))
+        self.assertEqual(Image.open(io.BytesIO(prepared.data)).size, (1000, 667))
+        self.assertGreater(prepared.report.saved_bytes, 0)
+
+    def test_metadata_is_stripped_and_orientation_applied(self):
+        img = Image.new("RGB", (40, 20), "green")
+        exif = img.getexif()
+        exif[0x0112] = 6  # rotate 90 degrees clockwise when displayed
+        data = _encode(img, "JPEG", exif=exif.tobytes(), quality=100)
+        prepared = prepare_image(data, "packshot")
+        out = Image.open(io.BytesIO(prepared.data))
+        self.assertEqual(out.size, (20, 40))
+        self.assertFalse(out.getexif())
+
+    def test_disabled_stage_is_a_no_op(self):
+        configure_image_prep(enabled=False)
+        data = _encode(Image.new("RGB", (5000, 10), "red"), "PNG")
+        self.assertIs(prepare_image(data, "packshot").data, data)
+
+    def test_resize_mask_keeps_binary_values(self):
+        mask = Image.new("L", (100, 50), 0)
+        mask.paste(255, (10, 10, 60, 40))
+        resized = Image.open(io.BytesIO(resize_mask(_encode(mask, "PNG"), (50, 25))))
+        self.assertEqual(resized.size, (50, 25))
+        self.assertEqual(set(resized.getdata()), {0, 255})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.asset_cache import AssetCache
+from workflows.history import HistoryStore
+from workflows.jobs import DONE, FAILED, POLLING, JobQueue, JobStore
+
+
+def wait_for(queue, job_id, timeout=5):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        job = queue.get(job_id)
+        if not job.active:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {queue.get(job_id).state}")
+
+
+class TestJobQueue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = AssetCache(self._tmp.name)
+        self.queue = JobQueue(max_workers=2, poll_deadline=5, cache=self.cache)
+
+    def tearDown(self):
+        self.queue.shutdown()
+        self._tmp.cleanup()
+
+    def test_submit_returns_before_call_finishes(self):
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return {"result_url": "https://example.com/a.png"}
+
+        start = time.monotonic()
+        job_id = self.queue.submit(slow, "Slow", "Test", owner="u1")
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertTrue(self.queue.get(job_id).active)
+        release.set()
+        job = wait_for(self.queue, job_id)
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(job.urls, ["https://example.com/a.png"])
+
+    def test_limit_applies_to_extracted_urls(self):
+        result = {"result_urls": [f"https://example.com/{i}.png" for i in range(4)]}
+        job = wait_for(self.queue, self.queue.submit(lambda: result, "Many", "Test", owner="u1", limit=2))
+        self.assertEqual(len(job.urls), 2)
+
+    def test_async_urls_are_polled_in_worker(self):
+        url = f"{self.server.base_url}/async/0.2/job.png"
+        job_id = self.queue.submit(lambda: {"result_url": url}, "Async", "Test", owner="u1", poll=True)
+        job = wait_for(self.queue, job_id)
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(job.urls, [url])
+        self.assertEqual(job.failed_urls, [])
+        # Ready results were prefetched while polling.
+        self.assertEqual(self.cache.read(url), self.server.httpd.image_bytes)
+
+    def test_prefetched_asset_paths_reach_history(self):
+        history = HistoryStore(os.path.join(self._tmp.name, "history.sqlite3"))
+        queue = JobQueue(JobStore(history=history), max_workers=1, poll_deadline=5, cache=self.cache)
+        url = f"{self.server.base_url}/async/0.1/history.png"
+        try:
+            job = wait_for(queue, queue.submit(lambda: {"result_url": url}, "Async", "Test", owner="u1", poll=True))
+        finally:
+            queue.shutdown()
+        self.assertEqual(job.state, DONE)
+        entry = history.latest("u1")
+        self.assertEqual(list(entry.asset_paths), [url])
+        self.assertTrue(os.path.exists(entry.asset_paths[url]))
+        # Bookkeeping does not count as cache traffic.
+        self.assertEqual(self.cache.stats()["hits"] + self.cache.stats()["misses"], 0)
+        history.close()
+
+    def test_long_polls_do_not_block_new_calls(self):
+        # More polling jobs than call workers; none of them may hold a worker.
+        polling = [
+            self.queue.submit(
+                lambda i=i: {"result_url": f"{self.server.base_url}/async/1.5/slow-{i}.png"},
+                "Async", "Test", owner="u1", poll=True,
+            )
+            for i in range(4)
+        ]
+        fresh = self.queue.submit(lambda: {"result_url": "https://example.com/a.png"}, "Fast", "Test", owner="u2")
+        job = wait_for(self.queue, fresh, timeout=1)
+        self.assertEqual(job.state, DONE)
+        self.assertEqual({self.queue.get(job_id).state for job_id in polling}, {POLLING})
+        for job_id in polling:
+            self.assertEqual(wait_for(self.queue, job_id).state, DONE)
+
+    def test_failure_keeps_exception(self):
+        def boom():
+            raise ValueError("bad input")
+
+        job = wait_for(self.queue, self.queue.submit(boom, "Boom", "Test", owner="u1"))
+        self.assertEqual(job.state, FAILED)
+        self.assertEqual(job.error_type, "ValueError")
+        self.assertIsInstance(job.exception, ValueError)
+
+    def test_empty_result_fails(self):
+        job = wait_for(self.queue, self.queue.submit(lambda: {}, "Empty", "Test", owner="u1"))
+        self.assertEqual(job.state, FAILED)
+
+    def test_jobs_are_listed_per_owner_newest_first(self):
+        ids = [self.queue.submit(lambda: {"result_url": "u"}, f"Job {i}", "Test", owner="u2") for i in range(3)]
+        self.queue.submit(lambda: {"result_url": "u"}, "Other", "Test", owner="u3")
+        self.assertEqual([j.id for j in self.queue.jobs_for("u2")], ids[::-1])
+
+    def test_store_prunes_finished_jobs_only(self):
+        store = JobStore(max_jobs=2)
+        queue = JobQueue(store=store, max_workers=1)
+        try:
+            first = queue.submit(lambda: {"result_url": "u"}, "First", "Test", owner="u1")
+            wait_for(queue, first)
+            for i in range(2):
+                wait_for(queue, queue.submit(lambda: {"result_url": "u"}, "Next", "Test", owner="u1"))
+            self.assertIsNone(queue.get(first))
+            self.assertEqual(len(store.list()), 2)
+        finally:
+            queue.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
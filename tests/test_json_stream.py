@@ -0,0 +1,71 @@
+import json
+import unittest
+
+from services.json_stream import JSONStreamParser, ResponseParser, load_json
+
+
+def _chunks(raw, size):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+class TestJSONStreamParser(unittest.TestCase):
+    def test_matches_json_loads_for_any_chunking(self):
+        doc = {
+            "result": [["https://a.png", 12, "s-1"], {"urls": ["https://b.png"]}],
+            "text": 'quote " backslash \\ unicode é ☃ newline \n',
+            "numbers": [0, -1.5, 2e10, 12345678901234567890],
+            "flags": [True, False, None],
+            "empty": [{}, [], ""],
+        }
+        raw = json.dumps(doc).encode("utf-8")
+        for size in (1, 2, 3, 7, len(raw)):
+            self.assertEqual(load_json(_chunks(raw, size)), doc)
+
+    def test_escaped_quote_split_across_chunks(self):
+        raw = json.dumps({"a": 'x\\"y\\\\', "b": 1}).encode("utf-8")
+        for cut in range(1, len(raw)):
+            self.assertEqual(load_json([raw[:cut], raw[cut:]]), {"a": 'x\\"y\\\\', "b": 1})
+
+    def test_long_strings_are_dropped(self):
+        raw = json.dumps({"image_file": "A" * 5000, "result_url": "https://a.png"}).encode("utf-8")
+        parser = JSONStreamParser(max_string=1024)
+        for chunk in _chunks(raw, 512):
+            parser.feed(chunk)
+        self.assertEqual(parser.close(), {"image_file": None, "result_url": "https://a.png"})
+        self.assertEqual(parser.skipped_strings, 1)
+        self.assertEqual(parser.bytes_read, len(raw))
+
+    def test_invalid_documents_raise_value_error(self):
+        for raw in (b'{"a":}', b"[1,]", b'{"a" 1}', b"[1] 2", b'{"a": 1', b"tru", b"[1}", b'"open'):
+            with self.assertRaises(ValueError, msg=raw):
+                load_json([raw])
+
+
+class TestResponseParser(unittest.TestCase):
+    def test_small_bodies_use_json_loads(self):
+        raw = json.dumps({"result_url": "https://a.png", "input": "A" * 100000}).encode("utf-8")
+        parser = ResponseParser(stream_above=len(raw))
+        for chunk in _chunks(raw, 4096):
+            parser.feed(chunk)
+        self.assertEqual(parser.close(), json.loads(raw))
+        self.assertFalse(parser.streaming)
+        self.assertEqual(parser.bytes_read, len(raw))
+
+    def test_large_bodies_are_streamed(self):
+        raw = json.dumps({"result_url": "https://a.png", "input": "A" * 100000}).encode("utf-8")
+        parser = ResponseParser(stream_above=10000)
+        for chunk in _chunks(raw, 4096):
+            parser.feed(chunk)
+        self.assertTrue(parser.streaming)
+        self.assertEqual(parser.close(), {"result_url": "https://a.png", "input": None})
+
+    def test_invalid_bodies_raise_value_error(self):
+        for stream_above in (0, 1024):
+            parser = ResponseParser(stream_above=stream_above)
+            parser.feed(b'{"a": 1')
+            with self.assertRaises(ValueError):
+                parser.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
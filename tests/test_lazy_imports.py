@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("numpy", "PIL.Image", "httpx", "streamlit_drawable_canvas")
+
+
+def _loaded_after(statement):
+    check = f"import sys; {statement}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_packages_import_without_heavy_dependencies(self):
+        self.assertEqual(_loaded_after("import services, utils, workflows"), [])
+
+    def test_first_use_loads_pillow(self):
+        loaded = _loaded_after("from services.thumbnails import thumbnail_format; thumbnail_format()")
+        self.assertIn("PIL.Image", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from utils import mask_utils
+from utils.mask_utils import clear_mask_cache, mask_digest, mask_preview, prepare_binary_mask_bytes, threshold_mask
+
+
+class TestMaskUtils(unittest.TestCase):
+    def setUp(self):
+        clear_mask_cache()
+        rng = np.random.default_rng(7)
+        self.canvas = rng.integers(0, 256, (60, 80, 4), dtype=np.uint8)
+
+    def test_threshold_matches_pil_luma(self):
+        luma = np.array(Image.fromarray(self.canvas, mode="RGBA").convert("L"))
+        for threshold in (0, 25, 128, 254):
+            np.testing.assert_array_equal(threshold_mask(self.canvas, threshold), luma > threshold)
+        np.testing.assert_array_equal(threshold_mask(self.canvas, 25, invert=True), luma <= 25)
+
+    def test_png_is_one_bit_binary_at_target_size(self):
+        png, img = prepare_binary_mask_bytes(self.canvas, (320, 240))
+        decoded = Image.open(io.BytesIO(png))
+        self.assertEqual(decoded.mode, "1")
+        self.assertEqual(decoded.size, (320, 240))
+        self.assertEqual(img.size, (320, 240))
+        values = set(np.unique(np.array(decoded.convert("L"))).tolist())
+        self.assertTrue(values <= {0, 255})
+
+    def test_nearest_upscale_keeps_blocks(self):
+        canvas = np.zeros((2, 2, 4), dtype=np.uint8)
+        canvas[0, 0] = (255, 255, 255, 255)
+        _, img = prepare_binary_mask_bytes(canvas, (4, 4))
+        expected = np.array([[255, 255, 0, 0], [255, 255, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0]])
+        np.testing.assert_array_equal(np.array(img.convert("L")), expected)
+
+    def test_cached_on_canvas_digest_and_settings(self):
+        with mock.patch.object(mask_utils, "_encode_mask", wraps=mask_utils._encode_mask) as encode:
+            first, _ = prepare_binary_mask_bytes(self.canvas, (160, 120))
+            again, _ = prepare_binary_mask_bytes(self.canvas.copy(), (160, 120))
+            self.assertEqual(encode.call_count, 1)
+            self.assertEqual(again, first)
+            prepare_binary_mask_bytes(self.canvas, (160, 120), threshold=26)
+            prepare_binary_mask_bytes(self.canvas, (160, 120), invert=True)
+            prepare_binary_mask_bytes(self.canvas, (320, 240))
+            self.assertEqual(encode.call_count, 4)
+        changed = self.canvas.copy()
+        changed[0, 0, 0] ^= 1
+        self.assertNotEqual(mask_digest(changed), mask_digest(self.canvas))
+
+    def test_preview_stays_at_canvas_resolution(self):
+        with mock.patch.object(mask_utils, "_encode_mask") as encode:
+            preview = mask_preview(self.canvas, threshold=40)
+            self.assertIs(mask_preview(self.canvas, threshold=40), preview)
+            encode.assert_not_called()
+        self.assertEqual(preview.size, (80, 60))
+        np.testing.assert_array_equal(np.array(preview), threshold_mask(self.canvas, 40))
+
+if __name__ == "__main__":
+    unittest.main()
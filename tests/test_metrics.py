@@ -0,0 +1,95 @@
+import json
+import tempfile
+import unittest
+import urllib.request
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.asset_cache import AssetCache
+from services.http_utils import RetryPolicy, post_json
+from services.metrics import Histogram, get_metrics, start_metrics_server
+
+
+def series(snapshot, name, **labels):
+    for entry in snapshot["histograms"].get(name, []) + snapshot["counters"].get(name, []):
+        if all(entry["labels"].get(k) == str(v) for k, v in labels.items()):
+            return entry
+    return None
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles_interpolate_within_buckets(self):
+        h = Histogram((1.0, 2.0, 4.0))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            h.observe(value)
+        self.assertAlmostEqual(h.quantile(0.5), 1.5)
+        self.assertEqual(list(h.cumulative())[-1], (float("inf"), 4))
+        self.assertIsNone(Histogram((1.0,)).quantile(0.95))
+
+
+class TestApiMetrics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        get_metrics().reset()
+
+    def test_post_json_records_attempts_and_calls(self):
+        url = f"{self.server.base_url}/flaky/1/503/v1/product/packshot"
+        post_json(url, {}, {"file": "AAAA"}, "Packshot creation", retry=RetryPolicy(base_delay=0, max_delay=0))
+        snapshot = get_metrics().snapshot()
+        endpoint = "/flaky/1/503/v1/product/packshot"
+        self.assertEqual(series(snapshot, "adforge_api_responses_total", endpoint=endpoint, status=503)["value"], 1)
+        self.assertEqual(series(snapshot, "adforge_api_responses_total", endpoint=endpoint, status=200)["value"], 1)
+        self.assertEqual(series(snapshot, "adforge_api_ttfb_seconds", endpoint=endpoint)["count"], 2)
+        self.assertGreater(series(snapshot, "adforge_api_upload_bytes", endpoint=endpoint)["sum"], 0)
+        retries = series(snapshot, "adforge_api_retries", endpoint=endpoint)
+        self.assertEqual((retries["count"], retries["sum"]), (1, 1))
+        self.assertEqual(series(snapshot, "adforge_api_duration_seconds", endpoint=endpoint, outcome="ok")["count"], 1)
+
+    def test_failures_are_labelled_by_error(self):
+        url = f"{self.server.base_url}/status/422/v1/product/packshot"
+        with self.assertRaises(Exception):
+            post_json(url, {}, {"file": "AAAA"}, "Packshot creation")
+        entry = series(get_metrics().snapshot(), "adforge_api_duration_seconds", outcome="Rejected422")
+        self.assertEqual(entry["count"], 1)
+
+    def test_downloads_are_recorded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            AssetCache(root=tmp).download(f"{self.server.base_url}/results/a.png")
+        entry = series(get_metrics().snapshot(), "adforge_download_bytes", host="127.0.0.1")
+        self.assertEqual(entry["sum"], len(self.server.httpd.image_bytes))
+
+    def test_asset_cache_counters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AssetCache(root=tmp, max_bytes=6)
+            cache.read("https://a.png")
+            cache.put("https://a.png", b"aaaa")
+            cache.read("https://a.png")
+            cache.put("https://b.png", b"bbbb")
+        snapshot = get_metrics().snapshot()
+        self.assertEqual(series(snapshot, "adforge_asset_cache_lookups_total", result="hit")["value"], 1)
+        self.assertEqual(series(snapshot, "adforge_asset_cache_lookups_total", result="miss")["value"], 1)
+        self.assertEqual(series(snapshot, "adforge_asset_cache_evictions_total")["value"], 1)
+
+    def test_exports(self):
+        post_json(f"{self.server.base_url}/v1/product/shadow", {}, {"file": "AAAA"}, "Shadow")
+        text = get_metrics().prometheus_text()
+        self.assertIn("# TYPE adforge_api_duration_seconds histogram", text)
+        self.assertIn('adforge_api_responses_total{endpoint="/v1/product/shadow",status="200"} 1', text)
+        self.assertIn('le="+Inf"', text)
+
+        server = start_metrics_server(0)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            self.assertIn("adforge_api_ttfb_seconds_bucket", response.read().decode("utf-8"))
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            self.assertIn("histograms", json.load(response))
+
+
+if __name__ == "__main__":
+    unittest.main()
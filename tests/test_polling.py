@@ -0,0 +1,65 @@
+import tempfile
+import time
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.asset_cache import AssetCache
+from services.polling import FAILED, READY, backoff_delay, poll_urls
+
+
+class TestPollUrls(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_yields_ready_urls_in_completion_order(self):
+        slow = f"{self.server.base_url}/async/0.6/slow.png"
+        fast = f"{self.server.base_url}/results/fast.png"
+        results = list(poll_urls([slow, fast], deadline=5, initial_delay=0.1, max_delay=0.2))
+        self.assertEqual([r.url for r in results], [fast, slow])
+        self.assertTrue(all(r.state == READY for r in results))
+
+    def test_permanent_status_fails_immediately(self):
+        gone = f"{self.server.base_url}/status/410/gone.png"
+        results = list(poll_urls([gone], deadline=5))
+        self.assertEqual(results[0].state, FAILED)
+        self.assertEqual(results[0].attempts, 1)
+
+    def test_attempt_budget_carries_across_calls(self):
+        missing = f"{self.server.base_url}/status/404/missing.png"
+        attempts = {}
+        first = list(poll_urls([missing], deadline=0.3, initial_delay=0.05, max_delay=0.05, max_attempts=100, attempts=attempts))
+        self.assertEqual(first, [])
+        self.assertGreater(attempts[missing], 1)
+        second = list(poll_urls([missing], deadline=5, initial_delay=0.05, max_delay=0.05,
+                                max_attempts=attempts[missing] + 1, attempts=attempts))
+        self.assertEqual(second[0].state, FAILED)
+
+    def test_deadline_bounds_wall_clock(self):
+        never = f"{self.server.base_url}/async/60/never.png"
+        start = time.monotonic()
+        self.assertEqual(list(poll_urls([never], deadline=0.5, initial_delay=0.1)), [])
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_cache_polls_with_head_and_downloads_once(self):
+        url = f"{self.server.base_url}/async/0.5/cached.png"
+        before = dict(self.server.stats)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = AssetCache(tmp)
+            results = list(poll_urls([url], deadline=5, initial_delay=0.1, max_delay=0.2, cache=cache))
+            self.assertEqual(results[0].state, READY)
+            self.assertEqual(cache.read(url), self.server.httpd.image_bytes)
+        self.assertGreater(self.server.stats["HEAD"] - before["HEAD"], 1)
+        self.assertEqual(self.server.stats["GET"] - before["GET"], 1)
+
+    def test_backoff_is_capped(self):
+        for attempt in range(1, 20):
+            self.assertLessEqual(backoff_delay(attempt, initial_delay=0.5, max_delay=4.0), 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
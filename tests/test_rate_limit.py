@@ -0,0 +1,72 @@
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_utils import NO_RETRY, post_json
+from services.rate_limit import (
+    AdaptiveLimiter,
+    TokenBucket,
+    get_limiter,
+    parse_retry_after,
+    reset_rate_limiters,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_paced(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        now[0] = 1.5
+        self.assertEqual(bucket.reserve(), 0.0)
+
+    def test_block_for_delays_everyone(self):
+        now = [0.0]
+        bucket = TokenBucket(rate=100, burst=100, clock=lambda: now[0])
+        bucket.block_for(3)
+        self.assertAlmostEqual(bucket.reserve(), 3.0)
+
+
+class TestAdaptiveLimiter(unittest.TestCase):
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveLimiter(rate=4, concurrency=4)
+        for _ in range(8):
+            limiter.on_success()
+        self.assertGreaterEqual(limiter.limit, 5)
+        rate_before = limiter.bucket.rate
+        limiter.on_throttle(retry_after=0)
+        self.assertLessEqual(limiter.limit, 3)
+        self.assertAlmostEqual(limiter.bucket.rate, rate_before / 2)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertIsNone(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class TestPostJsonFeedsLimiter(unittest.TestCase):
+    def setUp(self):
+        reset_rate_limiters()
+
+    def test_limiters_are_per_key_and_endpoint(self):
+        a = get_limiter("k1", "https://engine.prod.bria-api.com/v1/product/packshot")
+        self.assertIs(a, get_limiter("k1", "https://engine.prod.bria-api.com/v1/product/packshot"))
+        self.assertIsNot(a, get_limiter("k2", "https://engine.prod.bria-api.com/v1/product/packshot"))
+        self.assertIsNot(a, get_limiter("k1", "https://engine.prod.bria-api.com/v1/product/shadow"))
+        self.assertIs(a.key_bucket, get_limiter("k1", "https://engine.prod.bria-api.com/v1/product/shadow").key_bucket)
+
+    def test_429_backs_off_and_success_ramps_up(self):
+        with FakeBriaServer() as server:
+            throttled_url = f"{server.base_url}/status/429/v1/product/packshot"
+            with self.assertRaises(Exception):
+                post_json(throttled_url, {"api_token": "k"}, {}, "Packshot creation", retry=NO_RETRY)
+            self.assertEqual(get_limiter("k", throttled_url).snapshot()["throttled"], 1)
+
+            ok_url = f"{server.base_url}/v1/product/packshot"
+            post_json(ok_url, {"api_token": "k"}, {}, "Packshot creation")
+            self.assertEqual(get_limiter("k", ok_url).snapshot()["succeeded"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import base64
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_utils import post_json
+from services.request_body import Base64Source, StreamingJSONBody
+
+
+class TestStreamingJSONBody(unittest.TestCase):
+    def test_matches_in_memory_encoding(self):
+        data = os.urandom(200_001)
+        payload = {"file": Base64Source(data), "sku": "A-1", "num_results": 4}
+        body = StreamingJSONBody(payload)
+        raw = b"".join(iter(lambda: body.read(16384), b""))
+        self.assertEqual(len(raw), len(body))
+        decoded = json.loads(raw)
+        self.assertEqual(base64.b64decode(decoded["file"]), data)
+        self.assertEqual(decoded["sku"], "A-1")
+        self.assertEqual(decoded["num_results"], 4)
+
+    def test_file_source_and_memoryview_agree(self):
+        data = os.urandom(50_000)
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            from_path = StreamingJSONBody({"file": Base64Source.from_path(f.name)}).read()
+            from_view = StreamingJSONBody({"file": Base64Source(memoryview(data))}).read()
+            self.assertEqual(from_path, from_view)
+            self.assertEqual(Base64Source.from_path(f.name).digest(), Base64Source(data).digest())
+        finally:
+            os.remove(f.name)
+
+    def test_post_json_streams_payload(self):
+        data = os.urandom(100_000)
+        with FakeBriaServer(keep_payloads=True) as server:
+            post_json(f"{server.base_url}/v1/product/packshot", {}, {"file": Base64Source(data)}, "Test")
+            self.assertEqual(base64.b64decode(server.last_payload["file"]), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
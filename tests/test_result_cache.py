@@ -0,0 +1,66 @@
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_utils import post_json
+from services.result_cache import (
+    ResultCache,
+    disable_result_cache,
+    enable_result_cache,
+    make_cache_key,
+)
+
+
+class TestMakeCacheKey(unittest.TestCase):
+    def test_key_ignores_field_order(self):
+        a = make_cache_key("https://x/v1/packshot", {"file": "AAAA", "sku": "1"})
+        b = make_cache_key("https://x/v1/packshot", {"sku": "1", "file": "AAAA"})
+        self.assertEqual(a, b)
+
+    def test_key_depends_on_endpoint_and_image(self):
+        base = make_cache_key("https://x/v1/packshot", {"file": "AAAA"})
+        self.assertNotEqual(base, make_cache_key("https://x/v1/shadow", {"file": "AAAA"}))
+        self.assertNotEqual(base, make_cache_key("https://x/v1/packshot", {"file": "BBBB"}))
+
+
+class TestResultCache(unittest.TestCase):
+    def test_entries_expire_after_ttl(self):
+        now = [0.0]
+        cache = ResultCache(ttl=10, clock=lambda: now[0])
+        cache.put("k", {"result_url": "u"})
+        now[0] = 9.9
+        self.assertEqual(cache.get("k"), {"result_url": "u"})
+        now[0] = 10.0
+        self.assertIsNone(cache.get("k"))
+
+    def test_returned_values_are_copies(self):
+        cache = ResultCache()
+        cache.put("k", {"urls": ["u"]})
+        cache.get("k")["urls"].append("v")
+        self.assertEqual(cache.get("k"), {"urls": ["u"]})
+
+
+class TestPostJsonMemoization(unittest.TestCase):
+    def tearDown(self):
+        disable_result_cache()
+
+    def test_cacheable_calls_hit_the_api_once(self):
+        cache = enable_result_cache(ttl=60)
+        with FakeBriaServer() as server:
+            url = f"{server.base_url}/v1/product/packshot"
+            first = post_json(url, {}, {"file": "AAAA"}, "Packshot creation", cacheable=True)
+            second = post_json(url, {}, {"file": "AAAA"}, "Packshot creation", cacheable=True)
+            post_json(url, {}, {"file": "AAAA"}, "Packshot creation")
+            self.assertEqual(first, second)
+            self.assertEqual(server.stats["requests"], 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_disabled_cache_always_calls_api(self):
+        with FakeBriaServer() as server:
+            url = f"{server.base_url}/v1/product/packshot"
+            post_json(url, {}, {"file": "AAAA"}, "Packshot creation", cacheable=True)
+            post_json(url, {}, {"file": "AAAA"}, "Packshot creation", cacheable=True)
+            self.assertEqual(server.stats["requests"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,14 @@
+import json
 import unittest
 
-from utils.result_utils import extract_result_urls
+from utils.result_utils import (
+    RESULT_ADAPTERS,
+    ResultImage,
+    extract_result_urls,
+    extract_results,
+    iter_results,
+    register_result_adapter,
+)
 
 
 class TestExtractResultUrls(unittest.TestCase):
@@ -29,5 +37,43 @@ class TestExtractResultUrls(unittest.TestCase):
         self.assertEqual(extract_result_urls([]), [])
 
 
+class TestEndpointAdapters(unittest.TestCase):
+    def test_lifestyle_items_yield_url_and_seed(self):
+        result = {"result": [["https://example.com/a.png", 123, "session"], ["https://example.com/b.png", 7, "s"]]}
+        self.assertEqual(
+            extract_results(result, endpoint="lifestyle_shot_by_text"),
+            [ResultImage("https://example.com/a.png", 123, 0), ResultImage("https://example.com/b.png", 7, 1)],
+        )
+        self.assertEqual(
+            extract_result_urls(result, limit=1, endpoint="lifestyle_shot_by_image"),
+            ["https://example.com/a.png"],
+        )
+
+    def test_hd_groups_carry_their_seed(self):
+        result = {"result": [{"urls": ["https://a.png"], "seed": 5}, {"urls": ["https://b.png"], "seed": 9}]}
+        self.assertEqual([r.seed for r in iter_results(result, endpoint="text-to-image")], [5, 9])
+
+    def test_unexpected_shape_falls_back_to_probing(self):
+        self.assertEqual(
+            extract_result_urls({"result_url": "https://a.png"}, endpoint="lifestyle_shot_by_text"),
+            ["https://a.png"],
+        )
+        self.assertEqual(extract_result_urls({"urls": ["https://a.png"]}, endpoint="unknown"), ["https://a.png"])
+
+    def test_stops_at_limit(self):
+        consumed = []
+
+        def adapter(result):
+            for url in result["images"]:
+                consumed.append(url)
+                yield url, None
+
+        register_result_adapter("test-endpoint", adapter)
+        self.addCleanup(RESULT_ADAPTERS.pop, "test-endpoint")
+        urls = extract_result_urls({"images": ["u1", "u2", "u3"]}, limit=2, endpoint="test-endpoint")
+        self.assertEqual(urls, ["u1", "u2"])
+        self.assertEqual(consumed, ["u1", "u2"])
+
+
 if __name__ == "__main__":
     unittest.main()
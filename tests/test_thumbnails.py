@@ -0,0 +1,69 @@
+import io
+import tempfile
+import unittest
+
+from PIL import Image
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.asset_cache import AssetCache
+from services.thumbnails import get_thumbnails, make_thumbnail, thumbnail_format
+
+
+def _png(size, mode="RGB"):
+    out = io.BytesIO()
+    Image.new(mode, size, (10, 120, 200, 128)[: len(mode)]).save(out, format="PNG")
+    return out.getvalue()
+
+
+class TestThumbnails(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeBriaServer(image_bytes=_png((2048, 1536))).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = AssetCache(self._tmp.name, max_bytes=64 * 1024 * 1024)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_make_thumbnail_scales_to_width(self):
+        thumb = Image.open(io.BytesIO(make_thumbnail(io.BytesIO(_png((1200, 600))), width=300)))
+        self.assertEqual(thumb.size, (300, 150))
+        self.assertEqual(thumb.format, thumbnail_format())
+        small = Image.open(io.BytesIO(make_thumbnail(io.BytesIO(_png((100, 80))), width=300)))
+        self.assertEqual(small.size, (100, 80))
+
+    def test_alpha_kept_for_webp_and_dropped_for_jpeg(self):
+        source = _png((400, 400), mode="RGBA")
+        self.assertEqual(Image.open(io.BytesIO(make_thumbnail(io.BytesIO(source), 200, fmt="JPEG"))).mode, "RGB")
+        if thumbnail_format() == "WEBP":
+            self.assertEqual(Image.open(io.BytesIO(make_thumbnail(io.BytesIO(source), 200, fmt="WEBP"))).mode, "RGBA")
+
+    def test_results_downloaded_once_and_proxies_cached(self):
+        urls = [f"{self.server.base_url}/results/{i}.png" for i in range(3)]
+        before = self.server.stats["requests"]
+        thumbs = get_thumbnails(urls, width=320, cache=self.cache)
+        self.assertEqual(self.server.stats["requests"] - before, 3)
+        for thumb in thumbs:
+            self.assertEqual(Image.open(io.BytesIO(thumb)).size, (320, 240))
+            self.assertLess(len(thumb), len(self.server.httpd.image_bytes))
+        # Originals stay cached for the primary image and downloads.
+        self.assertTrue(all(self.cache.contains(url) for url in urls))
+
+        self.assertEqual(get_thumbnails(urls, width=320, cache=self.cache), thumbs)
+        self.assertEqual(self.server.stats["requests"] - before, 3)
+
+    def test_failed_download_returns_none(self):
+        urls = [f"{self.server.base_url}/results/ok.png", f"{self.server.base_url}/status/404/missing.png"]
+        thumbs = get_thumbnails(urls, width=320, cache=self.cache)
+        self.assertIsNotNone(thumbs[0])
+        self.assertIsNone(thumbs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from benchmarks.fake_bria import FakeBriaServer
+from services.http_utils import post_json
+from services.trace_report import main as trace_report
+from services.tracing import configure_tracing, disable_tracing, span
+from workflows.jobs import JobQueue
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        configure_tracing(self.path)
+
+    def tearDown(self):
+        disable_tracing()
+        self.tmp.cleanup()
+
+    def spans(self):
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+
+class TestSpans(TracingTestCase):
+    def test_children_share_trace_and_point_to_parent(self):
+        with span("outer", action="test"):
+            with span("inner"):
+                pass
+        inner, outer = self.spans()
+        self.assertEqual(inner["trace_id"], outer["trace_id"])
+        self.assertEqual(inner["parent_id"], outer["span_id"])
+        self.assertIsNone(outer["parent_id"])
+        self.assertEqual(outer["attributes"], {"action": "test"})
+
+    def test_errors_are_recorded_and_raised(self):
+        with self.assertRaises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+        self.assertEqual(self.spans()[0]["status"], "error")
+
+    def test_disabled_tracing_writes_nothing(self):
+        disable_tracing()
+        with span("ignored") as s:
+            s.set(a=1)
+        self.assertEqual(self.spans(), [])
+
+
+class TestJobTrace(TracingTestCase):
+    def test_job_phases_form_one_tree(self):
+        queue = JobQueue(max_workers=1, poll_deadline=5)
+        with FakeBriaServer() as server:
+            url = f"{server.base_url}/async/0.1/v1/product/lifestyle"
+
+            def call():
+                return {"result_url": post_json(url, {}, {"file": "AAAA"}, "Lifestyle")["result_url"].replace("/results/", "/async/0.1/")}
+
+            with span("ui.action", action="Lifestyle shot"):
+                job_id = queue.submit(call, "Lifestyle shot", "Lifestyle Shot", owner="u1", poll=True)
+            deadline = time.monotonic() + 5
+            while queue.get(job_id).active and time.monotonic() < deadline:
+                time.sleep(0.02)
+        queue.shutdown()
+
+        spans = self.spans()
+        by_name = {s["name"]: s for s in spans}
+        self.assertEqual({s["trace_id"] for s in spans}, {by_name["ui.action"]["trace_id"]})
+        self.assertEqual(by_name["job"]["parent_id"], by_name["ui.action"]["span_id"])
+        self.assertEqual(by_name["api.call"]["parent_id"], by_name["job"]["span_id"])
+        self.assertEqual(by_name["api.attempt"]["parent_id"], by_name["api.call"]["span_id"])
+        self.assertEqual(by_name["poll"]["parent_id"], by_name["job"]["span_id"])
+        self.assertEqual(by_name["poll.check"]["parent_id"], by_name["poll"]["span_id"])
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            trace_report([self.path, "--top", "1"])
+        report = out.getvalue()
+        self.assertIn("action=Lifestyle shot", report)
+        self.assertIn("poll.check", report)
+        self.assertIn("self time across these traces", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
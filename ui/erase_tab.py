@@ -1,18 +1,17 @@
-﻿import streamlit as st
-from PIL import Image
+﻿from functools import partial
 
-from utils import prepare_binary_mask_bytes
+import streamlit as st
+
+from utils import mask_preview
 
 
 def render(tab, deps):
     safe_st_canvas = deps['safe_st_canvas']
     generative_fill = deps['generative_fill']
-    extract_result_urls = deps['extract_result_urls']
-    download_image = deps['download_image']
-    api_error = deps['api_error']
-    debug_log = deps['debug_log']
-    set_generation_status = deps['set_generation_status']
+    render_download_button = deps['render_download_button']
     can_submit_action = deps['can_submit_action']
+    submit_job = deps['submit_job']
+    get_image_handle = deps['get_image_handle']
 
     with tab:
         st.header("🎨 Erase Elements")
@@ -25,16 +24,9 @@ def render(tab, deps):
             with col1:
                 st.image(uploaded_file, caption="Original Image", use_column_width=True)
 
-                img = Image.open(uploaded_file)
-                img_width, img_height = img.size
-
-                aspect_ratio = img_height / img_width
-                canvas_width = min(img_width, 800)
-                canvas_height = int(canvas_width * aspect_ratio)
-
-                img = img.resize((canvas_width, canvas_height))
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
+                # Decoded once per upload and shared across reruns
+                handle = get_image_handle(uploaded_file)
+                canvas_width, canvas_height = handle.canvas_size()
 
                 stroke_width = st.slider("Brush width", 1, 50, 20, key="erase_brush_width")
                 stroke_color = st.color_picker("Brush color", "#fff", key="erase_brush_color")
@@ -44,7 +36,7 @@ def render(tab, deps):
                     stroke_width=stroke_width,
                     stroke_color=stroke_color,
                     background_color="",
-                    background_image=img,
+                    background_image=handle.canvas_preview(),
                     drawing_mode="freedraw",
                     height=canvas_height,
                     width=canvas_width,
@@ -63,9 +55,9 @@ def render(tab, deps):
                 show_mask_preview = st.checkbox("Show mask preview", value=True, key="erase_show_mask")
 
                 if show_mask_preview and canvas_result.image_data is not None:
-                    _, preview_mask = prepare_binary_mask_bytes(
+                    # Preview at canvas resolution; the full-size mask is only built on submit
+                    preview_mask = mask_preview(
                         canvas_result.image_data,
-                        target_size=(img_width, img_height),
                         threshold=mask_threshold,
                         invert=invert_mask,
                     )
@@ -79,39 +71,29 @@ def render(tab, deps):
                         st.warning("Please wait a moment before submitting again.")
                         return
 
-                    mask_bytes, _ = prepare_binary_mask_bytes(
+                    mask_bytes = handle.mask_bytes(
                         canvas_result.image_data,
-                        target_size=(img_width, img_height),
                         threshold=mask_threshold,
                         invert=invert_mask,
                     )
-                    image_bytes = uploaded_file.getvalue()
-
-                    set_generation_status("Generating", "Erasing selected area...")
-                    with st.spinner("Erasing selected area..."):
-                        try:
-                            result = generative_fill(
-                                st.session_state.api_key,
-                                image_data=image_bytes,
-                                mask_data=mask_bytes,
-                                prompt=erase_prompt.strip() if erase_prompt and erase_prompt.strip() else "remove selected object and fill with natural background",
-                                num_results=1,
-                                sync=True,
-                                content_moderation=content_moderation,
-                            )
-
-                            if result:
-                                urls = extract_result_urls(result, limit=1)
-                                if urls:
-                                    st.session_state.edited_image = urls[0]
-                                    st.session_state.generated_images = urls
-                                    st.session_state.result_source = "Erase Elements"
-                                    debug_log("image_generated", tab="Erase Elements", count=1)
-                                    st.success("Area erased successfully!")
-                                else:
-                                    st.error("No result URL in the API response. Please try again.")
-                        except Exception as e:
-                            api_error(e, "Erase selected area")
+                    image_bytes = handle.data
+
+                    submit_job(
+                        "Erase selected area",
+                        "Erase Elements",
+                        partial(
+                            generative_fill,
+                            st.session_state.api_key,
+                            image_data=image_bytes,
+                            mask_data=mask_bytes,
+                            prompt=erase_prompt.strip() if erase_prompt and erase_prompt.strip() else "remove selected object and fill with natural background",
+                            num_results=1,
+                            sync=True,
+                            content_moderation=content_moderation,
+                        ),
+                        limit=1,
+                    )
+                    st.info("Erasing selected area. The result appears here when ready.")
 
             with col2:
                 if st.session_state.edited_image:
@@ -119,12 +101,4 @@ def render(tab, deps):
                     if src and src != "Erase Elements":
                         st.info(f"Current image was generated in: {src}")
                     st.image(st.session_state.edited_image, caption="Result", use_column_width=True)
-                    image_data = download_image(st.session_state.edited_image)
-                    if image_data:
-                        st.download_button(
-                            "Download Result",
-                            image_data,
-                            "erased_image.png",
-                            "image/png",
-                            key="erase_download",
-                        )
\ No newline at end of file
+                    render_download_button("Download Result", "erased_image.png", key="erase_download")
\ No newline at end of file
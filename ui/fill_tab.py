@@ -1,21 +1,18 @@
-﻿import numpy as np
+﻿from functools import partial
+
 import streamlit as st
-from PIL import Image
 
-from utils import prepare_binary_mask_bytes
+from utils import mask_preview
 
 
 def render(tab, deps):
     safe_st_canvas = deps['safe_st_canvas']
     generative_fill = deps['generative_fill']
-    extract_result_urls = deps['extract_result_urls']
-    download_image = deps['download_image']
-    auto_check_images = deps['auto_check_images']
-    check_generated_images = deps['check_generated_images']
-    api_error = deps['api_error']
-    debug_log = deps['debug_log']
-    set_generation_status = deps['set_generation_status']
+    render_download_button = deps['render_download_button']
     can_submit_action = deps['can_submit_action']
+    submit_job = deps['submit_job']
+    get_image_handle = deps['get_image_handle']
+    render_generated_gallery = deps['render_generated_gallery']
 
     with tab:
         st.header("🎨 Generative Fill")
@@ -28,19 +25,9 @@ def render(tab, deps):
             with col1:
                 st.image(uploaded_file, caption="Original Image", use_column_width=True)
 
-                img = Image.open(uploaded_file)
-                img_width, img_height = img.size
-
-                aspect_ratio = img_height / img_width
-                canvas_width = min(img_width, 800)
-                canvas_height = int(canvas_width * aspect_ratio)
-
-                img = img.resize((canvas_width, canvas_height))
-
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
-
-                img_array = np.array(img).astype(np.uint8)
+                # Decoded once per upload and shared across reruns
+                handle = get_image_handle(uploaded_file)
+                canvas_width, canvas_height = handle.canvas_size()
 
                 stroke_width = st.slider("Brush width", 1, 50, 20)
                 stroke_color = st.color_picker("Brush color", "#fff")
@@ -51,7 +38,7 @@ def render(tab, deps):
                     stroke_color=stroke_color,
                     drawing_mode="freedraw",
                     background_color="",
-                    background_image=img if img_array.shape[-1] == 3 else None,
+                    background_image=handle.canvas_preview(),
                     height=canvas_height,
                     width=canvas_width,
                     key="canvas",
@@ -90,9 +77,9 @@ def render(tab, deps):
                     )
 
                 if show_mask_preview and canvas_result.image_data is not None:
-                    _, preview_mask = prepare_binary_mask_bytes(
+                    # Preview at canvas resolution; the full-size mask is only built on submit
+                    preview_mask = mask_preview(
                         canvas_result.image_data,
-                        target_size=(img_width, img_height),
                         threshold=mask_threshold,
                         invert=invert_mask,
                     )
@@ -109,77 +96,42 @@ def render(tab, deps):
                         st.warning("Please wait a moment before submitting again.")
                         return
 
-                    mask_bytes, _ = prepare_binary_mask_bytes(
+                    mask_bytes = handle.mask_bytes(
                         canvas_result.image_data,
-                        target_size=(img_width, img_height),
                         threshold=mask_threshold,
                         invert=invert_mask,
                     )
-                    image_bytes = uploaded_file.getvalue()
-
-                    set_generation_status("Generating", "Running generative fill...")
-                    with st.spinner("Generating..."):
-                        try:
-                            result = generative_fill(
-                                st.session_state.api_key,
-                                image_bytes,
-                                mask_bytes,
-                                prompt,
-                                negative_prompt=negative_prompt if negative_prompt else None,
-                                num_results=num_results,
-                                sync=sync_mode,
-                                seed=seed if seed != 0 else None,
-                                content_moderation=content_moderation,
-                            )
-
-                            if result:
-                                urls = extract_result_urls(result, limit=num_results)
-                                if sync_mode:
-                                    if urls:
-                                        st.session_state.edited_image = urls[0]
-                                        st.session_state.generated_images = urls
-                                        st.session_state.result_source = "Generative Fill"
-                                        debug_log("image_generated", tab="Generative Fill", count=len(urls))
-                                        st.success("Generation complete!")
-                                    else:
-                                        st.error("Generation completed but no image URL was returned.")
-                                else:
-                                    if urls:
-                                        st.session_state.pending_urls = urls
-                                        st.session_state.pending_source = "Generative Fill"
-
-                                        status_container = st.empty()
-                                        refresh_container = st.empty()
-
-                                        status_container.info(
-                                            f"Generation started! Waiting for {len(st.session_state.pending_urls)} image{'s' if len(st.session_state.pending_urls) > 1 else ''}..."
-                                        )
-
-                                        if auto_check_images(status_container):
-                                            st.rerun()
-
-                                        if refresh_container.button("Check for Generated Images"):
-                                            if check_generated_images():
-                                                status_container.success("Images ready!")
-                                                st.rerun()
-                                            else:
-                                                status_container.warning("Still generating... Please check again in a moment.")
-                        except Exception as e:
-                            api_error(e, "Generative fill")
+                    image_bytes = handle.data
+
+                    submit_job(
+                        "Generative fill",
+                        "Generative Fill",
+                        partial(
+                            generative_fill,
+                            st.session_state.api_key,
+                            image_bytes,
+                            mask_bytes,
+                            prompt,
+                            negative_prompt=negative_prompt if negative_prompt else None,
+                            num_results=num_results,
+                            sync=sync_mode,
+                            seed=seed if seed != 0 else None,
+                            content_moderation=content_moderation,
+                        ),
+                        limit=num_results,
+                        poll=not sync_mode,
+                    )
+                    st.info("Generation started. Results appear here when ready; you can keep editing meanwhile.")
 
             with col2:
                 if st.session_state.edited_image:
                     src = st.session_state.get("result_source")
                     if src and src != "Generative Fill":
                         st.info(f"Current image was generated in: {src}")
+                    # The selected image at full size; the other variations render as proxies.
                     st.image(st.session_state.edited_image, caption="Generated Result", use_column_width=True)
-                    image_data = download_image(st.session_state.edited_image)
-                    if image_data:
-                        st.download_button(
-                            "Download Result",
-                            image_data,
-                            "generated_fill.png",
-                            "image/png",
-                        )
-                elif st.session_state.pending_urls:
-                    st.info("Generation in progress. Click the refresh button above to check status.")
\ No newline at end of file
+                    render_download_button("Download Result", "generated_fill.png", key="fill_download")
+                    if src == "Generative Fill" and len(st.session_state.generated_images) > 1:
+                        render_generated_gallery("fill")
+                elif st.session_state.active_jobs:
+                    st.info("Generation in progress. Progress is shown in the sidebar.")
\ No newline at end of file
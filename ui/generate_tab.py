@@ -1,15 +1,17 @@
+from functools import partial
+
 import streamlit as st
 
 
 def render(tab, deps):
     enhance_prompt = deps['enhance_prompt']
     generate_hd_image = deps['generate_hd_image']
-    extract_result_urls = deps['extract_result_urls']
-    download_image = deps['download_image']
+    render_download_button = deps['render_download_button']
     api_error = deps['api_error']
     debug_log = deps['debug_log']
     set_generation_status = deps['set_generation_status']
     can_submit_action = deps['can_submit_action']
+    submit_job = deps['submit_job']
 
     with tab:
         st.header("🎨 Generate Images")
@@ -83,46 +85,29 @@ def render(tab, deps):
                 st.warning("Please wait a moment before submitting again.")
                 return
 
-            set_generation_status("Generating", "Generating images...")
-            with st.spinner("Generating your masterpiece..."):
-                try:
-                    result = generate_hd_image(
-                        prompt=st.session_state.enhanced_prompt or prompt,
-                        api_key=st.session_state.api_key,
-                        num_results=num_images,
-                        aspect_ratio=aspect_ratio,
-                        negative_prompt=negative_prompt,
-                        sync=True,
-                        enhance_image=enhance_img,
-                        medium="art" if style != "Realistic" else "photography",
-                        prompt_enhancement=False,
-                        content_moderation=True,
-                    )
-
-                    if result:
-                        urls = extract_result_urls(result, limit=num_images)
-                        if urls:
-                            st.session_state.edited_image = urls[0]
-                            st.session_state.generated_images = urls
-                            st.session_state.result_source = "Generate Image"
-                            debug_log("image_generated", tab="Generate Image", count=len(urls))
-                            st.success("Image generated successfully!")
-                        else:
-                            st.error("No valid image URLs found in the API response.")
-                except Exception as e:
-                    api_error(e, "Generate image")
+            submit_job(
+                "Generate image",
+                "Generate Image",
+                partial(
+                    generate_hd_image,
+                    prompt=st.session_state.enhanced_prompt or prompt,
+                    api_key=st.session_state.api_key,
+                    num_results=num_images,
+                    aspect_ratio=aspect_ratio,
+                    negative_prompt=negative_prompt,
+                    sync=True,
+                    enhance_image=enhance_img,
+                    medium="art" if style != "Realistic" else "photography",
+                    prompt_enhancement=False,
+                    content_moderation=True,
+                ),
+                limit=num_images,
+            )
+            st.info("Generating your masterpiece... it appears below when ready.")
 
         if st.session_state.edited_image:
             src = st.session_state.get("result_source")
             if src and src != "Generate Image":
                 st.info(f"Current image was generated in: {src}")
             st.image(st.session_state.edited_image, caption="Generated Image", use_column_width=True)
-            image_data = download_image(st.session_state.edited_image)
-            if image_data:
-                st.download_button(
-                    "Download Generated Image",
-                    image_data,
-                    "generated_image.png",
-                    "image/png",
-                    key="generate_download",
-                )
+            render_download_button("Download Generated Image", "generated_image.png", key="generate_download")
@@ -1,19 +1,19 @@
+from functools import partial
+
 import streamlit as st
 
+
 def render(tab, deps):
     create_packshot = deps['create_packshot']
     add_shadow = deps['add_shadow']
     lifestyle_shot_by_text = deps['lifestyle_shot_by_text']
     lifestyle_shot_by_image = deps['lifestyle_shot_by_image']
-    extract_result_urls = deps['extract_result_urls']
-    download_image = deps['download_image']
-    auto_check_images = deps['auto_check_images']
-    check_generated_images = deps['check_generated_images']
+    render_download_button = deps['render_download_button']
     render_generated_gallery = deps['render_generated_gallery']
-    api_error = deps['api_error']
-    debug_log = deps['debug_log']
-    set_generation_status = deps['set_generation_status']
     can_submit_action = deps['can_submit_action']
+    get_image_handle = deps['get_image_handle']
+    submit_job = deps['submit_job']
+    extract_result_urls = deps['extract_result_urls']
     with tab:
         st.header("🖼️ Lifestyle Shot")
         
@@ -23,6 +23,7 @@ def render(tab, deps):
             
             with col1:
                 st.image(uploaded_file, caption="Original Image", use_column_width=True)
+                product = get_image_handle(uploaded_file)
                 
                 # Product editing options
                 edit_option = st.selectbox("Select Edit Option", [
@@ -44,32 +45,21 @@ def render(tab, deps):
                         if not can_submit_action("create_packshot"):
                             st.warning("Please wait a moment before submitting again.")
                             return
-                        set_generation_status("Generating", "Creating packshot...")
-                        with st.spinner("Creating professional packshot..."):
-                            try:
-                                image_data = uploaded_file.getvalue()
-
-                                # Now create packshot
-                                result = create_packshot(
-                                    st.session_state.api_key,
-                                    image_data,
-                                    background_color=bg_color,
-                                    sku=sku if sku else None,
-                                    force_rmbg=force_rmbg,
-                                    content_moderation=content_moderation
-                                )
-                                
-                                urls = extract_result_urls(result, limit=1)
-                                if urls:
-                                    st.success("Packshot created successfully!")
-                                    st.session_state.edited_image = urls[0]
-                                    st.session_state.generated_images = urls
-                                    st.session_state.result_source = "Create Packshot"
-                                    debug_log("image_generated", tab="Create Packshot", count=1)
-                                else:
-                                    st.error("No result URL in the API response. Please try again.")
-                            except Exception as e:
-                                api_error(e, "Create packshot")
+                        submit_job(
+                            "Create packshot",
+                            "Create Packshot",
+                            partial(
+                                create_packshot,
+                                st.session_state.api_key,
+                                product.data,
+                                background_color=bg_color,
+                                sku=sku if sku else None,
+                                force_rmbg=force_rmbg,
+                                content_moderation=content_moderation
+                            ),
+                            limit=1
+                        )
+                        st.info("Creating professional packshot... it appears on the right when ready.")
                 
                 elif edit_option == "Add Shadow":
                     col_a, col_b = st.columns(2)
@@ -102,36 +92,28 @@ def render(tab, deps):
                         if not can_submit_action("add_shadow"):
                             st.warning("Please wait a moment before submitting again.")
                             return
-                        set_generation_status("Generating", "Adding shadow...")
-                        with st.spinner("Adding shadow effect..."):
-                            try:
-                                result = add_shadow(
-                                    api_key=st.session_state.api_key,
-                                    image_data=uploaded_file.getvalue(),
-                                    shadow_type=shadow_type.lower(),
-                                    background_color=None if use_transparent_bg else bg_color,
-                                    shadow_color=shadow_color,
-                                    shadow_offset=[offset_x, offset_y],
-                                    shadow_intensity=shadow_intensity,
-                                    shadow_blur=shadow_blur,
-                                    shadow_width=shadow_width if shadow_type == "Float" else None,
-                                    shadow_height=shadow_height if shadow_type == "Float" else 70,
-                                    sku=sku if sku else None,
-                                    force_rmbg=force_rmbg,
-                                    content_moderation=content_moderation
-                                )
-                                
-                                urls = extract_result_urls(result, limit=1)
-                                if urls:
-                                    st.success("Shadow added successfully!")
-                                    st.session_state.edited_image = urls[0]
-                                    st.session_state.generated_images = urls
-                                    st.session_state.result_source = "Add Shadow"
-                                    debug_log("image_generated", tab="Add Shadow", count=1)
-                                else:
-                                    st.error("No result URL in the API response. Please try again.")
-                            except Exception as e:
-                                api_error(e, "Add shadow")
+                        submit_job(
+                            "Add shadow",
+                            "Add Shadow",
+                            partial(
+                                add_shadow,
+                                api_key=st.session_state.api_key,
+                                image_data=product.data,
+                                shadow_type=shadow_type.lower(),
+                                background_color=None if use_transparent_bg else bg_color,
+                                shadow_color=shadow_color,
+                                shadow_offset=[offset_x, offset_y],
+                                shadow_intensity=shadow_intensity,
+                                shadow_blur=shadow_blur,
+                                shadow_width=shadow_width if shadow_type == "Float" else None,
+                                shadow_height=shadow_height if shadow_type == "Float" else 70,
+                                sku=sku if sku else None,
+                                force_rmbg=force_rmbg,
+                                content_moderation=content_moderation
+                            ),
+                            limit=1
+                        )
+                        st.info("Adding shadow effect... it appears on the right when ready.")
                 
                 elif edit_option == "Lifestyle Shot":
                     shot_type = st.radio("Shot Type", ["Text Prompt", "Reference Image"])
@@ -200,223 +182,91 @@ def render(tab, deps):
                             if not can_submit_action("lifestyle_shot_text"):
                                 st.warning("Please wait a moment before submitting again.")
                                 return
-                            set_generation_status("Generating", "Generating lifestyle shot...")
-                            with st.spinner("Generating lifestyle shot..."):
-                                try:
-                                    # Convert placement selections to API format
-                                    if placement_type == "Manual Placement":
-                                        manual_placements = [p.lower().replace(" ", "_") for p in positions]
-                                    else:
-                                        manual_placements = ["upper_left"]
-                                    
-                                    result = lifestyle_shot_by_text(
-                                        api_key=st.session_state.api_key,
-                                        image_data=uploaded_file.getvalue(),
-                                        scene_description=prompt,
-                                        placement_type=placement_type.lower().replace(" ", "_"),
-                                        num_results=num_results,
-                                        sync=sync_mode,
-                                        fast=fast_mode,
-                                        optimize_description=optimize_desc,
-                                        shot_size=[shot_width, shot_height] if placement_type != "Original" else [1000, 1000],
-                                        original_quality=original_quality,
-                                        exclude_elements=exclude_elements if not fast_mode else None,
-                                        manual_placement_selection=manual_placements,
-                                        padding_values=[pad_left, pad_right, pad_top, pad_bottom] if placement_type == "Manual Padding" else [0, 0, 0, 0],
-                                        foreground_image_size=[fg_width, fg_height] if placement_type == "Custom Coordinates" else None,
-                                        foreground_image_location=[fg_x, fg_y] if placement_type == "Custom Coordinates" else None,
-                                        force_rmbg=force_rmbg,
-                                        content_moderation=content_moderation,
-                                        sku=sku if sku else None
-                                    )
-                                    
-                                    if result:
-                                        st.session_state.result_source = "Lifestyle Shot"
-                                        # Debug logging
-                                        
-                                        if sync_mode:
-                                            if isinstance(result, dict):
-                                                if "result_url" in result:
-                                                    st.session_state.edited_image = result["result_url"]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result_urls" in result:
-                                                    st.session_state.edited_image = result["result_urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            st.session_state.edited_image = item["urls"][0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                        elif isinstance(item, list) and len(item) > 0:
-                                                            st.session_state.edited_image = item[0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                elif "urls" in result:
-                                                    st.session_state.edited_image = result["urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                        else:
-                                            urls = []
-                                            if isinstance(result, dict):
-                                                if "urls" in result:
-                                                    urls.extend(result["urls"][:num_results])  # Limit to requested number
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    # Process each result item
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            urls.extend(item["urls"])
-                                                        elif isinstance(item, list):
-                                                            urls.extend(item)
-                                                        # Break if we have enough URLs
-                                                        if len(urls) >= num_results:
-                                                            break
-                                                    
-                                                    # Trim to requested number
-                                                    urls = urls[:num_results]
-                                            
-                                            if urls:
-                                                st.session_state.pending_urls = urls
-                                                st.session_state.pending_source = "Lifestyle Shot"
-                                                
-                                                # Create a container for status messages
-                                                status_container = st.empty()
-                                                refresh_container = st.empty()
-                                                
-                                                # Show initial status
-                                                status_container.info(f"🎨 Generation started! Waiting for {len(urls)} image{'s' if len(urls) > 1 else ''}...")
-                                                
-                                                # Try automatic checking first
-                                                if auto_check_images(status_container):
-                                                    st.rerun()
-                                                
-                                                # Add refresh button for manual checking
-                                                if refresh_container.button("🔄 Check for Generated Images"):
-                                                    with st.spinner("Checking for completed images..."):
-                                                        if check_generated_images():
-                                                            status_container.success("✨ Image ready!")
-                                                            st.rerun()
-                                                        else:
-                                                            status_container.warning(f"⏳ Still generating your image{'s' if len(urls) > 1 else ''}... Please check again in a moment.")
-                                except Exception as e:
-                                    api_error(e, "Lifestyle shot")
+                            # Convert placement selections to API format
+                            if placement_type == "Manual Placement":
+                                manual_placements = [p.lower().replace(" ", "_") for p in positions]
+                            else:
+                                manual_placements = ["upper_left"]
+
+                            submit_job(
+                                "Lifestyle shot",
+                                "Lifestyle Shot",
+                                partial(
+                                    lifestyle_shot_by_text,
+                                    api_key=st.session_state.api_key,
+                                    image_data=product.data,
+                                    scene_description=prompt,
+                                    placement_type=placement_type.lower().replace(" ", "_"),
+                                    num_results=num_results,
+                                    sync=sync_mode,
+                                    fast=fast_mode,
+                                    optimize_description=optimize_desc,
+                                    shot_size=[shot_width, shot_height] if placement_type != "Original" else [1000, 1000],
+                                    original_quality=original_quality,
+                                    exclude_elements=exclude_elements if not fast_mode else None,
+                                    manual_placement_selection=manual_placements,
+                                    padding_values=[pad_left, pad_right, pad_top, pad_bottom] if placement_type == "Manual Padding" else [0, 0, 0, 0],
+                                    foreground_image_size=[fg_width, fg_height] if placement_type == "Custom Coordinates" else None,
+                                    foreground_image_location=[fg_x, fg_y] if placement_type == "Custom Coordinates" else None,
+                                    force_rmbg=force_rmbg,
+                                    content_moderation=content_moderation,
+                                    sku=sku if sku else None
+                                ),
+                                limit=num_results,
+                                poll=not sync_mode,
+                                extract=partial(extract_result_urls, endpoint="lifestyle_shot_by_text")
+                            )
+                            st.info(f"🎨 Generation started! Waiting for {num_results} image{'s' if num_results > 1 else ''}...")
                     else:
                         ref_image = st.file_uploader("Upload Reference Image", type=["png", "jpg", "jpeg"], key="ref_upload")
                         if st.button("Generate Lifestyle Shot") and ref_image:
                             if not can_submit_action("lifestyle_shot_ref"):
                                 st.warning("Please wait a moment before submitting again.")
                                 return
-                            set_generation_status("Generating", "Generating lifestyle shot...")
-                            with st.spinner("Generating lifestyle shot..."):
-                                try:
-                                    # Convert placement selections to API format
-                                    if placement_type == "Manual Placement":
-                                        manual_placements = [p.lower().replace(" ", "_") for p in positions]
-                                    else:
-                                        manual_placements = ["upper_left"]
-                                    
-                                    result = lifestyle_shot_by_image(
-                                        api_key=st.session_state.api_key,
-                                        image_data=uploaded_file.getvalue(),
-                                        reference_image=ref_image.getvalue(),
-                                        placement_type=placement_type.lower().replace(" ", "_"),
-                                        num_results=num_results,
-                                        sync=sync_mode,
-                                        shot_size=[shot_width, shot_height] if placement_type != "Original" else [1000, 1000],
-                                        original_quality=original_quality,
-                                        manual_placement_selection=manual_placements,
-                                        padding_values=[pad_left, pad_right, pad_top, pad_bottom] if placement_type == "Manual Padding" else [0, 0, 0, 0],
-                                        foreground_image_size=[fg_width, fg_height] if placement_type == "Custom Coordinates" else None,
-                                        foreground_image_location=[fg_x, fg_y] if placement_type == "Custom Coordinates" else None,
-                                        force_rmbg=force_rmbg,
-                                        content_moderation=content_moderation,
-                                        sku=sku if sku else None,
-                                        enhance_ref_image=enhance_ref,
-                                        ref_image_influence=ref_influence
-                                    )
-                                    
-                                    if result:
-                                        st.session_state.result_source = "Lifestyle Shot"
-                                        # Debug logging
-                                        
-                                        if sync_mode:
-                                            if isinstance(result, dict):
-                                                if "result_url" in result:
-                                                    st.session_state.edited_image = result["result_url"]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result_urls" in result:
-                                                    st.session_state.edited_image = result["result_urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            st.session_state.edited_image = item["urls"][0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                        elif isinstance(item, list) and len(item) > 0:
-                                                            st.session_state.edited_image = item[0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                elif "urls" in result:
-                                                    st.session_state.edited_image = result["urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                        else:
-                                            urls = []
-                                            if isinstance(result, dict):
-                                                if "urls" in result:
-                                                    urls.extend(result["urls"][:num_results])  # Limit to requested number
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    # Process each result item
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            urls.extend(item["urls"])
-                                                        elif isinstance(item, list):
-                                                            urls.extend(item)
-                                                        # Break if we have enough URLs
-                                                        if len(urls) >= num_results:
-                                                            break
-                                                    
-                                                    # Trim to requested number
-                                                    urls = urls[:num_results]
-                                            
-                                            if urls:
-                                                st.session_state.pending_urls = urls
-                                                st.session_state.pending_source = "Lifestyle Shot"
-                                                
-                                                # Create a container for status messages
-                                                status_container = st.empty()
-                                                refresh_container = st.empty()
-                                                
-                                                # Show initial status
-                                                status_container.info(f"🎨 Generation started! Waiting for {len(urls)} image{'s' if len(urls) > 1 else ''}...")
-                                                
-                                                # Try automatic checking first
-                                                if auto_check_images(status_container):
-                                                    st.rerun()
-                                                
-                                                # Add refresh button for manual checking
-                                                if refresh_container.button("🔄 Check for Generated Images"):
-                                                    with st.spinner("Checking for completed images..."):
-                                                        if check_generated_images():
-                                                            status_container.success("✨ Image ready!")
-                                                            st.rerun()
-                                                        else:
-                                                            status_container.warning(f"⏳ Still generating your image{'s' if len(urls) > 1 else ''}... Please check again in a moment.")
-                                except Exception as e:
-                                    api_error(e, "Lifestyle shot")
+                            # Convert placement selections to API format
+                            if placement_type == "Manual Placement":
+                                manual_placements = [p.lower().replace(" ", "_") for p in positions]
+                            else:
+                                manual_placements = ["upper_left"]
+
+                            submit_job(
+                                "Lifestyle shot",
+                                "Lifestyle Shot",
+                                partial(
+                                    lifestyle_shot_by_image,
+                                    api_key=st.session_state.api_key,
+                                    image_data=product.data,
+                                    reference_image=get_image_handle(ref_image).data,
+                                    placement_type=placement_type.lower().replace(" ", "_"),
+                                    num_results=num_results,
+                                    sync=sync_mode,
+                                    shot_size=[shot_width, shot_height] if placement_type != "Original" else [1000, 1000],
+                                    original_quality=original_quality,
+                                    manual_placement_selection=manual_placements,
+                                    padding_values=[pad_left, pad_right, pad_top, pad_bottom] if placement_type == "Manual Padding" else [0, 0, 0, 0],
+                                    foreground_image_size=[fg_width, fg_height] if placement_type == "Custom Coordinates" else None,
+                                    foreground_image_location=[fg_x, fg_y] if placement_type == "Custom Coordinates" else None,
+                                    force_rmbg=force_rmbg,
+                                    content_moderation=content_moderation,
+                                    sku=sku if sku else None,
+                                    enhance_ref_image=enhance_ref,
+                                    ref_image_influence=ref_influence
+                                ),
+                                limit=num_results,
+                                poll=not sync_mode,
+                                extract=partial(extract_result_urls, endpoint="lifestyle_shot_by_image")
+                            )
+                            st.info(f"🎨 Generation started! Waiting for {num_results} image{'s' if num_results > 1 else ''}...")
             
             with col2:
                 if st.session_state.edited_image:
                     src = st.session_state.get("result_source")
                     if src and src != "Lifestyle Shot":
                         st.info(f"Current image was generated in: {src}")
+                    # The selected image at full size; the other variations render as proxies.
                     st.image(st.session_state.edited_image, caption="Edited Image", use_column_width=True)
-                    image_data = download_image(st.session_state.edited_image)
-                    if image_data:
-                        st.download_button(
-                            "⬇️ Download Result",
-                            image_data,
-                            "edited_product.png",
-                            "image/png"
-                        )
-                elif st.session_state.pending_urls:
-                    st.info("Images are being generated. Click the refresh button above to check if they're ready.")
+                    render_download_button("⬇️ Download Result", "edited_product.png", key="lifestyle_download")
+                    if src == "Lifestyle Shot" and len(st.session_state.generated_images) > 1:
+                        render_generated_gallery("lifestyle")
+                elif st.session_state.active_jobs:
+                    st.info("Images are being generated. Progress is shown in the sidebar.")
@@ -1,7 +1,22 @@
-from .mask_utils import prepare_binary_mask_bytes
-from .result_utils import extract_result_urls
+from .image_handle import ImageHandle
+from .mask_utils import mask_preview, prepare_binary_mask_bytes
+from .result_utils import (
+    ResultImage,
+    extract_result_urls,
+    extract_results,
+    iter_result_urls,
+    iter_results,
+    register_result_adapter,
+)
 
 __all__ = [
+    "ImageHandle",
+    "ResultImage",
     "extract_result_urls",
+    "extract_results",
+    "iter_result_urls",
+    "iter_results",
+    "mask_preview",
     "prepare_binary_mask_bytes",
+    "register_result_adapter",
 ]
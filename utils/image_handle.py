@@ -0,0 +1,84 @@
+import hashlib
+import io
+import threading
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from .mask_utils import prepare_binary_mask_bytes
+
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+DEFAULT_CANVAS_WIDTH = 800
+
+
+class ImageHandle:
+    """
+    One uploaded image, decoded at most once, with lazily cached derivatives.
+
+    Tabs share a handle per upload (see app.get_image_handle) instead of
+    reopening, resizing and converting the file on every rerun. Derived
+    images are shared; treat them as read-only.
+    """
+
+    def __init__(self, data: bytes, name: str = None):
+        self.data = bytes(data)
+        self.name = name
+        self._lock = threading.Lock()
+        self._previews = {}
+        self._arrays = {}
+
+    @classmethod
+    def from_upload(cls, uploaded_file) -> "ImageHandle":
+        return cls(uploaded_file.getvalue(), name=getattr(uploaded_file, "name", None))
+
+    @cached_property
+    def digest(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    @cached_property
+    def size(self):
+        """(width, height) of the original, read from the header without decoding pixels."""
+        from PIL import Image
+
+        with Image.open(io.BytesIO(self.data)) as img:
+            return img.size
+
+    def canvas_size(self, max_width: int = DEFAULT_CANVAS_WIDTH):
+        width, height = self.size
+        canvas_width = min(width, max_width)
+        return canvas_width, int(canvas_width * height / width)
+
+    def canvas_preview(self, max_width: int = DEFAULT_CANVAS_WIDTH) -> "Image.Image":
+        """RGB copy at canvas size, used as the drawing background."""
+        with self._lock:
+            preview = self._previews.get(max_width)
+            if preview is None:
+                from PIL import Image
+
+                target = self.canvas_size(max_width)
+                img = Image.open(io.BytesIO(self.data))
+                # JPEG can decode straight at a reduced scale (never below target).
+                img.draft("RGB", target)
+                preview = img.resize(target)
+                if preview.mode != "RGB":
+                    preview = preview.convert("RGB")
+                self._previews[max_width] = preview
+        return preview
+
+    def rgb_array(self, max_width: int = DEFAULT_CANVAS_WIDTH) -> "np.ndarray":
+        """Read-only uint8 RGB array of the canvas preview."""
+        arr = self._arrays.get(max_width)
+        if arr is None:
+            import numpy as np
+
+            arr = np.array(self.canvas_preview(max_width), dtype=np.uint8)
+            arr.flags.writeable = False
+            self._arrays[max_width] = arr
+        return arr
+
+    def mask_bytes(self, canvas_data, threshold=25, invert=False) -> bytes:
+        """Binary mask PNG for a drawing on this image's canvas, at the original size."""
+        mask_bytes, _ = prepare_binary_mask_bytes(canvas_data, target_size=self.size, threshold=threshold, invert=invert)
+        return mask_bytes
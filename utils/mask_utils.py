@@ -1,21 +1,116 @@
+import hashlib
 import io
+import threading
+from collections import OrderedDict
 
-import numpy as np
-from PIL import Image
+# Fixed-point weights PIL uses for RGB -> L (ITU-R 601-2 luma), scaled by 2**16.
+_LUMA_R, _LUMA_G, _LUMA_B = 19595, 38470, 7471
+_LUMA_ROUND = 1 << 15
 
+# Entries are 1-bit PNGs or canvas-sized previews, so a few dozen stay small
+# while covering threshold/invert toggling in every tab.
+MASK_CACHE_SIZE = 32
 
-def prepare_binary_mask_bytes(image_data, target_size, threshold=25, invert=False):
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def mask_digest(image_data):
+    """Return a short digest of canvas image_data (shape and pixels)."""
+    # NumPy is imported on first use so app startup does not pay for it.
+    import numpy as np
+
+    arr = np.ascontiguousarray(image_data)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str((arr.shape, arr.dtype.str)).encode("ascii"))
+    h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+def threshold_mask(image_data, threshold=25, invert=False):
     """
-    Convert RGBA canvas image_data to a strict binary mask PNG.
-    White (255) = masked area, Black (0) = keep area.
+    Threshold RGBA/RGB canvas image_data on its luma at canvas resolution.
+
+    Returns a bool array, True = masked area. Luma is computed exactly as
+    PIL's RGB -> L conversion, so thresholds behave as before.
     """
-    mask_img = Image.fromarray(image_data.astype("uint8"), mode="RGBA").convert("L")
-    mask_img = mask_img.resize(target_size)
-    arr = np.array(mask_img, dtype=np.uint8)
-    binary = (arr > int(threshold)).astype(np.uint8) * 255
+    import numpy as np
+
+    rgb = np.asarray(image_data)
+    if rgb.dtype != np.uint8:
+        rgb = rgb.astype(np.uint8)
+    luma = rgb[..., 0].astype(np.uint32)
+    luma *= _LUMA_R
+    tmp = rgb[..., 1].astype(np.uint32)
+    tmp *= _LUMA_G
+    luma += tmp
+    np.multiply(rgb[..., 2], _LUMA_B, out=tmp, dtype=np.uint32)
+    luma += tmp
+    # ((sum + round) >> 16) > threshold  <=>  sum + round >= (threshold + 1) << 16
+    luma += _LUMA_ROUND
+    binary = luma >= (int(threshold) + 1) << 16
     if invert:
-        binary = 255 - binary
-    out_img = Image.fromarray(binary, mode="L")
+        np.logical_not(binary, out=binary)
+    return binary
+
+
+def _encode_mask(image_data, target_size, threshold, invert):
+    from PIL import Image
+
+    binary = threshold_mask(image_data, threshold=threshold, invert=invert)
+    # A bool array becomes a 1-bit image; nearest-neighbour keeps it strictly binary.
+    out_img = Image.fromarray(binary)
+    if out_img.size != tuple(target_size):
+        out_img = out_img.resize(tuple(target_size), Image.NEAREST)
     out = io.BytesIO()
     out_img.save(out, format="PNG")
-    return out.getvalue(), out_img
+    return out.getvalue()
+
+
+def _cached(key, build):
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+    value = build()
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > MASK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def prepare_binary_mask_bytes(image_data, target_size, threshold=25, invert=False):
+    """
+    Convert RGBA canvas image_data to a strict binary mask PNG.
+    White (255) = masked area, Black (0) = keep area.
+
+    The mask is thresholded at canvas resolution, upscaled with nearest
+    neighbour and encoded as a 1-bit PNG. The PNG is cached on
+    (canvas digest, target_size, threshold, invert), so repeated calls for
+    the same drawing are free. The returned image is decoded lazily from it.
+    """
+    key = (mask_digest(image_data), tuple(target_size), int(threshold), bool(invert))
+    png = _cached(key, lambda: _encode_mask(image_data, target_size, threshold, invert))
+    from PIL import Image
+
+    return png, Image.open(io.BytesIO(png))
+
+
+def mask_preview(image_data, threshold=25, invert=False):
+    """
+    Binary mask at canvas resolution for on-screen preview (white = masked).
+
+    Cheap enough to redraw on every slider change; the full-resolution PNG is
+    only built by prepare_binary_mask_bytes when the mask is submitted.
+    """
+    from PIL import Image
+
+    key = (mask_digest(image_data), None, int(threshold), bool(invert))
+    return _cached(key, lambda: Image.fromarray(threshold_mask(image_data, threshold=threshold, invert=invert)))
+
+
+def clear_mask_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -1,32 +1,118 @@
-def extract_result_urls(result, limit=None):
-    """Normalize Bria API responses into a list of image URLs."""
-    if not isinstance(result, dict):
-        return []
+from itertools import chain, islice
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+class ResultImage(NamedTuple):
+    url: str
+    seed: Optional[int]
+    # Position of the image in the response.
+    index: int
+
+
+# (url, seed) pairs read from one response shape.
+Adapter = Callable[[dict], Iterator[tuple]]
+
+
+def _seed(value):
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
 
-    urls = []
 
+def _result_url(result):
     if isinstance(result.get("result_url"), str):
-        urls.append(result["result_url"])
+        yield result["result_url"], None
 
-    if isinstance(result.get("result_urls"), list):
-        urls.extend([u for u in result["result_urls"] if isinstance(u, str)])
 
-    if isinstance(result.get("urls"), list):
-        urls.extend([u for u in result["urls"] if isinstance(u, str)])
+def _url_list(result):
+    urls = result.get("urls")
+    if isinstance(urls, list):
+        yield from ((u, None) for u in urls if isinstance(u, str))
 
+
+def _url_seed_items(result):
+    """Lifestyle shots: "result" is a list of [url, seed, session_id]."""
+    items = result.get("result")
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, list) and item and isinstance(item[0], str):
+                yield item[0], _seed(item[1]) if len(item) > 1 else None
+
+
+def _url_groups(result):
+    """HD generation: "result" is a list of {"urls": [...], "seed": n}."""
+    items = result.get("result")
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict) and isinstance(item.get("urls"), list):
+                seed = _seed(item.get("seed"))
+                yield from ((u, seed) for u in item["urls"] if isinstance(u, str))
+
+
+def _any_shape(result):
+    """Fallback: every place any endpoint is known to put result URLs."""
+    yield from _result_url(result)
+    for key in ("result_urls", "urls"):
+        if isinstance(result.get(key), list):
+            yield from ((u, None) for u in result[key] if isinstance(u, str))
     nested = result.get("result")
     if isinstance(nested, list):
         for item in nested:
             if isinstance(item, dict) and isinstance(item.get("urls"), list):
-                urls.extend([u for u in item["urls"] if isinstance(u, str)])
+                yield from ((u, None) for u in item["urls"] if isinstance(u, str))
             elif isinstance(item, list):
-                urls.extend([u for u in item if isinstance(u, str)])
+                yield from ((u, None) for u in item if isinstance(u, str))
+
 
-    deduped = []
+# Response shape of each endpoint, keyed by the last part of its API path
+# (text-to-image/hd/<version> is "text-to-image").
+RESULT_ADAPTERS: Dict[str, Adapter] = {
+    "packshot": _result_url,
+    "shadow": _result_url,
+    "erase_foreground": _result_url,
+    "gen_fill": _url_list,
+    "lifestyle_shot_by_text": _url_seed_items,
+    "lifestyle_shot_by_image": _url_seed_items,
+    "text-to-image": _url_groups,
+}
+
+
+def register_result_adapter(endpoint: str, adapter: Adapter) -> None:
+    """Teach the extractors the response shape of another endpoint."""
+    RESULT_ADAPTERS[endpoint] = adapter
+
+
+def iter_results(result, endpoint: Optional[str] = None) -> Iterator[ResultImage]:
+    """
+    Yield the distinct images of a Bria API response as they are found.
+
+    The endpoint's adapter reads its known shape directly; when it finds
+    nothing (e.g. a sync/async variant answered differently) every known
+    shape is probed instead.
+    """
+    if not isinstance(result, dict):
+        return
+    pairs = RESULT_ADAPTERS[endpoint](result) if endpoint in RESULT_ADAPTERS else iter(())
+    first = next(pairs, None)
+    pairs = _any_shape(result) if first is None else chain([first], pairs)
     seen = set()
-    for url in urls:
+    for url, seed in pairs:
         if url and url not in seen:
-            deduped.append(url)
             seen.add(url)
+            yield ResultImage(url, seed, len(seen) - 1)
+
 
-    return deduped[:limit] if isinstance(limit, int) and limit > 0 else deduped
+def _limited(items, limit):
+    # Stop walking the response once enough images were found.
+    return islice(items, limit) if isinstance(limit, int) and limit > 0 else items
+
+
+def extract_results(result, limit=None, endpoint: Optional[str] = None) -> List[ResultImage]:
+    return list(_limited(iter_results(result, endpoint), limit))
+
+
+def iter_result_urls(result, endpoint: Optional[str] = None) -> Iterator[str]:
+    return (image.url for image in iter_results(result, endpoint))
+
+
+def extract_result_urls(result, limit=None, endpoint: Optional[str] = None) -> List[str]:
+    """Normalize Bria API responses into a list of image URLs."""
+    return list(_limited(iter_result_urls(result, endpoint), limit))
@@ -0,0 +1,17 @@
+from .executor import Step, WorkflowRun, run_steps
+from .generate_ad_set import generate_ad_set
+from .history import HistoryStore, get_history_store
+from .jobs import Job, JobQueue, JobStore, get_job_queue
+
+__all__ = [
+    "HistoryStore",
+    "Job",
+    "JobQueue",
+    "JobStore",
+    "Step",
+    "WorkflowRun",
+    "generate_ad_set",
+    "get_history_store",
+    "get_job_queue",
+    "run_steps",
+]
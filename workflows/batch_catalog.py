@@ -0,0 +1,270 @@
+"""
+Headless catalog runner: generate_ad_set for every SKU in a manifest.
+
+Usage:
+    python -m workflows.batch_catalog manifest.csv results.jsonl --packshot --shadow \
+        --lifestyle --scene "on a marble kitchen counter" --workers 4
+
+The manifest is CSV or JSONL with one row per SKU. Recognized columns:
+    sku          required, unique per row
+    image_path   local image file, relative to the manifest directory
+    image_url    remote image, fetched through the asset cache
+    prompt       text prompt, used when no image is given
+Any other column overrides the generate_ad_set config for that row
+(e.g. scene_description, background_color, shadow_type).
+
+Results are appended to the output JSONL as each SKU finishes. Rerunning
+with the same output file skips SKUs that already finished with status
+"ok", so a crashed run resumes where it stopped.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from services.asset_cache import get_asset_cache
+from utils.result_utils import extract_result_urls
+from workflows.generate_ad_set import STEP_ENDPOINTS, generate_ad_set
+
+RESERVED_COLUMNS = ("sku", "image_path", "image_url", "prompt")
+DEFAULT_WORKERS = 4
+
+
+def _coerce(value):
+    if not isinstance(value, str):
+        return value
+    lowered = value.strip().lower()
+    if lowered in ("true", "yes"):
+        return True
+    if lowered in ("false", "no"):
+        return False
+    try:
+        return int(lowered)
+    except ValueError:
+        return value
+
+
+def read_manifest(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield manifest rows from a CSV or JSONL file without loading it all."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                yield {k: v for k, v in row.items() if k and v not in (None, "")}
+
+
+def load_completed(output_path: str) -> Set[str]:
+    """Return SKUs whose latest record in the output file has status "ok"."""
+    latest = {}
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a truncated last line behind.
+                continue
+            if record.get("sku"):
+                latest[record["sku"]] = record.get("status")
+    return {sku for sku, status in latest.items() if status == "ok"}
+
+
+def _ends_mid_line(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+class _JsonlWriter:
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        partial = _ends_mid_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+        if partial:
+            # Terminate a line truncated by a crash so the next record starts on its own line.
+            self._file.write("\n")
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _load_image(row, base_dir):
+    if row.get("image_path"):
+        with open(os.path.join(base_dir, row["image_path"]), "rb") as f:
+            return f.read()
+    if row.get("image_url"):
+        return get_asset_cache().fetch(row["image_url"])
+    return None
+
+
+def process_row(api_key: str, row: Dict[str, Any], base_config: Dict[str, Any], base_dir: str) -> Dict[str, Any]:
+    """Run generate_ad_set for one manifest row and return its output record."""
+    start = time.perf_counter()
+    record = {"sku": row["sku"]}
+    try:
+        config = dict(base_config)
+        config.update({k: _coerce(v) for k, v in row.items() if k not in RESERVED_COLUMNS})
+        result = generate_ad_set(
+            api_key,
+            image=_load_image(row, base_dir),
+            prompt=row.get("prompt"),
+            config=config,
+        )
+        errors = result.pop("errors", {})
+        timings = result.pop("timings", {})
+        skipped = result.pop("skipped", [])
+        record.update(
+            status="ok" if not errors and not skipped else ("partial" if result else "error"),
+            urls={
+                step: extract_result_urls(response, endpoint=STEP_ENDPOINTS.get(step))
+                for step, response in result.items()
+            },
+            errors=errors,
+            skipped=skipped,
+            timings=timings,
+        )
+    except Exception as e:
+        record.update(status="error", urls={}, errors={"sku": str(e)}, timings={})
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    record["finished_at"] = datetime.now(UTC).isoformat(timespec="seconds").replace("+00:00", "Z")
+    return record
+
+
+def run_catalog(
+    manifest_path: str,
+    output_path: str,
+    api_key: str,
+    config: Optional[Dict[str, Any]] = None,
+    max_workers: int = DEFAULT_WORKERS,
+    resume: bool = True,
+    on_record: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Process a manifest through a bounded worker pool, checkpointing to output_path.
+
+    At most 2 * max_workers rows are read ahead of the workers, so memory
+    stays flat for manifests with thousands of SKUs.
+
+    Returns:
+        Summary with processed, ok, failed, skipped, elapsed and skus_per_minute
+    """
+    base_config = dict(config or {})
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    completed = load_completed(output_path) if resume else set()
+    summary = {"processed": 0, "ok": 0, "failed": 0, "skipped": 0}
+    writer = _JsonlWriter(output_path)
+    start = time.perf_counter()
+
+    def collect(done):
+        for future in done:
+            record = future.result()
+            writer.write(record)
+            summary["processed"] += 1
+            summary["ok" if record["status"] == "ok" else "failed"] += 1
+            if on_record:
+                on_record(record, _with_rate(summary, time.perf_counter() - start))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            in_flight = set()
+            seen = set()
+            for row in read_manifest(manifest_path):
+                sku = str(row.get("sku") or "").strip()
+                if not sku or sku in completed or sku in seen:
+                    summary["skipped"] += 1
+                    continue
+                seen.add(sku)
+                row["sku"] = sku
+                if len(in_flight) >= 2 * max_workers:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                in_flight.add(pool.submit(process_row, api_key, row, base_config, base_dir))
+            done, _ = wait(in_flight)
+            collect(done)
+    finally:
+        writer.close()
+
+    return _with_rate(summary, time.perf_counter() - start)
+
+
+def _with_rate(summary, elapsed):
+    rate = summary["processed"] / elapsed * 60 if elapsed > 0 else 0.0
+    return {**summary, "elapsed": round(elapsed, 3), "skus_per_minute": round(rate, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run generate_ad_set over a catalog manifest.")
+    parser.add_argument("manifest", help="CSV or JSONL manifest with one SKU per row")
+    parser.add_argument("output", help="JSONL file results are appended to (also the resume checkpoint)")
+    parser.add_argument("--api-key", default=None, help="Bria API key (default: BRIA_API_KEY)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="SKUs processed concurrently")
+    parser.add_argument("--packshot", action="store_true", help="Create a packshot per SKU")
+    parser.add_argument("--shadow", action="store_true", help="Add a shadow per SKU")
+    parser.add_argument("--lifestyle", action="store_true", help="Create a lifestyle shot per SKU")
+    parser.add_argument("--scene", default="", help="Default lifestyle scene description")
+    parser.add_argument("--background-color", default="#FFFFFF")
+    parser.add_argument("--num-results", type=int, default=1)
+    parser.add_argument("--sequential", action="store_true", help="Run each SKU's steps one after another")
+    parser.add_argument("--no-resume", action="store_true", help="Reprocess SKUs already marked ok")
+    args = parser.parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    api_key = args.api_key or os.getenv("BRIA_API_KEY")
+    if not api_key:
+        parser.error("an API key is required (--api-key or BRIA_API_KEY)")
+
+    config = {
+        "create_packshot": args.packshot,
+        "add_shadow": args.shadow,
+        "lifestyle_shot": args.lifestyle,
+        "scene_description": args.scene,
+        "background_color": args.background_color,
+        "num_results": args.num_results,
+        "execution_mode": "sequential" if args.sequential else "parallel",
+    }
+
+    def report(record, progress):
+        print(
+            f"[{progress['processed']}] {record['sku']}: {record['status']} "
+            f"({record['elapsed']:.1f}s) {progress['skus_per_minute']:.1f} SKUs/min",
+            file=sys.stderr,
+        )
+
+    summary = run_catalog(
+        args.manifest,
+        args.output,
+        api_key,
+        config=config,
+        max_workers=args.workers,
+        resume=not args.no_resume,
+        on_record=report,
+    )
+    print(json.dumps(summary))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from services.tracing import in_context
+
+PARALLEL = "parallel"
+SEQUENTIAL = "sequential"
+DEFAULT_MAX_CONCURRENCY = 3
+
+
+@dataclass
+class Step:
+    """
+    One unit of work in a workflow.
+
+    fn receives a dict with the results of the steps listed in depends_on.
+    """
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class WorkflowRun:
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    wall_time: float = 0.0
+
+
+def _validate(steps: Sequence[Step]) -> List[Step]:
+    """Check names and dependencies and return the steps in a topological order."""
+    by_name = {}
+    for step in steps:
+        if step.name in by_name:
+            raise ValueError(f"Duplicate workflow step: {step.name}")
+        by_name[step.name] = step
+    for step in steps:
+        for dep in step.depends_on:
+            if dep not in by_name:
+                raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+    ordered, done = [], set()
+    remaining = list(steps)
+    while remaining:
+        ready = [s for s in remaining if all(d in done for d in s.depends_on)]
+        if not ready:
+            raise ValueError("Workflow steps contain a dependency cycle: " + ", ".join(s.name for s in remaining))
+        for step in ready:
+            ordered.append(step)
+            done.add(step.name)
+            remaining.remove(step)
+    return ordered
+
+
+def _run_step(step, inputs):
+    start = time.perf_counter()
+    try:
+        return step.fn(inputs), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def run_steps(
+    steps: Sequence[Step],
+    mode: str = PARALLEL,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> WorkflowRun:
+    """
+    Execute workflow steps respecting their dependencies.
+
+    In parallel mode every step whose dependencies have succeeded is started
+    right away, with at most max_concurrency steps running at once. In
+    sequential mode steps run one at a time in dependency order. A failing
+    step never aborts the run: its error is recorded and the steps that
+    depend on it are skipped, so callers always get partial results.
+    """
+    if mode not in (PARALLEL, SEQUENTIAL):
+        raise ValueError(f"Unknown execution mode: {mode}")
+    ordered = _validate(steps)
+    run = WorkflowRun()
+    start = time.perf_counter()
+
+    def record(step, value, error, elapsed):
+        run.timings[step.name] = elapsed
+        if error is None:
+            run.results[step.name] = value
+        else:
+            run.errors[step.name] = error
+
+    def blocked(step):
+        return any(d in run.errors or d in run.skipped for d in step.depends_on)
+
+    if mode == SEQUENTIAL or max_concurrency <= 1:
+        for step in ordered:
+            if blocked(step):
+                run.skipped.append(step.name)
+                continue
+            record(step, *_run_step(step, {d: run.results[d] for d in step.depends_on}))
+        run.wall_time = time.perf_counter() - start
+        return run
+
+    pending = list(ordered)
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        while pending or in_flight:
+            for step in list(pending):
+                if blocked(step):
+                    pending.remove(step)
+                    run.skipped.append(step.name)
+                elif len(in_flight) < max_concurrency and all(d in run.results for d in step.depends_on):
+                    pending.remove(step)
+                    inputs = {d: run.results[d] for d in step.depends_on}
+                    # Steps keep the caller's acting user and trace, as in sequential mode.
+                    in_flight[pool.submit(in_context(_run_step), step, inputs)] = step
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(in_flight.pop(future), *future.result())
+
+    run.wall_time = time.perf_counter() - start
+    return run
@@ -5,6 +5,17 @@ from services import (
     create_packshot,
     generate_hd_image
 )
+from services.asset_cache import get_asset_cache
+from utils.result_utils import extract_result_urls
+from workflows.executor import DEFAULT_MAX_CONCURRENCY, PARALLEL, Step, run_steps
+
+# API endpoint behind each step, for reading its response (see utils.result_utils).
+STEP_ENDPOINTS = {
+    "hd_image": "text-to-image",
+    "packshot": "packshot",
+    "shadow": "shadow",
+    "lifestyle": "lifestyle_shot_by_text",
+}
 
 def generate_ad_set(
     api_key: str,
@@ -14,50 +25,80 @@ def generate_ad_set(
 ) -> Dict[str, Any]:
     """
     Generate a set of product ads based on configuration.
+
+    Packshot, shadow and lifestyle only depend on the source image, so they
+    run concurrently once it is available (after the HD generation step when
+    only a prompt is given). Set config["execution_mode"] to "sequential" to
+    run the steps one after another, and config["max_concurrency"] to bound
+    parallel steps.
+
+    The result holds one entry per successful step plus:
+        timings: seconds spent in each step that ran
+        errors: error message per failed step
+        skipped: steps not run because a dependency failed
     """
     if not config:
         config = {}
-    
-    result = {}
-    
+
+    steps = []
+    source_deps = ()
+
     # Generate HD image if prompt provided
     if prompt and not image:
-        hd_response = generate_hd_image(
+        steps.append(Step("hd_image", lambda deps: generate_hd_image(
             api_key=api_key,
             prompt=prompt,
             num_results=config.get("num_results", 1),
             aspect_ratio=config.get("aspect_ratio", "1:1"),
             sync=config.get("sync", True)
-        )
-        result["hd_image"] = hd_response
-        image = hd_response.get("result_url")
-    
+        )))
+
+        def fetch_source_image(deps):
+            urls = extract_result_urls(deps["hd_image"], limit=1, endpoint=STEP_ENDPOINTS["hd_image"])
+            if not urls:
+                raise ValueError("HD image generation returned no result URL")
+            return get_asset_cache().fetch(urls[0])
+
+        # Download the generated image once and share it with the steps below
+        steps.append(Step("source_image", fetch_source_image, ("hd_image",)))
+        source_deps = ("source_image",)
+
+    def source_image(deps):
+        return deps.get("source_image", image)
+
     # Create packshot if requested
-    if config.get("create_packshot", False) and image:
-        packshot_response = create_packshot(
+    if config.get("create_packshot", False) and (image or source_deps):
+        steps.append(Step("packshot", lambda deps: create_packshot(
             api_key=api_key,
-            image_data=image,
+            image_data=source_image(deps),
             background_color=config.get("background_color", "#FFFFFF")
-        )
-        result["packshot"] = packshot_response
-    
+        ), source_deps))
+
     # Add shadow if requested
-    if config.get("add_shadow", False) and image:
-        shadow_response = add_shadow(
+    if config.get("add_shadow", False) and (image or source_deps):
+        steps.append(Step("shadow", lambda deps: add_shadow(
             api_key=api_key,
-            image_data=image,
+            image_data=source_image(deps),
             shadow_type=config.get("shadow_type", "natural")
-        )
-        result["shadow"] = shadow_response
-    
+        ), source_deps))
+
     # Create lifestyle shot if requested
-    if config.get("lifestyle_shot", False) and image:
-        lifestyle_response = lifestyle_shot_by_text(
+    if config.get("lifestyle_shot", False) and (image or source_deps):
+        steps.append(Step("lifestyle", lambda deps: lifestyle_shot_by_text(
             api_key=api_key,
-            image_data=image,
+            image_data=source_image(deps),
             scene_description=config.get("scene_description", ""),
             num_results=config.get("num_results", 1)
-        )
-        result["lifestyle"] = lifestyle_response
-    
-    return result 
\ No newline at end of file
+        ), source_deps))
+
+    run = run_steps(
+        steps,
+        mode=config.get("execution_mode", PARALLEL),
+        max_concurrency=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+    )
+
+    result = {name: value for name, value in run.results.items() if name != "source_image"}
+    result["timings"] = run.timings
+    result["errors"] = {name: str(e) for name, e in run.errors.items()}
+    result["skipped"] = run.skipped
+    return result
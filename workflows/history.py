@@ -0,0 +1,261 @@
+import inspect
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_HISTORY_PATH = os.getenv("ADFORGE_HISTORY_DB") or os.path.join(tempfile.gettempdir(), "adforge_history.sqlite3")
+DEFAULT_PAGE_SIZE = 20
+# Wait this long for another writer's lock instead of failing with "database is locked".
+BUSY_TIMEOUT_MS = 5000
+
+# Keyword arguments never written to history: credentials and raw image bytes.
+SECRET_PARAMS = ("api_key",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    sku TEXT,
+    source TEXT NOT NULL,
+    label TEXT NOT NULL,
+    state TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    urls TEXT NOT NULL DEFAULT '[]',
+    failed_urls TEXT NOT NULL DEFAULT '[]',
+    asset_paths TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    error_type TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_session_created ON jobs (session_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS jobs_sku_created ON jobs (sku, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS jobs_source_created ON jobs (source, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at DESC, id DESC);
+"""
+
+Cursor = Tuple[float, str]
+
+
+@dataclass
+class HistoryEntry:
+    id: str
+    session_id: str
+    sku: Optional[str]
+    source: str
+    label: str
+    state: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    urls: List[str] = field(default_factory=list)
+    failed_urls: List[str] = field(default_factory=list)
+    asset_paths: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float = 0.0
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    @property
+    def cursor(self) -> Cursor:
+        return (self.created_at, self.id)
+
+
+@dataclass
+class HistoryPage:
+    entries: List[HistoryEntry]
+    # Pass as `before` to fetch the next (older) page; None on the last page.
+    next_cursor: Optional[Cursor] = None
+
+
+def call_params(fn) -> Dict[str, Any]:
+    """
+    JSON-safe parameters of a functools.partial service call, for the history.
+
+    Positional arguments bound in the partial are recorded under their
+    parameter names. Image bytes are replaced by their size and credentials
+    are dropped.
+    """
+    bound = dict(getattr(fn, "keywords", None) or {})
+    if getattr(fn, "args", None):
+        try:
+            bound = dict(inspect.signature(fn.func).bind_partial(*fn.args, **bound).arguments)
+        except (TypeError, ValueError):
+            # No usable signature (e.g. a builtin): keep what can be named.
+            pass
+    params = {}
+    for name, value in bound.items():
+        if name in SECRET_PARAMS:
+            continue
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = {"bytes": len(value)}
+        params[name] = value
+    return params
+
+
+def _row_to_entry(row) -> HistoryEntry:
+    return HistoryEntry(
+        id=row["id"],
+        session_id=row["session_id"],
+        sku=row["sku"],
+        source=row["source"],
+        label=row["label"],
+        state=row["state"],
+        params=json.loads(row["params"]),
+        urls=json.loads(row["urls"]),
+        failed_urls=json.loads(row["failed_urls"]),
+        asset_paths=json.loads(row["asset_paths"]),
+        error=row["error"],
+        error_type=row["error_type"],
+        created_at=row["created_at"],
+        started_at=row["started_at"],
+        finished_at=row["finished_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+class HistoryStore:
+    """
+    SQLite generation history shared by every session and process.
+
+    WAL mode lets job workers write while UI sessions read. Each thread gets
+    its own connection. Pages are fetched with keyset pagination on
+    (created_at, id) so loading any page costs one index range scan, however
+    many rows the table holds.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or DEFAULT_HISTORY_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def save(self, job) -> None:
+        """Insert or update a workflows.jobs.Job; asset paths already recorded are kept."""
+        meta = job.meta or {}
+        params = meta.get("params") or {}
+        with self._conn() as conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (id, session_id, sku, source, label, state, params, urls, failed_urls,
+                                  error, error_type, created_at, started_at, finished_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    state = excluded.state,
+                    urls = excluded.urls,
+                    failed_urls = excluded.failed_urls,
+                    error = excluded.error,
+                    error_type = excluded.error_type,
+                    started_at = excluded.started_at,
+                    finished_at = excluded.finished_at,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    job.id,
+                    job.owner,
+                    meta.get("sku") or params.get("sku"),
+                    job.source,
+                    job.label,
+                    job.state,
+                    json.dumps(params, default=str),
+                    json.dumps(job.urls),
+                    json.dumps(job.failed_urls),
+                    job.error,
+                    job.error_type,
+                    job.created_at,
+                    job.started_at,
+                    job.finished_at,
+                    job.updated_at,
+                ),
+            )
+
+    def set_asset_paths(self, job_id: str, paths: Dict[str, str]) -> None:
+        """Record where a job's results live in the local asset cache."""
+        with self._conn() as conn:
+            conn.execute("UPDATE jobs SET asset_paths = ? WHERE id = ?", (json.dumps(paths), job_id))
+
+    def get(self, job_id: str) -> Optional[HistoryEntry]:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def page(
+        self,
+        session_id: Optional[str] = None,
+        sku: Optional[str] = None,
+        source: Optional[str] = None,
+        state: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        before: Optional[Cursor] = None,
+    ) -> HistoryPage:
+        """Newest entries first, optionally filtered, starting after the `before` cursor."""
+        clauses, args = [], []
+        for column, value in (("session_id", session_id), ("sku", sku), ("source", source), ("state", state)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if before is not None:
+            # A row-value comparison lets SQLite seek straight to the cursor in the index.
+            clauses.append("(created_at, id) < (?, ?)")
+            args.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT * FROM jobs {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*args, limit + 1),
+        ).fetchall()
+        entries = [_row_to_entry(row) for row in rows[:limit]]
+        next_cursor = entries[-1].cursor if len(rows) > limit else None
+        return HistoryPage(entries, next_cursor)
+
+    def latest(self, session_id: str, state: Optional[str] = None) -> Optional[HistoryEntry]:
+        entries = self.page(session_id=session_id, state=state, limit=1).entries
+        return entries[0] if entries else None
+
+    def count(self, session_id: Optional[str] = None) -> int:
+        if session_id is None:
+            return self._conn().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM jobs WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store, creating it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
@@ -0,0 +1,289 @@
+import dataclasses
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from services.asset_cache import AssetCache, get_asset_cache
+from services.hub import acting_as
+from services.polling import READY, poll_urls
+from services.tracing import in_context, span
+from utils.result_utils import extract_result_urls
+
+from .history import get_history_store
+
+QUEUED = "queued"
+RUNNING = "running"
+POLLING = "polling"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING, POLLING)
+
+DEFAULT_JOB_WORKERS = 4
+# Polling threads mostly sleep between checks, so many can wait at once
+# without holding up the workers that make API calls.
+DEFAULT_POLL_WORKERS = 32
+# Async generations usually land within a minute; give slow ones room.
+DEFAULT_POLL_DEADLINE = 180.0
+# Finished jobs kept in memory for status and history views.
+DEFAULT_MAX_JOBS = 500
+
+
+@dataclass
+class Job:
+    """
+    One submitted generation. Workers update it through the JobStore; readers
+    get copies, so a snapshot never changes under the UI.
+    """
+    id: str
+    label: str
+    source: str
+    owner: str
+    state: str = QUEUED
+    progress: str = ""
+    urls: List[str] = field(default_factory=list)
+    failed_urls: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    exception: Optional[BaseException] = field(default=None, repr=False)
+    meta: Dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job started running (or was queued, if still waiting)."""
+        start = self.started_at or self.created_at
+        return (self.finished_at or time.time()) - start
+
+
+class JobStore:
+    """
+    Thread-safe in-memory job table.
+
+    With a history (see workflows.history.HistoryStore) every job is also
+    written through on creation and on each change other than progress text,
+    so finished work outlives the browser session and the process.
+    """
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, history=None):
+        self.max_jobs = max_jobs
+        self.history = history
+        self.history_errors = 0
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def add(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            snapshot = dataclasses.replace(job)
+        self._persist(snapshot)
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for name, value in fields.items():
+                setattr(job, name, value)
+            job.updated_at = time.time()
+            snapshot = dataclasses.replace(job) if set(fields) - {"progress"} else None
+        if snapshot is not None:
+            self._persist(snapshot)
+
+    def set_asset_paths(self, job_id: str, paths: Dict[str, str]) -> None:
+        """Record where a job's results were stored in the asset cache (history only)."""
+        if self.history is None or not paths:
+            return
+        try:
+            self.history.set_asset_paths(job_id, paths)
+        except sqlite3.Error:
+            self.history_errors += 1
+
+    def _persist(self, job: Job) -> None:
+        if self.history is None:
+            return
+        try:
+            self.history.save(job)
+        except sqlite3.Error:
+            # History is best effort; a locked or full disk must not fail the job.
+            self.history_errors += 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dataclasses.replace(job) if job else None
+
+    def list(self, owner: Optional[str] = None, limit: int = 20) -> List[Job]:
+        """Most recent jobs first, optionally for one owner only."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if owner is None or j.owner == owner]
+            jobs.sort(key=lambda j: j.created_at, reverse=True)
+            return [dataclasses.replace(j) for j in jobs[:limit]]
+
+    def _prune(self):
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = sorted((j for j in self._jobs.values() if not j.active), key=lambda j: j.created_at)
+        for job in finished[:excess]:
+            del self._jobs[job.id]
+
+
+class JobQueue:
+    """
+    Runs service calls on a worker pool, and polling for async results on a
+    separate poll pool.
+
+    submit() returns immediately with a job id; the Streamlit script reads the
+    job from the store on later reruns instead of blocking on the call. A call
+    worker hands an async job to the poll pool once the API answered, so jobs
+    waiting minutes for their images never keep other sessions' calls queued.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        max_workers: int = DEFAULT_JOB_WORKERS,
+        poll_workers: int = DEFAULT_POLL_WORKERS,
+        poll_deadline: float = DEFAULT_POLL_DEADLINE,
+        prefetch: bool = True,
+        cache: Optional[AssetCache] = None,
+    ):
+        self.store = store or JobStore()
+        self.poll_deadline = poll_deadline
+        # Download each result into the asset cache as soon as polling finds it
+        # ready, so the image is already local when the gallery shows it.
+        self.prefetch = prefetch
+        self._cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="adforge-job")
+        self._poll_pool = ThreadPoolExecutor(max_workers=poll_workers, thread_name_prefix="adforge-poll")
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        label: str,
+        source: str,
+        owner: str,
+        limit: Optional[int] = None,
+        poll: bool = False,
+        extract: Callable[..., List[str]] = extract_result_urls,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Queue fn() and return the job id.
+
+        fn must not touch Streamlit state; bind its arguments up front (e.g. with
+        functools.partial). With poll=True the returned URLs are polled until
+        they are downloadable, as for non-sync Bria calls, and with prefetch
+        their bytes are already in the asset cache when the job is done.
+        """
+        job = Job(id=uuid.uuid4().hex, label=label, source=source, owner=owner, meta=dict(meta or {}))
+        self.store.add(job)
+        # The worker continues the submitter's trace (see services.tracing).
+        self._pool.submit(in_context(self._run), job.id, owner, fn, limit, poll, extract)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def jobs_for(self, owner: str, limit: int = 20) -> List[Job]:
+        return self.store.list(owner=owner, limit=limit)
+
+    def _run(self, job_id, owner, fn, limit, poll, extract):
+        self.store.update(job_id, state=RUNNING, started_at=time.time(), progress="Calling API")
+        try:
+            with span("job", job_id=job_id) as job_span:
+                # API usage is accounted to the submitting session (see services.hub).
+                with acting_as(owner):
+                    result = fn()
+                urls = extract(result, limit=limit)
+                if not urls:
+                    raise ValueError("No result URL in the API response")
+                if poll:
+                    self.store.update(job_id, state=POLLING, progress=f"0/{len(urls)} ready")
+                    # Free this worker for the next call; polling continues the job's trace.
+                    self._poll_pool.submit(in_context(self._finish_polling), job_id, urls)
+                    return
+                job_span.set(images=len(urls), failed=0)
+            self._done(job_id, urls, [])
+        except Exception as e:
+            self._fail(job_id, e)
+
+    def _finish_polling(self, job_id, urls):
+        try:
+            urls, failed = self._poll(job_id, urls)
+            if not urls:
+                raise RuntimeError(f"{len(failed)} image(s) never became available")
+            self._done(job_id, urls, failed)
+        except Exception as e:
+            self._fail(job_id, e)
+
+    def _done(self, job_id, urls, failed):
+        self.store.update(
+            job_id,
+            state=DONE,
+            urls=urls,
+            failed_urls=failed,
+            progress=f"{len(urls)} image{'s' if len(urls) != 1 else ''} ready",
+            finished_at=time.time(),
+        )
+
+    def _fail(self, job_id, e):
+        self.store.update(
+            job_id,
+            state=FAILED,
+            error=str(e),
+            error_type=type(e).__name__,
+            exception=e,
+            progress="",
+            finished_at=time.time(),
+        )
+
+    def _poll(self, job_id, urls):
+        total = len(urls)
+        ready, failed = set(), set()
+        with span("poll", urls=total) as poll_span:
+            cache = (self._cache or get_asset_cache()) if self.prefetch else None
+            for result in poll_urls(urls, deadline=self.poll_deadline, cache=cache):
+                (ready if result.state == READY else failed).add(result.url)
+                progress = f"{len(ready)}/{total} ready"
+                if failed:
+                    progress += f", {len(failed)} failed"
+                self.store.update(job_id, progress=progress)
+            poll_span.set(images=len(ready), failed=total - len(ready))
+        if cache is not None:
+            # Ready results were just downloaded; the history keeps where they are.
+            paths = {url: path for url in urls if url in ready and (path := cache.path_for(url))}
+            self.store.set_asset_paths(job_id, paths)
+        # URLs still pending at the deadline count as failed.
+        return [u for u in urls if u in ready], [u for u in urls if u not in ready]
+
+    def shutdown(self, wait: bool = True) -> None:
+        # Call workers may still hand jobs to the poll pool, so it closes last.
+        self._pool.shutdown(wait=wait)
+        self._poll_pool.shutdown(wait=wait)
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(JobStore(history=get_history_store()))
+    return _queue